@@ -0,0 +1,227 @@
+"""Micro-benchmarks of the engine's hot paths, with a stored baseline.
+
+Cases live in benchmarks/cases.py and register themselves with @case.
+A case's setup builds whatever state it needs (untimed) and returns the
+callable that is timed; *batch* says how many operations one call does,
+so results are comparable per operation. Each case is looped until one
+timing run lasts *min_time* and the best of *repeat* runs is kept as its
+ns/op.
+
+A shared machine also changes speed from one run to the next (by half
+again, on the reference box), and in bursts within a run, so absolute
+times do not reproduce. Each of a case's runs is therefore paired with a
+run of a fixed piece of interpreter work, REFERENCE, timed right after
+it; the gate compares the case's *relative* time, the median over the
+pairs of its time over the reference's. That cancels out how fast the
+machine happened to be, and the median drops the pairs a burst hit.
+ns/op are still reported and stored for reading.
+
+    python -m benchmarks                      # run, compare, exit 1 on regressions
+    python -m benchmarks --update-baseline    # accept the current numbers
+
+Relative times still depend on the Python version and CPU family:
+regenerate baseline.json (and commit it) when those change. Cases whose
+modules cannot be imported are reported as skipped rather than failing
+the run.
+
+Memory is measured separately, by ``python -m benchmarks.allocations``.
+"""
+from __future__ import annotations
+
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Tuple
+
+BASELINE_FILE = Path(__file__).parent / 'baseline.json'
+DEFAULT_THRESHOLD = 0.25  # fail when a case gets more than 25% slower
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    batch: int = 1  # operations per timed call
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, *, batch: int = 1) -> Callable:
+    """Register the decorated setup function as benchmark *name*."""
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable[[], Callable[[], object]]:
+        if name in CASES:
+            raise ValueError(f"Duplicate benchmark: {name}")
+        CASES[name] = Case(name, setup, batch)
+        return setup
+    return register
+
+
+@dataclass(frozen=True)
+class Timing:
+    ns_per_op: float
+    loops: int
+    repeat: int
+    relative: float | None = None  # median ratio to REFERENCE over paired runs
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    baseline: float  # relative times
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def _reference() -> Callable[[], object]:
+    """Fixed interpreter work: dict lookups, arithmetic, list appends and a sort."""
+    data = list(range(256))
+    lookup = {n: n * 7 for n in data}
+
+    def bench() -> int:
+        total = 0
+        out = []
+        for n in data:
+            total += lookup[n] & 0xFF
+            out.append(total)
+        out.sort(reverse=True)
+        return total
+    return bench
+
+
+REFERENCE = Case('reference', _reference)
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def _calibrate(timer: timeit.Timer, min_time: float) -> int:
+    """Loops for one run of *timer* to last at least *min_time*."""
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_time:
+            return loops
+        # Aim straight for min_time, but never grow more than 10x per probe
+        loops = int(loops * min(10.0, max(2.0, 1.2 * min_time / max(elapsed, 1e-9))))
+
+
+def time_case(bench: Case, *, min_time: float = 0.05, repeat: int = 25,
+              reference: Case | None = REFERENCE) -> Timing:
+    """Best per-operation time of *bench* in nanoseconds, and its relative time.
+
+    With a *reference*, every run of *bench* is followed by a run of the
+    reference and the relative time is the median ratio of the pairs.
+    """
+    timer = timeit.Timer(bench.setup())
+    loops = _calibrate(timer, min_time)
+    if reference is None:
+        best = min(timer.repeat(repeat, loops))
+        return Timing(best / loops / bench.batch * 1e9, loops, repeat)
+    ref_timer = timeit.Timer(reference.setup())
+    ref_loops = _calibrate(ref_timer, min_time)
+    times, ratios = [], []
+    for _ in range(repeat):
+        elapsed = timer.timeit(loops) / loops / bench.batch
+        times.append(elapsed)
+        ratios.append(elapsed / (ref_timer.timeit(ref_loops) / ref_loops / reference.batch))
+    return Timing(min(times) * 1e9, loops, repeat, statistics.median(ratios))
+
+
+def run(names: List[str] | None = None, *, min_time: float = 0.05, repeat: int = 25,
+        progress: Callable[[str, Timing | None, str], None] | None = None
+        ) -> Tuple[Dict[str, Timing], Dict[str, str]]:
+    """Time the named cases (default: all). Returns (timings, skipped reasons).
+
+    Anything the cases print (the quest system still prints) goes to
+    devnull.
+    """
+    from benchmarks import cases  # noqa: F401  (registers the cases)
+
+    timings: Dict[str, Timing] = {}
+    skipped: Dict[str, str] = {}
+    time_case(REFERENCE, min_time=min_time, repeat=1, reference=None)  # warm-up, while the CPU clock settles
+    for name in names if names is not None else list(CASES):
+        bench = CASES[name]
+        try:
+            with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+                timing = time_case(bench, min_time=min_time, repeat=repeat)
+        except ImportError as exc:
+            skipped[name] = f"unavailable: {exc}"
+            if progress:
+                progress(name, None, skipped[name])
+            continue
+        timings[name] = timing
+        if progress:
+            progress(name, timing, '')
+    return timings, skipped
+
+
+def environment() -> Dict[str, object]:
+    """Metadata stored next to the numbers, to tell whether two runs are comparable."""
+    try:
+        import numpy
+        numpy_version: str | None = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    try:
+        commit: str | None = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).parent,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy_version,
+        'commit': commit,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Results files
+# ---------------------------------------------------------------------------
+
+def to_json(timings: Mapping[str, Timing], skipped: Mapping[str, str]) -> Dict[str, object]:
+    return {
+        'environment': environment(),
+        'results': {name: {'ns_per_op': round(t.ns_per_op, 2), 'relative': round(t.relative, 4),
+                           'loops': t.loops, 'repeat': t.repeat}
+                    for name, t in timings.items()},
+        'skipped': dict(skipped),
+    }
+
+
+def load_results(path: Path, field: str = 'relative') -> Dict[str, float]:
+    """*field* (relative or ns_per_op) by case name from a results (or baseline) file."""
+    with open(path, encoding='utf-8') as fp:
+        data = json.load(fp)
+    return {name: entry[field] for name, entry in data.get('results', {}).items() if field in entry}
+
+
+def compare(current: Mapping[str, float], baseline: Mapping[str, float],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Cases more than *threshold* (a fraction) slower than their baseline (relative times)."""
+    regressions = []
+    for name, ns in current.items():
+        base = baseline.get(name)
+        if base and ns > base * (1.0 + threshold):
+            regressions.append(Regression(name, base, ns))
+    return regressions
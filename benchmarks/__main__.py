@@ -0,0 +1,60 @@
+"""Command line entry point: ``python -m benchmarks --help``."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Sequence
+
+from benchmarks import BASELINE_FILE, CASES, DEFAULT_THRESHOLD, Timing, compare, load_results, run, to_json
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Time the engine's hot paths and compare with the baseline.")
+    parser.add_argument('-k', '--filter', default='', metavar='TEXT', help="only cases whose name contains TEXT")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    parser.add_argument('-o', '--output', type=Path, default=None, help="write the results JSON here")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help="baseline JSON to compare with")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default %(default)s)")
+    parser.add_argument('--update-baseline', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--min-time', type=float, default=0.05, help="seconds per timing run (default %(default)s)")
+    parser.add_argument('--repeat', type=int, default=25, help="timing runs per case, each paired with a reference run (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    from benchmarks import cases  # noqa: F401  (registers the cases)
+    names = [name for name in CASES if args.filter in name]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    baseline = load_results(args.baseline) if args.baseline.exists() else {}
+
+    def report(name: str, timing: Timing | None, reason: str) -> None:
+        if timing is None:
+            print(f"{name:<40} skipped ({reason})")
+            return
+        base = baseline.get(name)
+        change = f"{timing.relative / base - 1:+7.1%}" if base else "    new"
+        print(f"{name:<40} {timing.ns_per_op:>12,.0f} ns/op  x{timing.relative:<8.3f} {change}")
+
+    timings, skipped = run(names, min_time=args.min_time, repeat=args.repeat, progress=report)
+    results = to_json(timings, skipped)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare({name: t.relative for name, t in timings.items()}, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression.name}: x{regression.baseline:.3f} -> x{regression.current:.3f} "
+              f"of the reference ({regression.ratio - 1:+.0%}, threshold {args.threshold:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Allocation and GC pressure of the status effects over a long simulation.
+
+    python -m benchmarks.allocations [--turns 10000]
+
+Each simulated turn plays one hand's card ability (heals, poisons,
+shields, buffs, stuns, reductions), trades a hit each way and ticks both
+sides' effects; HP is topped up so the fight never ends. Reported per run:
+
+* effects allocated -- distinct StatusEffect objects used (pool reuse is free)
+* bytes allocated   -- their size, instance dicts included
+* peak traced KiB   -- tracemalloc peak above the starting point
+* gc collections    -- garbage collector runs, by generation
+
+Nothing here is timed, so the numbers are stable across machines and can
+be compared between commits directly.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from typing import Any, Dict, Sequence
+
+# The hands whose abilities create status effects, weighted roughly as played
+HANDS = ('High Card',) * 4 + ('Pair',) * 4 + ('Three of a Kind',) * 2 + ('Straight', 'Flush', 'Full House',
+                                                                       'Five of a Kind', 'Flush House')
+
+
+def _size(effect: Any) -> int:
+    size = sys.getsizeof(effect)
+    if hasattr(effect, '__dict__'):
+        size += sys.getsizeof(vars(effect))
+    return size
+
+
+def simulate(turns: int, seed: int = 0) -> None:
+    """Play *turns* turns."""
+    from card_abilities import apply_card_combination_abilities
+    from entities.enemy import Enemy
+    from entities.player import Player
+
+    rng = random.Random(seed)
+    random.seed(seed)  # the abilities roll on the global generator
+    player, enemy = Player(), Enemy('Dummy', 10**9, 12)
+    player.hp = player.max_hp = enemy.hp = 10**9
+    for _ in range(turns):
+        apply_card_combination_abilities(rng.choice(HANDS), player, enemy, rng.randint(20, 90))
+        enemy.status_effects.modify_incoming_damage(player.status_effects.modify_outgoing_damage(40))
+        player.status_effects.modify_incoming_damage(enemy.status_effects.modify_outgoing_damage(12))
+        player.status_effects.tick_effects(player)
+        enemy.status_effects.tick_effects(enemy)
+        player.hp = enemy.hp = 10**9
+
+
+def count_effects(turns: int = 10_000, seed: int = 0) -> Dict[str, int]:
+    """Distinct effect objects handed to the managers, and their size.
+
+    Every effect is kept alive until the end, so no address is reused and
+    each object counts once however often a pool recycles it.
+    """
+    from status_effects import StatusEffectManager
+
+    seen: Dict[int, Any] = {}
+    add_effect = StatusEffectManager.add_effect
+
+    def tracking_add_effect(self: StatusEffectManager, effect: Any, target: Any) -> None:
+        seen[id(effect)] = effect
+        add_effect(self, effect, target)
+
+    StatusEffectManager.add_effect = tracking_add_effect  # type: ignore[method-assign]
+    try:
+        simulate(turns, seed)
+    finally:
+        StatusEffectManager.add_effect = add_effect  # type: ignore[method-assign]
+    return {'effects_allocated': len(seen), 'bytes_allocated': sum(map(_size, seen.values()))}
+
+
+def measure(turns: int = 10_000, seed: int = 0) -> Dict[str, int]:
+    """count_effects(), plus the memory peak and GC runs of an untracked run."""
+    import card_abilities  # noqa: F401  (imports stay out of the traced peak)
+    import entities.player  # noqa: F401
+
+    results: Dict[str, int] = {'turns': turns, **count_effects(turns, seed)}
+    collections = [0, 0, 0]
+
+    def on_gc(phase: str, info: Dict[str, int]) -> None:
+        if phase == 'start':
+            collections[info['generation']] += 1
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        simulate(turns, seed)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+    results.update(peak_traced_kib=(peak - start) // 1024,
+                   gc_gen0=collections[0], gc_gen1=collections[1], gc_gen2=collections[2])
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.allocations',
+                                     description="Allocations and GC runs of the status effects over a long fight.")
+    parser.add_argument('--turns', type=int, default=10_000, help="simulated turns (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    for key, value in measure(args.turns, args.seed).items():
+        print(f"{key:<20} {value:>12,}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""The benchmark cases; see benchmarks/__init__.py.
+
+Inputs are drawn from a fixed seed so every run times the same work.
+Modules are imported inside the setups, so a case that needs an
+unavailable dependency is skipped on its own. The world-map managers
+import ursina only for Vec3 and Entity; without ursina their setups run
+against the stand-in from _stand_in_ursina(), so they always gate.
+"""
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import random
+import sys
+import types
+from typing import Callable, Iterator, List
+from unittest import mock
+
+from benchmarks import case
+from card import CARD_TABLE, Card
+
+HANDS = 512  # distinct inputs cycled through by the batched cases
+
+
+def _hands(size: int, count: int = HANDS, seed: int = 0) -> List[List[Card]]:
+    rng = random.Random(seed)
+    return [rng.sample(CARD_TABLE, size) for _ in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Hand evaluation
+# ---------------------------------------------------------------------------
+
+@case('poker.get_poker_hand', batch=HANDS)
+def _get_poker_hand() -> Callable[[], None]:
+    from poker import get_poker_hand
+    hands = _hands(5)
+
+    def bench() -> None:
+        for hand in hands:
+            get_poker_hand(hand)
+    return bench
+
+
+def _form_hand(sizes: List[int]) -> Callable[[], None]:
+    from deck import Deck
+    from entities.player import Player
+
+    player = Player()
+    rng = random.Random(1)
+    plays = [(hand, rng.sample(range(len(hand)), rng.choice(sizes))) for hand in _hands(player.hand_size)]
+    # Enough cards for every refill of a batch
+    refill = [card.id for card in CARD_TABLE] * (HANDS * max(sizes) // len(CARD_TABLE) + 1)
+
+    def bench() -> None:
+        player.deck = Deck.from_ids(refill)
+        player.discard_pile.clear()
+        for hand, indices in plays:
+            player.hand = list(hand)
+            player.form_hand_and_attack(indices)
+    return bench
+
+
+@case('player.form_hand_and_attack.partial', batch=HANDS)
+def _form_partial() -> Callable[[], None]:
+    """1-4 card selections: the partial-hand (rank group / Strike) path."""
+    return _form_hand([1, 2, 3, 4])
+
+
+@case('player.form_hand_and_attack.five', batch=HANDS)
+def _form_five() -> Callable[[], None]:
+    return _form_hand([5])
+
+
+def _apply_jokers(loadout: tuple) -> Callable[[], Callable[[], None]]:
+    def setup() -> Callable[[], None]:
+        from jokers import apply_jokers
+        from poker import classify_selection
+        plays = [(hand, *classify_selection(hand)) for hand in _hands(5)]
+        plays = [(hand, sum(card.value for card in hand) * mult, hand_type) for hand, hand_type, mult in plays]
+        jokers = list(loadout)
+
+        def bench() -> None:
+            for hand, base, hand_type in plays:
+                apply_jokers(hand, base, hand_type, jokers, consume=False)
+        return bench
+    return setup
+
+
+# Persistent jokers only, so nothing is consumed between calls
+_LOADOUTS = {
+    0: (),
+    1: ('joker',),
+    3: ('joker', 'archon', 'ruse'),
+    5: ('joker', 'archon', 'ruse', 'emperor', 'hierophant'),
+}
+for _size, _loadout in _LOADOUTS.items():
+    case(f'jokers.apply_jokers.{_size}', batch=HANDS)(_apply_jokers(_loadout))
+
+
+# ---------------------------------------------------------------------------
+# Deck
+# ---------------------------------------------------------------------------
+
+@case('deck.shuffle_draw')
+def _deck_draw() -> Callable[[], None]:
+    """A turn's worth of deck work: shuffle, draw a hand, put it back."""
+    from deck import Deck
+    deck = Deck()
+
+    def bench() -> None:
+        deck.shuffle()
+        deck.refresh_from_discard(deck.draw(8))
+    return bench
+
+
+@case('deck.full_shuffle')
+def _deck_full_shuffle() -> Callable[[], None]:
+    from deck import Deck
+    deck = Deck()
+
+    def bench() -> None:
+        deck.shuffle()
+        deck.cards  # forces the pending shuffle
+    return bench
+
+
+# ---------------------------------------------------------------------------
+# Status effects
+# ---------------------------------------------------------------------------
+
+class _Target:
+    """Something with HP for effects to act on; never dies during a run."""
+
+    name = 'Target'
+
+    def __init__(self):
+        self.hp = self.max_hp = 10**12
+
+
+def _loaded_manager():
+    from status_effects import (DamageBuffEffect, DamageReductionEffect, PoisonEffect, ShieldEffect,
+                                StatusEffectManager)
+    target = _Target()
+    manager = StatusEffectManager()
+    forever = 10**12
+    for effect in (PoisonEffect(2), PoisonEffect(3), DamageReductionEffect(0.25), ShieldEffect(forever),
+                   DamageBuffEffect(1.5)):
+        effect.duration = forever
+        manager.add_effect(effect, target)
+    return manager, target
+
+
+@case('status.tick_effects')
+def _tick_effects() -> Callable[[], None]:
+    manager, target = _loaded_manager()
+    return lambda: manager.tick_effects(target)
+
+
+@case('status.modify_incoming_damage')
+def _modify_incoming() -> Callable[[], None]:
+    manager, _ = _loaded_manager()
+    return lambda: manager.modify_incoming_damage(40)
+
+
+@case('card_abilities.apply', batch=HANDS)
+def _apply_abilities() -> Callable[[], None]:
+    """Every hand type's abilities in turn, ticking both sides once per batch."""
+    from card_abilities import HAND_ABILITIES, apply_card_combination_abilities
+    from entities.enemy import Enemy
+    from entities.player import Player
+    player, enemy = Player(), Enemy('Target', 10**12, 1)
+    player.hp = player.max_hp = 10**12
+    names = list(HAND_ABILITIES)
+    hands = [names[i % len(names)] for i in range(HANDS)]
+
+    def bench() -> None:
+        for hand in hands:
+            apply_card_combination_abilities(hand, player, enemy, 60)
+        player.status_effects.tick_effects(player)
+        enemy.status_effects.tick_effects(enemy)
+    return bench
+
+
+# ---------------------------------------------------------------------------
+# World managers
+# ---------------------------------------------------------------------------
+
+class _Vec3(tuple):
+    def __new__(cls, x: float = 0, y: float = 0, z: float = 0):
+        return super().__new__(cls, (x, y, z))
+
+
+class _Entity:
+    def __init__(self, *args, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+@contextlib.contextmanager
+def _stand_in_ursina() -> Iterator[None]:
+    """Import with a stand-in ursina in sys.modules, unless the real one is installed.
+
+    world_map does `from ursina import *` but the managers only build
+    Vec3s at construction; nothing here renders. sys.modules is restored
+    on exit, which also drops the modules imported against the stand-in,
+    so nothing outside the case's setup sees it.
+    """
+    if importlib.util.find_spec('ursina') is not None:
+        yield
+        return
+    stand_in = types.ModuleType('ursina')
+    stand_in.Vec3, stand_in.Entity = _Vec3, _Entity
+    prefabs = types.ModuleType('ursina.prefabs')
+    controller = types.ModuleType('ursina.prefabs.first_person_controller')
+    controller.FirstPersonController = _Entity
+    stand_in.prefabs, prefabs.first_person_controller = prefabs, controller
+    with mock.patch.dict(sys.modules, {'ursina': stand_in, 'ursina.prefabs': prefabs,
+                                       'ursina.prefabs.first_person_controller': controller}):
+        yield
+
+
+@case('quest.update_quest_progress')
+def _update_quest_progress() -> Callable[[], None]:
+    with _stand_in_ursina():
+        from quest_system import QuestManager, StoryManager
+        from world_map import WorldMap
+    world = WorldMap()
+    quests = QuestManager(world, StoryManager(world))
+    quest = quests.available_quests['clear_terminal']
+    quest.start_quest()
+    quests.active_quests[quest.quest_id] = quest
+    for objective in quest.objectives:
+        objective.required_count = 10**12  # progress forever, never complete
+    return lambda: quests.update_quest_progress('clear_terminal', 'kill_twisted', 1)
+
+
+@case('construct.QuestManager')
+def _construct_quests() -> Callable[[], None]:
+    with _stand_in_ursina():
+        from quest_system import QuestManager, StoryManager
+        from world_map import WorldMap
+    world = WorldMap()
+    story = StoryManager(world)
+    return lambda: QuestManager(world, story)
+
+
+@case('construct.DialogueManager')
+def _construct_dialogue() -> Callable[[], None]:
+    with _stand_in_ursina():
+        from npc_system import DialogueManager
+        from quest_system import QuestManager, StoryManager
+        from world_map import WorldMap
+    world = WorldMap()
+    quests = QuestManager(world, StoryManager(world))
+    return lambda: DialogueManager(quests, world)
+
+
+@case('construct.BossManager')
+def _construct_bosses() -> Callable[[], None]:
+    with _stand_in_ursina():
+        from boss_encounters import BossManager
+        from world_map import WorldMap
+    world = WorldMap()
+    return lambda: BossManager(world)
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from world_map import WorldMap, DistrictType
 from entities.enemy import Enemy, create_enemy
 from entities.player import Player
+from combat_engine import CombatEngine, Strike
 from status_effects import StatusEffectManager, StunEffect, PoisonEffect, ShieldEffect
 import random
 
@@ -105,8 +106,8 @@ class Boss:
             defense=base_stats.get('defense', 0)
         )
         
-        # Boss-specific status effects
-        self.boss_effects = StatusEffectManager()
+        # Boss status effects are the enemy's: ticked on its turns, read by take_damage
+        self.boss_effects: StatusEffectManager = self.enemy.status_effects
         
         # Combat state
         self.turn_count = 0
@@ -175,11 +176,11 @@ class Boss:
             # Apply effects
             for effect in effects:
                 if effect == "stun":
-                    player.status_effects.add_effect(StunEffect(), player)
+                    player.status_effects.add_effect(StunEffect.acquire(), player)
                 elif effect == "poison":
-                    player.status_effects.add_effect(PoisonEffect(5, 3), player)
+                    player.status_effects.add_effect(PoisonEffect.acquire(5, 3), player)
                 elif effect == "shield":
-                    self.boss_effects.add_effect(ShieldEffect(20), self.enemy)
+                    self.boss_effects.add_effect(ShieldEffect.acquire(20), self.enemy)
             
             return {
                 'ability': chosen_ability.name,
@@ -235,6 +236,7 @@ class BossEncounter:
         self.turn_number = 0
         self.boss_actions: List[Dict] = []
         self.player_actions: List[Dict] = []
+        self.engine: Optional[CombatEngine] = None
     
     def start_encounter(self) -> bool:
         """Start the boss encounter. Returns True if successful."""
@@ -252,6 +254,7 @@ class BossEncounter:
         
         # Apply special rules
         self._apply_special_rules()
+        self.engine = self.create_engine()
         
         self.cutscene_active = False
         print(f"Combat begins! {self.boss.get_phase_description()}")
@@ -279,33 +282,37 @@ class BossEncounter:
             self.special_rules.append("reality_warp")
             print("Special Rule: Reality Warp - Boss can change combat rules mid-fight")
     
-    def take_player_turn(self, player_action: Dict) -> Dict[str, Any]:
-        """Process the player's turn and return boss response."""
-        self.turn_number += 1
-        self.player_actions.append(player_action)
-        
-        # Apply player action to boss
-        damage = player_action.get('damage', 0)
-        self.boss.enemy.take_damage(damage)
-        
-        # Update boss phase
+    def create_engine(self, **options: Any) -> CombatEngine:
+        """A CombatEngine for this fight whose enemy turns run the boss AI."""
+        return CombatEngine(self.player, self.boss.enemy, enemy_turn=self._boss_turn, **options)
+
+    def _boss_turn(self, engine: CombatEngine) -> int:
+        """Enemy-turn hook: phase update, boss ability, special rules."""
         self.boss.update_phase()
-        
-        # Boss takes turn
         boss_action = self.boss.take_turn(self.player)
         self.boss_actions.append(boss_action)
-        
-        # Apply boss action to player
-        boss_damage = boss_action['damage']
-        self.player.take_damage(boss_damage)
-        
-        # Apply special rules
+
+        before = self.player.hp
+        self.player.take_damage(boss_action['damage'])
         self._apply_turn_special_rules()
+        return before - self.player.hp
+
+    def take_player_turn(self, player_action: Dict) -> Dict[str, Any]:
+        """Process the player's turn and return boss response."""
+        self.turn_number += 1
+        self.player_actions.append(player_action)
+        if self.engine is None:
+            self.engine = self.create_engine()
+
+        # The boss answers inside the engine unless the hit was fatal
+        if not self.engine.finished:
+            self.engine.step(Strike(player_action.get('damage', 0)))
         
         # Check for defeat
         if self.boss.is_defeated():
             return self._handle_boss_defeat()
         
+        boss_action = self.boss_actions[-1] if self.boss_actions else {}
         return {
             'boss_action': boss_action,
             'boss_health': self.boss.enemy.hp,
@@ -1,27 +1,62 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
 
 from constants import CARD_VALUES, SUITS, RANKS
 
 
-@dataclass(frozen=True)
+DECK_SIZE = len(SUITS) * len(RANKS)
+
+_SUIT_INDEX: Dict[str, int] = {suit: index for index, suit in enumerate(SUITS)}
+_RANK_INDEX: Dict[str, int] = {rank: index for index, rank in enumerate(RANKS)}
+
+
+@dataclass(frozen=True, slots=True)
 class Card:
-    """Represents a single playing card."""
+    """Represents a single playing card.
+
+    Every card also has a compact integer id in 0..51
+    (suit index * 13 + rank index). Card.from_id returns the shared,
+    pre-validated instance for an id, so hot paths can pass ints around
+    and only materialise cards when needed.
+    """
 
     suit: str
     rank: str
+    value: int = field(init=False, repr=False, compare=False)  # 2..14, used for comparisons
+    id: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        if self.suit not in SUITS:
+        suit_index = _SUIT_INDEX.get(self.suit)
+        if suit_index is None:
             raise ValueError(f"Invalid suit: {self.suit}")
-        if self.rank not in RANKS:
+        rank_index = _RANK_INDEX.get(self.rank)
+        if rank_index is None:
             raise ValueError(f"Invalid rank: {self.rank}")
+        object.__setattr__(self, 'value', CARD_VALUES[self.rank])
+        object.__setattr__(self, 'id', suit_index * len(RANKS) + rank_index)
 
-    @property
-    def value(self) -> int:
-        """Numerical value used for comparisons (2..14)."""
-        return CARD_VALUES[self.rank]
+    @staticmethod
+    def from_id(card_id: int) -> 'Card':
+        """Return the interned card for *card_id* (0..51)."""
+        if not 0 <= card_id < DECK_SIZE:
+            raise ValueError(f"Invalid card id: {card_id}")
+        return CARD_TABLE[card_id]
 
     def __repr__(self) -> str:  # pragma: no cover
-        return f"{self.rank} of {self.suit}" 
\ No newline at end of file
+        return f"{self.rank} of {self.suit}"
+
+
+# Flyweight table: one validated instance per id, in standard deck order
+CARD_TABLE: Tuple[Card, ...] = tuple(Card(s, r) for s in SUITS for r in RANKS)
+
+
+def cards_from_ids(card_ids: Iterable[int]) -> List[Card]:
+    """Map card ids to their interned Card instances."""
+    return [CARD_TABLE[i] for i in card_ids]
+
+
+def card_ids(cards: Iterable[Card]) -> List[int]:
+    """Map cards to their integer ids."""
+    return [card.id for card in cards]
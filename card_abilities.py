@@ -1,8 +1,23 @@
+"""Poker-hand abilities, as a declarative registry.
+
+HAND_ABILITIES maps a hand type to the abilities it triggers. An Ability
+names its kind (what it does: stun, heal, poison, ...), its target, its
+chance to fire (Fortune Teller raises chances) and the formula for its
+magnitude from the hand's base damage. Adding an ability is adding an
+entry; hands that combine others list the other hands' abilities.
+
+apply_card_combination_abilities() rolls and applies a hand's abilities.
+With ``expected=True`` it rolls and applies nothing and reports the
+expected outcome instead, for fast analytic simulation.
+"""
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 import random
+from events import notice
+from jokers import compile_loadout
 from status_effects import (
-    StunEffect, HealEffect, DamageBuffEffect, ShieldEffect, 
+    StunEffect, HealEffect, DamageBuffEffect, ShieldEffect,
     DamageReductionEffect, PoisonEffect
 )
 
@@ -19,178 +34,259 @@ class CombatContext:
         self.last_hand = ''
 
 
-def apply_card_combination_abilities(hand_name: str, player: 'Player', enemy: 'Enemy', base_damage: int) -> dict:
+# A magnitude formula: the hand's base damage -> the ability's amount
+Magnitude = Callable[[int], float]
+
+
+def _fixed(amount: float) -> Magnitude:
+    return lambda base_damage: amount
+
+
+# ---------------------------------------------------------------------------
+# Ability kinds
+# ---------------------------------------------------------------------------
+
+# (ability, amount, target, player, enemy, result) -> message, or None if nothing happened
+Handler = Callable[['Ability', float, Any, Any, Any, Dict[str, Any]], Optional[str]]
+
+
+@dataclass(frozen=True)
+class AbilityKind:
+    """What an ability does.
+
+    *mean* gives the expected effect of one activation, from the amount
+    and the target (by default the amount itself).
+    """
+
+    name: str
+    apply: Handler
+    mean: Callable[[float, Any], float] = lambda amount, target: amount
+
+
+def _add(effect: Callable[[float], Any]) -> Handler:
+    """Handler that gives the target a status effect built from the amount."""
+    def apply(ability: Ability, amount: float, target: Any, player: Any, enemy: Any,
+              result: Dict[str, Any]) -> Optional[str]:
+        target.status_effects.add_effect(effect(amount), target)
+        return ability.describe(amount)
+    return apply
+
+
+def _multiply(ability: Ability, amount: float, target: Any, player: Any, enemy: Any,
+              result: Dict[str, Any]) -> Optional[str]:
+    result["damage_multiplier"] *= amount
+    return ability.describe(amount)
+
+
+def _extra_discards(ability: Ability, amount: float, target: Any, player: Any, enemy: Any,
+                    result: Dict[str, Any]) -> Optional[str]:
+    target.max_discards += amount
+    return ability.describe(amount)
+
+
+def _activate_items(ability: Ability, amount: float, target: Any, player: Any, enemy: Any,
+                    result: Dict[str, Any]) -> Optional[str]:
+    activated = []
+    context = CombatContext(player, enemy)  # one for all the items
+    for item in target.items[:]:  # Copy list to avoid modification issues
+        if hasattr(item, 'on_use'):
+            try:
+                item.on_use(context)
+                activated.append(str(item))
+                target.items.remove(item)  # Consume the item
+            except Exception as e:
+                notice(f"Error applying {item} effect: {e}")
+    return f"Activated items: {', '.join(activated)}" if activated else "No items to activate!"
+
+
+def _max_hp_damage(ability: Ability, amount: float, target: Any, player: Any, enemy: Any,
+                   result: Dict[str, Any]) -> Optional[str]:
+    if not (target and hasattr(target, 'max_hp')):
+        return None
+    percent = random.uniform(0, amount)
+    bonus = int(target.max_hp * percent)
+    target.take_damage(bonus)
+    return f"Bonus max HP damage: {bonus} ({percent*100:.1f}% of max HP)"
+
+
+STUN = AbilityKind('stun', _add(lambda amount: StunEffect.acquire()), lambda amount, target: 1.0)
+HEAL = AbilityKind('heal', _add(lambda amount: HealEffect.acquire(int(amount))))
+POISON = AbilityKind('poison', _add(lambda amount: PoisonEffect.acquire(int(amount), 3)))  # per turn, 3 turns
+DAMAGE_BUFF = AbilityKind('damage_buff', _add(DamageBuffEffect.acquire))
+SHIELD = AbilityKind('shield', _add(lambda amount: ShieldEffect.acquire(int(amount))))
+DAMAGE_REDUCTION = AbilityKind('damage_reduction', _add(DamageReductionEffect.acquire))
+DAMAGE_MULTIPLIER = AbilityKind('damage_multiplier', _multiply)
+EXTRA_DISCARDS = AbilityKind('extra_discards', _extra_discards)
+ACTIVATE_ITEMS = AbilityKind('activate_items', _activate_items,
+                             lambda amount, target: len(getattr(target, 'items', ())))
+MAX_HP_DAMAGE = AbilityKind('max_hp_damage', _max_hp_damage,  # uniform in [0, amount) of max HP
+                            lambda amount, target: getattr(target, 'max_hp', 0) * amount / 2)
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Ability:
+    """One effect of a hand: *kind* applied to *target* ('player' or 'enemy').
+
+    *message* is formatted with the ``amount``.
+    """
+
+    kind: AbilityKind
+    target: str = 'player'
+    chance: float = 1.0
+    magnitude: Magnitude = _fixed(1)
+    message: str = ''
+
+    def describe(self, amount: float) -> str:
+        return self.message.format(amount=amount) if '{' in self.message else self.message
+
+
+@dataclass(frozen=True)
+class HandAbilities:
+    """A hand's abilities, in the order they apply.
+
+    A *message* replaces the abilities' own messages with one line,
+    formatted with their amounts in order.
+    """
+
+    description: str
+    abilities: Tuple[Ability, ...] = ()
+    message: str = ''
+    lucky: bool = field(init=False)  # whether any chance is left to roll
+
+    def __post_init__(self):
+        object.__setattr__(self, 'lucky', any(a.chance < 1.0 for a in self.abilities))
+
+
+_PAIR = (Ability(HEAL, magnitude=lambda base: base // 2, message="Healed for {amount} HP!"),)
+_THREE_OF_A_KIND = (
+    Ability(POISON, 'enemy', magnitude=lambda base: max(3, base // 10)),  # At least 3 damage per turn
+    Ability(POISON, magnitude=lambda base: max(3, base // 10) // 2),  # Less self-damage
+)
+_FOUR_OF_A_KIND = (Ability(ACTIVATE_ITEMS),)
+_FLUSH = (Ability(SHIELD, magnitude=_fixed(30), message="Shield gained ({amount} HP)!"),)
+_FULL_HOUSE = (Ability(DAMAGE_REDUCTION, magnitude=_fixed(0.3), message="Damage reduction active!"),)
+
+HAND_ABILITIES: Dict[str, HandAbilities] = {
+    "High Card": HandAbilities("30% chance to stun enemy", (
+        Ability(STUN, 'enemy', chance=0.3, message="Enemy stunned!"),)),
+    "Pair": HandAbilities("Heal for half damage dealt", _PAIR),
+    "Two Pair": HandAbilities("50% chance for double damage", (
+        Ability(DAMAGE_MULTIPLIER, chance=0.5, magnitude=_fixed(2.0), message="Double damage!"),)),
+    "Three of a Kind": HandAbilities("Poison both players", _THREE_OF_A_KIND,
+                                     "Poison applied! ({0} damage/turn to enemy, {1} to self)"),
+    "Straight": HandAbilities("30% damage buff next attack", (
+        Ability(DAMAGE_BUFF, magnitude=_fixed(1.3), message="Damage buff for next attack!"),)),
+    "Flush": HandAbilities("30 HP shield", _FLUSH),
+    "Full House": HandAbilities("30% damage reduction", _FULL_HOUSE),
+    "Four of a Kind": HandAbilities("Activate all tarot cards", _FOUR_OF_A_KIND),
+    "Straight Flush": HandAbilities("Discard +1", (
+        Ability(EXTRA_DISCARDS, message="Discard limit increased by {amount}!"),)),
+    "Royal Flush": HandAbilities("4x damage multiplier", (
+        Ability(DAMAGE_MULTIPLIER, magnitude=_fixed(4.0), message="Attack multiplied by 4!"),)),
+    "Five of a Kind": HandAbilities("Pair + Three of a Kind + Four of a Kind abilities",
+                                    _PAIR + _THREE_OF_A_KIND + _FOUR_OF_A_KIND,
+                                    "Combined abilities: Heal ({0}), Poison ({1}), Items activated"),
+    "Flush House": HandAbilities("Flush + Full House abilities", _FLUSH + _FULL_HOUSE,
+                                 "Combined abilities: Shield ({0}) + Damage Reduction ({1:.0%})"),
+    "Flush Five": HandAbilities("0-20% max HP damage to enemy", (
+        Ability(MAX_HP_DAMAGE, 'enemy', magnitude=_fixed(0.20)),)),
+}
+
+_NO_ABILITIES = HandAbilities("No special ability")
+
+
+def _chance_multiplier(entry: HandAbilities, player: Any) -> float:
+    """The loadout's multiplier of every chance (Fortune Teller), capped at 100% by the callers.
+
+    Looked up only for hands that roll.
+    """
+    if not entry.lucky:
+        return 1.0
+    loadout = getattr(player, 'loadout', None)
+    if loadout is None:  # anything with a jokers list
+        loadout = compile_loadout(tuple(getattr(player, 'jokers', ())))
+    return loadout.chance_multiplier
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+def apply_card_combination_abilities(hand_name: str, player: 'Player', enemy: 'Enemy', base_damage: int,
+                                     *, expected: bool = False) -> dict:
     """
     Apply special abilities based on the poker hand combination.
     Returns a dictionary with information about what effects were applied.
+
+    With *expected*, nothing is rolled or applied: "damage_multiplier" is
+    the expected multiplier and "expected" maps "<target>.<kind>" to the
+    expected amount (HP healed, poison per turn, chance of a stun, ...).
+    """
+    entry = HAND_ABILITIES.get(hand_name, _NO_ABILITIES)
+    if expected:
+        return _expected(entry, player, enemy, base_damage)
+
+    effects: List[str] = []
+    result: Dict[str, Any] = {"effects": effects, "damage_multiplier": 1.0}
+    luck = _chance_multiplier(entry, player) if entry.lucky else 1.0
+    amounts: List[float] = []
+    for ability in entry.abilities:
+        if ability.chance < 1.0 and random.random() >= min(ability.chance * luck, 1.0):
+            continue
+        target = enemy if ability.target == 'enemy' else player
+        amount = ability.magnitude(base_damage)
+        amounts.append(amount)
+        message = ability.kind.apply(ability, amount, target, player, enemy, result)
+        if message and not entry.message:
+            effects.append(message)
+    if entry.message:
+        effects.append(entry.message.format(*amounts))
+    return result
+
+
+def _expected(entry: HandAbilities, player: Any, enemy: Any, base_damage: int) -> dict:
+    luck = _chance_multiplier(entry, player)
+    multiplier = 1.0
+    outcome: Dict[str, float] = {}
+    for ability in entry.abilities:
+        chance = min(ability.chance * luck, 1.0)
+        amount = ability.magnitude(base_damage)
+        if ability.kind is DAMAGE_MULTIPLIER:
+            multiplier *= 1.0 + chance * (amount - 1.0)
+            continue
+        target = enemy if ability.target == 'enemy' else player
+        key = f"{ability.target}.{ability.kind.name}"
+        outcome[key] = outcome.get(key, 0.0) + chance * ability.kind.mean(amount, target)
+    return {"effects": [], "damage_multiplier": multiplier, "expected": outcome}
+
+
+def damage_multiplier_outcomes(hand_name: str, player: 'Player') -> list[tuple[float, float]]:
+    """Possible damage multipliers of a hand's ability as (probability, multiplier) pairs.
+
+    Mirrors the multipliers returned by apply_card_combination_abilities
+    without rolling dice or applying any side effect, so callers can predict
+    the damage of a hand before playing it.
     """
-    effects_applied = []
-    
-    # Get the status effect managers
-    player_effects = getattr(player, 'status_effects', None)
-    enemy_effects = getattr(enemy, 'status_effects', None)
-    
-    # Check for Fortune Teller joker (increases chances by 50%)
-    chance_multiplier = 1.0
-    if hasattr(player, 'jokers') and 'fortune_teller' in player.jokers:
-        chance_multiplier = 1.5
-    
-    if hand_name == "High Card":
-        # 30% chance of stunning enemy (affected by Fortune Teller)
-        stun_chance = min(0.3 * chance_multiplier, 1.0)
-        if random.random() < stun_chance:
-            if enemy_effects:
-                enemy_effects.add_effect(StunEffect(), enemy)
-                effects_applied.append("Enemy stunned!")
-    
-    elif hand_name == "Pair":
-        # Heal player
-        heal_amount = base_damage // 2  # Heal for half the damage dealt
-        if player_effects:
-            player_effects.add_effect(HealEffect(heal_amount), player)
-            effects_applied.append(f"Healed for {heal_amount} HP!")
-    
-    elif hand_name == "Two Pair":
-        # 50% chance of twice the damage (affected by Fortune Teller)
-        double_chance = min(0.5 * chance_multiplier, 1.0)
-        if random.random() < double_chance:
-            # This is handled by returning a damage multiplier
-            effects_applied.append("Double damage!")
-            return {"effects": effects_applied, "damage_multiplier": 2.0}
-    
-    elif hand_name == "Three of a Kind":
-        # Tick damage every turn for both enemy and player
-        poison_damage = max(3, base_damage // 10)  # At least 3 damage per turn
-        if enemy_effects:
-            enemy_effects.add_effect(PoisonEffect(poison_damage, 3), enemy)
-        if player_effects:
-            player_effects.add_effect(PoisonEffect(poison_damage // 2, 3), player)  # Less self-damage
-        effects_applied.append(f"Poison applied! ({poison_damage} damage/turn to enemy, {poison_damage//2} to self)")
-    
-    elif hand_name == "Straight":
-        # 30% damage increase buff for next attack
-        if player_effects:
-            player_effects.add_effect(DamageBuffEffect(1.3), player)
-            effects_applied.append("Damage buff for next attack!")
-    
-    elif hand_name == "Flush":
-        # Guard (30 health shield)
-        shield_amount = 30
-        if player_effects:
-            player_effects.add_effect(ShieldEffect(shield_amount), player)
-            effects_applied.append(f"Shield gained ({shield_amount} HP)!")
-    
-    elif hand_name == "Full House":
-        # 30% damage reduction
-        if player_effects:
-            player_effects.add_effect(DamageReductionEffect(0.3), player)
-            effects_applied.append("Damage reduction active!")
-    
-    elif hand_name == "Four of a Kind":
-        # Activate all tarot card abilities on hand
-        activated_items = []
-        if hasattr(player, 'items'):
-            for item in player.items[:]:  # Copy list to avoid modification issues
-                if hasattr(item, 'on_use'):
-                    try:
-                        context = CombatContext(player, enemy)
-                        item.on_use(context)
-                        activated_items.append(str(item))
-                        player.items.remove(item)  # Consume the item
-                    except Exception as e:
-                        print(f"Error applying {item} effect: {e}")
-        if activated_items:
-            effects_applied.append(f"Activated items: {', '.join(activated_items)}")
+    entry = HAND_ABILITIES.get(hand_name, _NO_ABILITIES)
+    luck = _chance_multiplier(entry, player)
+    outcomes: List[Tuple[float, float]] = [(1.0, 1.0)]
+    for ability in entry.abilities:
+        if ability.kind is not DAMAGE_MULTIPLIER:
+            continue
+        chance = min(ability.chance * luck, 1.0)
+        amount = ability.magnitude(0)
+        if chance >= 1.0:
+            outcomes = [(p, m * amount) for p, m in outcomes]
         else:
-            effects_applied.append("No items to activate!")
-    
-    elif hand_name == "Straight Flush":
-        # Discard +1 (increase discard limit)
-        if hasattr(player, 'max_discards'):
-            player.max_discards += 1
-            effects_applied.append("Discard limit increased by 1!")
-    
-    elif hand_name == "Royal Flush":
-        # Multiply attack by 4
-        effects_applied.append("Attack multiplied by 4!")
-        return {"effects": effects_applied, "damage_multiplier": 4.0}
-    
-    # New combinations
-    elif hand_name == "Five of a Kind":
-        # All pair, three of a kind, four of a kind abilities combined
-        # Heal (from Pair)
-        heal_amount = base_damage // 2
-        if player_effects:
-            player_effects.add_effect(HealEffect(heal_amount), player)
-        
-        # Poison (from Three of a Kind)
-        poison_damage = max(3, base_damage // 10)
-        if enemy_effects:
-            enemy_effects.add_effect(PoisonEffect(poison_damage, 3), enemy)
-        if player_effects:
-            player_effects.add_effect(PoisonEffect(poison_damage // 2, 3), player)
-        
-        # Activate all items (from Four of a Kind)
-        activated_items = []
-        if hasattr(player, 'items'):
-            for item in player.items[:]:
-                if hasattr(item, 'on_use'):
-                    try:
-                        # Create a simple combat context for the tarot card
-                        class CombatContext:
-                            def __init__(self, p, e):
-                                self.player = p
-                                self.enemy = e
-                                self.last_hand = ''
-                        
-                        context = CombatContext(player, enemy)
-                        item.on_use(context)
-                        activated_items.append(str(item))
-                        player.items.remove(item)
-                    except Exception as e:
-                        print(f"Error applying {item} effect: {e}")
-        
-        effects_applied.append(f"Combined abilities: Heal ({heal_amount}), Poison ({poison_damage}), Items activated")
-    
-    elif hand_name == "Flush House":
-        # Flush and Full House abilities combined
-        # Shield (from Flush)
-        shield_amount = 30
-        if player_effects:
-            player_effects.add_effect(ShieldEffect(shield_amount), player)
-        
-        # Damage reduction (from Full House)
-        if player_effects:
-            player_effects.add_effect(DamageReductionEffect(0.3), player)
-        
-        effects_applied.append(f"Combined abilities: Shield ({shield_amount}) + Damage Reduction (30%)")
-    
-    elif hand_name == "Flush Five":
-        # Random max health percent damage to enemy (0-20%)
-        if enemy and hasattr(enemy, 'max_hp'):
-            damage_percent = random.uniform(0, 0.20)  # 0-20%
-            bonus_damage = int(enemy.max_hp * damage_percent)
-            enemy.take_damage(bonus_damage)
-            effects_applied.append(f"Bonus max HP damage: {bonus_damage} ({damage_percent*100:.1f}% of max HP)")
-    
-    return {"effects": effects_applied, "damage_multiplier": 1.0}
+            outcomes = ([(p * chance, m * amount) for p, m in outcomes]
+                        + [(p * (1.0 - chance), m) for p, m in outcomes])
+    return outcomes
 
 
 def get_ability_description(hand_name: str) -> str:
     """Get a description of what ability a hand combination provides."""
-    descriptions = {
-        "High Card": "30% chance to stun enemy",
-        "Pair": "Heal for half damage dealt",
-        "Two Pair": "50% chance for double damage",
-        "Three of a Kind": "Poison both players",
-        "Straight": "30% damage buff next attack",
-        "Flush": "30 HP shield",
-        "Full House": "30% damage reduction",
-        "Four of a Kind": "Activate all tarot cards",
-        "Straight Flush": "Discard +1",
-        "Royal Flush": "4x damage multiplier",
-        "Five of a Kind": "Pair + Three of a Kind + Four of a Kind abilities",
-        "Flush House": "Flush + Full House abilities",
-        "Flush Five": "0-20% max HP damage to enemy"
-    }
-    return descriptions.get(hand_name, "No special ability") 
\ No newline at end of file
+    return HAND_ABILITIES.get(hand_name, _NO_ABILITIES).description
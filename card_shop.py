@@ -3,8 +3,7 @@ from __future__ import annotations
 import random
 from typing import List, Callable, Union
 
-from card import Card
-from constants import SUITS, RANKS
+from card import DECK_SIZE, Card
 from tarot import TAROT_DEFINITIONS, TarotCard
 from entities.player import Player
 
@@ -38,9 +37,7 @@ class ShopOffer:
 # ---------------------------------------------------------------------------
 
 def _random_card() -> Card:
-    suit = random.choice(SUITS)
-    rank = random.choice(RANKS)
-    return Card(suit, rank)
+    return Card.from_id(random.randrange(DECK_SIZE))
 
 
 def generate_shop_offers() -> List[ShopOffer]:
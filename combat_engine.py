@@ -0,0 +1,317 @@
+"""Headless combat rules: one fight between the Player and an Enemy.
+
+The engine owns the turn flow that the console loop (game.py), the Ursina
+overlay (ursina_combat.CombatUI) and scripted boss fights share. Callers
+feed it explicit actions and read the resulting phase; nothing here waits
+for input, schedules timers or imports ursina, so fights can be run in
+tight loops for tests and balance jobs.
+
+Phases move SETUP -> PLAYER_TURN -> ENEMY_TURN -> PLAYER_TURN ... until
+VICTORY or DEFEAT. Attacking and ending the turn hand over to the enemy;
+discarding, items and joker abilities keep the turn. With
+``auto_enemy_turn`` (the default) the enemy answers inside step(); UIs that
+animate the wind-up pass False and call enemy_turn() themselves.
+
+With a ``seed`` the engine reseeds the global RNG at the start of combat,
+of every player turn and of every action, so a fight is a pure function
+of its seed and action list no matter what else (animations, the UI)
+draws random numbers in between. replay.py relies on this.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Tuple, Union, TYPE_CHECKING
+
+from events import ActionTaken, CombatEnded, RewardGranted, TurnStarted, listening, publish
+from hand_finder import MAX_SELECTION
+
+if TYPE_CHECKING:
+    from entities.player import Player
+    from entities.enemy import Enemy
+
+
+class Phase(Enum):
+    SETUP = "setup"
+    PLAYER_TURN = "player_turn"
+    ENEMY_TURN = "enemy_turn"
+    VICTORY = "victory"
+    DEFEAT = "defeat"
+
+
+# ---------------------------------------------------------------------------
+# Actions
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Attack:
+    """Play the hand cards at *indices* (1-5 of them)."""
+    indices: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class Discard:
+    """Discard the hand cards at *indices* and redraw (costs one discard)."""
+    indices: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class UseItem:
+    """Use the consumable at *index* in player.items."""
+    index: int
+
+
+@dataclass(frozen=True)
+class EndTurn:
+    """Pass without attacking."""
+
+
+@dataclass(frozen=True)
+class MagicianSwap:
+    """Magician joker: swap the hand card at *index* with the top of the deck."""
+    index: int
+
+
+@dataclass(frozen=True)
+class NecromancerRetrieve:
+    """Necromancer joker: take the discard pile card at *index* back into hand."""
+    index: int
+
+
+@dataclass(frozen=True)
+class Strike:
+    """Deal precomputed *damage* and end the turn (scripted encounters)."""
+    damage: float
+
+
+Action = Union[Attack, Discard, UseItem, EndTurn, MagicianSwap, NecromancerRetrieve, Strike]
+
+
+@dataclass(frozen=True)
+class ActionResult:
+    """What one step() did; damage_taken is filled when the enemy answered."""
+
+    action: Action
+    phase: Phase
+    damage_dealt: float = 0.0
+    hand_type: str | None = None
+    effects: Tuple[str, ...] = ()
+    damage_taken: int = 0
+
+
+def basic_enemy_turn(engine: 'CombatEngine') -> int:
+    """Default enemy behaviour: a plain attack. Returns the HP the player lost."""
+    before = engine.player.hp
+    engine.enemy.attack_player(engine.player)
+    return before - engine.player.hp
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+class CombatEngine:
+    """State machine for a single fight; see the module docstring."""
+
+    def __init__(self, player: 'Player', enemy: 'Enemy', *,
+                 enemy_turn: Callable[['CombatEngine'], int] = basic_enemy_turn,
+                 auto_enemy_turn: bool = True, start: bool = True, seed: int | None = None):
+        self.player = player
+        self.enemy = enemy
+        self.auto_enemy_turn = auto_enemy_turn
+        self._enemy_turn = enemy_turn
+        self.phase = Phase.SETUP
+        self.turn = 0
+        self.seed = seed
+        self._actions = 0  # actions taken this turn, part of the per-action seed
+
+        # Scratch state read and written by tarot effects (see tarot.py)
+        self._tarot_bonus = 0
+        self.last_hand = ''
+
+        if start:
+            self.start()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    @property
+    def finished(self) -> bool:
+        return self.phase in (Phase.VICTORY, Phase.DEFEAT)
+
+    @property
+    def won(self) -> bool:
+        return self.phase is Phase.VICTORY
+
+    def can_discard(self) -> bool:
+        return self.phase is Phase.PLAYER_TURN and self.player.discards_left > 0
+
+    # ------------------------------------------------------------------
+    # Transitions
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self.phase is not Phase.SETUP:
+            raise ValueError("Combat already started")
+        self._reseed()
+        self.player.start_combat()
+        self._begin_player_turn()
+
+    def resume(self) -> None:
+        """Begin turn ``turn + 1`` on state restored between two turns (see replay.py)."""
+        if self.finished:
+            raise ValueError("Combat already finished")
+        self._begin_player_turn()
+
+    def _reseed(self) -> None:
+        if self.seed is not None:
+            random.seed(f"{self.seed}/{self.turn}/{self._actions}")
+
+    def _begin_player_turn(self) -> None:
+        if listening(TurnStarted):
+            publish(TurnStarted(self.turn + 1))
+        self.turn += 1
+        self._actions = 0
+        self._reseed()
+        self.player.start_turn()  # ticks status effects, e.g. poison
+        if not self.player.is_alive():
+            self._finish(False)
+            return
+        self.player.draw_cards()
+        self.phase = Phase.PLAYER_TURN
+
+    def _finish(self, won: bool) -> None:
+        self.phase = Phase.VICTORY if won else Phase.DEFEAT
+        self.player.end_combat()
+        if won:
+            self.player.refresh_deck()
+        self.player.reset_discards()
+        if listening(CombatEnded):
+            publish(CombatEnded(won, self.turn))
+
+    def step(self, action: Action) -> ActionResult:
+        """Apply one player action. Raises ValueError if it is not legal now."""
+        if self.phase is not Phase.PLAYER_TURN:
+            raise ValueError(f"Not the player's turn (phase: {self.phase.value})")
+        if listening(ActionTaken):
+            publish(ActionTaken(action))
+        self._actions += 1
+        self._reseed()
+
+        damage, hand_type, effects = 0.0, None, ()
+        if isinstance(action, Attack):
+            damage, hand_type, effects = self._attack(action.indices)
+        elif isinstance(action, Strike):
+            damage = float(action.damage)
+            self._deal(damage)
+        elif isinstance(action, Discard):
+            self._discard(action.indices)
+        elif isinstance(action, UseItem):
+            self._use_item(action.index)
+        elif isinstance(action, EndTurn):
+            self.player.end_turn()
+            self.phase = Phase.ENEMY_TURN
+        elif isinstance(action, MagicianSwap):
+            if not self.player.magician_swap(action.index):
+                raise ValueError("Magician swap not possible")
+        elif isinstance(action, NecromancerRetrieve):
+            if not self.player.necromancer_retrieve(action.index):
+                raise ValueError("Necromancer retrieve not possible")
+        else:
+            raise ValueError(f"Unknown action: {action!r}")
+
+        taken = 0
+        if self.phase is Phase.ENEMY_TURN and self.auto_enemy_turn:
+            taken = self.enemy_turn()
+        return ActionResult(action, self.phase, damage, hand_type, tuple(effects), taken)
+
+    def enemy_turn(self) -> int:
+        """Resolve the enemy's turn. Returns the HP the player lost."""
+        if self.phase is not Phase.ENEMY_TURN:
+            raise ValueError(f"Not the enemy's turn (phase: {self.phase.value})")
+        taken = self._enemy_turn(self)
+        # Tick after acting so a one-turn stun still costs the enemy this attack
+        self.enemy.start_turn()
+        if not self.player.is_alive():
+            self._finish(False)
+        elif not self.enemy.is_alive():
+            self._finish(True)
+        else:
+            self._begin_player_turn()
+        return taken
+
+    def run(self, policy: Callable[['CombatEngine'], Action], max_turns: int = 200) -> Phase:
+        """Play the fight out with *policy* choosing every action.
+
+        Gives up (returns the current phase) after *max_turns* player turns.
+        """
+        while not self.finished and self.turn <= max_turns:
+            if self.phase is Phase.ENEMY_TURN:
+                self.enemy_turn()
+            else:
+                self.step(policy(self))
+        return self.phase
+
+    # ------------------------------------------------------------------
+    # Action handlers
+    # ------------------------------------------------------------------
+    def _check_indices(self, indices: Tuple[int, ...], limit: int) -> None:
+        if not indices:
+            raise ValueError("No cards selected")
+        if len(indices) > limit or len(set(indices)) != len(indices):
+            raise ValueError(f"Select 1-{limit} distinct cards")
+        if any(not 0 <= i < len(self.player.hand) for i in indices):
+            raise ValueError("Card index out of range")
+
+    def _attack(self, indices: Tuple[int, ...]) -> Tuple[float, str | None, list]:
+        self._check_indices(indices, MAX_SELECTION)
+        damage, hand_type, effects = self.player.form_hand_and_attack(list(indices), enemy=self.enemy)
+        if self._tarot_bonus:
+            damage += self._tarot_bonus
+            self._tarot_bonus = 0
+        self.last_hand = hand_type or ''
+        self._deal(damage)
+        return damage, hand_type, effects
+
+    def _deal(self, damage: float) -> None:
+        self.enemy.take_damage(damage)
+        if self.enemy.is_alive():
+            self.player.end_turn()
+            self.phase = Phase.ENEMY_TURN
+        else:
+            self._finish(True)
+
+    def _discard(self, indices: Tuple[int, ...]) -> None:
+        if self.player.discards_left <= 0:
+            raise ValueError("No discards left")
+        self._check_indices(indices, len(self.player.hand))
+        self.player.discard_cards(list(indices))
+
+    def _use_item(self, index: int) -> None:
+        items = self.player.items
+        if not 0 <= index < len(items):
+            raise ValueError("Item index out of range")
+        item = items[index]
+        on_use = getattr(item, 'on_use', None)
+        if on_use is not None:
+            on_use(self)
+        items.remove(item)
+
+    # ------------------------------------------------------------------
+    # Rewards
+    # ------------------------------------------------------------------
+    def grant_rewards(self) -> Tuple[int, int]:
+        """Pay out gold (Executive: x1.5) and EXP for the fight; returns (gold, exp).
+
+        The jokers' post-combat hooks run afterwards.
+        """
+        gold = random.randint(8, 15)
+        gold = int(gold * self.player.loadout.gold_multiplier)
+        self.player.gold += gold
+
+        exp = random.randint(15, 30)
+        self.player.add_exp(exp)
+        if listening(RewardGranted):
+            publish(RewardGranted(gold, exp))
+        self.player.after_combat(self.won)
+        return gold, exp
@@ -0,0 +1,93 @@
+"""Closed-form joker damage: whole loadouts as per-hand affine maps.
+
+Every built-in joker effect is affine in the incoming damage once the hand
+type and the number of cards played are fixed: ``d * scale + offset``.
+Composing the effects of a compiled loadout (Gemini duplicates included)
+therefore collapses it into one (scale, offset) pair per (hand_type,
+card_count), and the joker stage of an attack becomes a single
+multiply-add. Balance tooling can score a loadout against a whole hand
+distribution from aggregated statistics, without calling Python per card.
+
+Effects that do not publish an ``affine`` form (see jokers.py) make the
+loadout non-affine: it is flagged and damage falls back to the compiled
+JokerPlan. Results equal the sequential evaluation up to float rounding;
+with the built-in integer offsets and 1.5x/3x factors they are exact.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Mapping, Tuple
+
+from card import Card
+from constants import HAND_MULTIPLIERS
+from jokers import JOKER_DEFINITIONS, compile_jokers
+
+# Every hand type classify_selection can report, and selection sizes
+HAND_TYPES: Tuple[str, ...] = tuple(HAND_MULTIPLIERS) + ("Strike",)
+CARD_COUNTS: Tuple[int, ...] = (1, 2, 3, 4, 5)
+
+Affine = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class AffineDamage:
+    """The joker stage of a loadout as (scale, offset) per (hand_type, card_count)."""
+
+    loadout: Tuple[str, ...]
+    table: Dict[Tuple[str, int], Affine]
+    non_affine: Tuple[str, ...]
+
+    @property
+    def is_affine(self) -> bool:
+        return not self.non_affine
+
+    def transform(self, hand_type: str, count: int) -> Affine:
+        """(scale, offset) for one hand type and card count."""
+        if not self.is_affine:
+            raise ValueError(f"Loadout has non-affine jokers: {', '.join(self.non_affine)}")
+        return self.table[(hand_type, count)]
+
+    def damage(self, hand_type: str, count: int, base_damage: float) -> float:
+        scale, offset = self.transform(hand_type, count)
+        return base_damage * scale + offset
+
+    def apply(self, hand: List[Card], base_damage: float, hand_type: str) -> float:
+        """Same contract as JokerPlan.apply; falls back to it when not affine."""
+        if self.is_affine and (hand_type, len(hand)) in self.table:
+            scale, offset = self.table[(hand_type, len(hand))]
+            return base_damage * scale + offset
+        return compile_jokers(self.loadout).apply(hand, base_damage, hand_type)
+
+    def expected_damage(self, stats: Mapping[Tuple[str, int], Tuple[float, float]]) -> float:
+        """Expected joker-stage damage over a hand distribution.
+
+        *stats* maps (hand_type, card_count) to (probability, mean base
+        damage); affinity makes the mean all that is needed.
+        """
+        total = 0.0
+        for key, (probability, mean_base) in stats.items():
+            scale, offset = self.transform(*key)
+            total += probability * (mean_base * scale + offset)
+        return total
+
+
+@lru_cache(maxsize=512)
+def affine_damage(loadout: Tuple[str, ...]) -> AffineDamage:
+    """Compose a loadout (in play order) into an AffineDamage table."""
+    non_affine = tuple(dict.fromkeys(
+        j for j in loadout if j in JOKER_DEFINITIONS and not hasattr(JOKER_DEFINITIONS[j]['effect'], 'affine')
+    ))
+    if non_affine:
+        return AffineDamage(loadout, {}, non_affine)
+
+    forms = [effect.affine for effect in compile_jokers(loadout).effects]
+    table: Dict[Tuple[str, int], Affine] = {}
+    for hand_type in HAND_TYPES:
+        for count in CARD_COUNTS:
+            scale, offset = 1, 0
+            for form in forms:
+                s, o = form(hand_type, count)
+                scale, offset = scale * s, offset * s + o
+            table[(hand_type, count)] = (scale, offset)
+    return AffineDamage(loadout, table, ())
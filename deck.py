@@ -1,23 +1,55 @@
+from __future__ import annotations
+
 import random
-from typing import List
+from typing import Callable, Iterable, List, Sequence, Tuple
 
-from card import Card
-from constants import SUITS, RANKS
+from card import CARD_TABLE, DECK_SIZE, Card, cards_from_ids
+from events import DeckRefreshed, listening, publish
 
 
 class Deck:
-    """Standard 52-card deck with simple draw/shuffle logic."""
+    """Standard 52-card deck with simple draw/shuffle logic.
+
+    Cards live in one list whose end is the top of the deck, so a draw is
+    a pop. Shuffling is lazy: shuffle() only marks the order as random and
+    each draw then swaps a random remaining card to the top before popping
+    it (a partial Fisher-Yates over just the drawn cards). The full shuffle
+    only happens if someone looks at `cards` while it is pending.
+    """
 
     def __init__(self, *, auto_shuffle: bool = True):
-        self.cards: List[Card] = [Card(s, r) for s in SUITS for r in RANKS]
+        self._cards: List[Card] = list(CARD_TABLE)
+        self._shuffle_pending = False
         if auto_shuffle:
             self.shuffle()
 
+    @property
+    def cards(self) -> List[Card]:
+        """Remaining cards, bottom of the deck first (top is the last card)."""
+        if self._shuffle_pending:
+            random.shuffle(self._cards)
+            self._shuffle_pending = False
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards: List[Card]) -> None:
+        self._cards = cards
+        self._shuffle_pending = False
+
+    def unordered(self) -> List[Card]:
+        """Remaining cards in no particular order; leaves a pending shuffle pending."""
+        return self._cards
+
+    @property
+    def shuffle_pending(self) -> bool:
+        """True while the next draws pick random cards rather than the top ones."""
+        return self._shuffle_pending
+
     # ---------------------------------------------------------------------
     # Deck operations
     # ---------------------------------------------------------------------
     def shuffle(self) -> None:
-        random.shuffle(self.cards)
+        self._shuffle_pending = True
 
     def draw(self, count: int = 1) -> List[Card]:
         """Draw up to *count* cards; reshuffle the discard pile if needed.
@@ -25,26 +57,199 @@ class Deck:
         """
         if count <= 0:
             return []
-        actual = min(count, len(self.cards))
+        cards = self._cards
+        actual = min(count, len(cards))
         if actual == 0:
             return []
-        drawn = self.cards[-actual:]
-        self.cards = self.cards[:-actual]
+        if not self._shuffle_pending:
+            drawn = cards[-actual:]
+            del cards[-actual:]
+            return drawn
+        drawn = []
+        for _ in range(actual):
+            j = random.randrange(len(cards))
+            cards[j], cards[-1] = cards[-1], cards[j]
+            drawn.append(cards.pop())
         return drawn
     
+    def draw_ids(self, count: int = 1) -> List[int]:
+        """Like draw, but return the drawn cards as integer ids."""
+        return [card.id for card in self.draw(count)]
+
+    def card_ids(self) -> List[int]:
+        """Integer ids of the remaining cards, bottom of the deck first."""
+        return [card.id for card in self.cards]
+
+    @classmethod
+    def from_ids(cls, card_ids: List[int]) -> 'Deck':
+        """Build an unshuffled deck holding exactly *card_ids* (last id on top)."""
+        deck = cls.__new__(cls)
+        deck.cards = cards_from_ids(card_ids)
+        return deck
+
+    def counts(self) -> Tuple[int, ...]:
+        """Copies of each card id left in the deck (52 slots)."""
+        counts = [0] * DECK_SIZE
+        for card in self._cards:
+            counts[card.id] += 1
+        return tuple(counts)
+
+    def add_card(self, card: Card) -> None:
+        """Put *card* on top of the deck."""
+        self._cards.append(card)
+
+    def sort(self, key: Callable[[Card], object] | None = None) -> None:
+        self.cards.sort(key=key)
+
     def refresh_from_discard(self, discard_pile: List[Card]) -> None:
         """Refresh the deck by adding all cards from the discard pile back and shuffling."""
         if discard_pile:
-            self.cards.extend(discard_pile)
+            self._cards.extend(discard_pile)
             discard_pile.clear()
             self.shuffle()
-            print(f"Deck refreshed with {len(self.cards)} cards")
+            if listening(DeckRefreshed):
+                publish(DeckRefreshed(len(self._cards)))
+
+    # ------------------------------------------------------------------
+    # Utility dunder methods
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"Deck({len(self._cards)} cards remaining)"
+
+
+class MultisetDeck:
+    """Count-based deck for large or duplicate-heavy custom decks.
+
+    Only the number of copies of each of the 52 card ids is stored, so
+    memory does not grow with deck size. The deck has no order: every draw
+    picks a card with probability proportional to its remaining copies
+    (the same distribution as drawing from a shuffled Deck). A Fenwick tree
+    over the counts makes each draw O(log 52) however many cards are left.
+    Drop-in compatible with Deck; `cards` materialises a list on demand.
+    """
+
+    # Largest power of two <= DECK_SIZE, where the Fenwick descent starts
+    _TOP_BIT = 1 << (DECK_SIZE.bit_length() - 1)
+
+    def __init__(self, counts: Sequence[int] | None = None):
+        if counts is None:
+            counts = (1,) * DECK_SIZE
+        self._set_counts(counts)
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Card]) -> 'MultisetDeck':
+        return cls.from_ids(card.id for card in cards)
+
+    @classmethod
+    def from_ids(cls, card_ids: Iterable[int]) -> 'MultisetDeck':
+        counts = [0] * DECK_SIZE
+        for card_id in card_ids:
+            counts[card_id] += 1
+        return cls(counts)
+
+    def _set_counts(self, counts: Sequence[int]) -> None:
+        if len(counts) != DECK_SIZE:
+            raise ValueError(f"Expected {DECK_SIZE} counts, got {len(counts)}")
+        if any(c < 0 for c in counts):
+            raise ValueError("Card counts must be non-negative")
+        self._counts = list(counts)
+        self._total = sum(counts)
+        # 1-based Fenwick tree built in O(52)
+        tree = [0] + self._counts
+        for i in range(1, DECK_SIZE + 1):
+            parent = i + (i & -i)
+            if parent <= DECK_SIZE:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _update(self, card_id: int, delta: int) -> None:
+        self._counts[card_id] += delta
+        self._total += delta
+        tree = self._tree
+        i = card_id + 1
+        while i <= DECK_SIZE:
+            tree[i] += delta
+            i += i & -i
+
+    def _find(self, target: int) -> int:
+        """Card id whose cumulative count range contains *target* (0-based)."""
+        tree = self._tree
+        pos = 0
+        step = self._TOP_BIT
+        while step:
+            nxt = pos + step
+            if nxt <= DECK_SIZE and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+    # ---------------------------------------------------------------------
+    # Deck-compatible views
+    # ---------------------------------------------------------------------
+    @property
+    def cards(self) -> List[Card]:
+        """A fresh list of the remaining cards in id order (O(deck size))."""
+        return [CARD_TABLE[i] for i, count in enumerate(self._counts) for _ in range(count)]
+
+    @cards.setter
+    def cards(self, cards: Iterable[Card]) -> None:
+        counts = [0] * DECK_SIZE
+        for card in cards:
+            counts[card.id] += 1
+        self._set_counts(counts)
+
+    def unordered(self) -> List[Card]:
+        return self.cards
+
+    def counts(self) -> Tuple[int, ...]:
+        """Copies of each card id left in the deck (52 slots)."""
+        return tuple(self._counts)
+
+    def card_ids(self) -> List[int]:
+        return [i for i, count in enumerate(self._counts) for _ in range(count)]
+
+    # ---------------------------------------------------------------------
+    # Deck operations
+    # ---------------------------------------------------------------------
+    def shuffle(self) -> None:
+        """No-op: draws are always random."""
+
+    def sort(self, key: Callable[[Card], object] | None = None) -> None:
+        """No-op: the deck has no order to sort."""
+
+    def draw_ids(self, count: int = 1) -> List[int]:
+        """Draw up to *count* card ids, weighted by remaining copies."""
+        drawn: List[int] = []
+        for _ in range(min(count, self._total)):
+            card_id = self._find(random.randrange(self._total))
+            self._update(card_id, -1)
+            drawn.append(card_id)
+        return drawn
+
+    def draw(self, count: int = 1) -> List[Card]:
+        return cards_from_ids(self.draw_ids(count))
+
+    def add_card(self, card: Card, copies: int = 1) -> None:
+        self._update(card.id, copies)
+
+    def refresh_from_discard(self, discard_pile: List[Card]) -> None:
+        """Return the discard pile to the deck."""
+        if discard_pile:
+            for card in discard_pile:
+                self._update(card.id, 1)
+            discard_pile.clear()
+            if listening(DeckRefreshed):
+                publish(DeckRefreshed(self._total))
 
     # ------------------------------------------------------------------
     # Utility dunder methods
     # ------------------------------------------------------------------
     def __len__(self) -> int:
-        return len(self.cards)
+        return self._total
 
     def __repr__(self) -> str:  # pragma: no cover
-        return f"Deck({len(self.cards)} cards remaining)" 
\ No newline at end of file
+        return f"MultisetDeck({self._total} cards remaining)"
@@ -0,0 +1,465 @@
+"""Exact draw odds for the discard decision.
+
+After a discard the hand is refilled from the remaining deck. This module
+computes the exact probability of each final hand category (the best
+5-card hand inside the refilled hand) without sampling.
+
+The draw is a multivariate hypergeometric experiment over the 52 card ids
+(custom decks may hold duplicates, so every id has a count). A dynamic
+program walks the ranks A, 2, ..., K, A once, choosing how many copies of
+each rank are drawn and weighting every choice by binomial coefficients.
+Its state only keeps what decides the category: the two largest rank
+counts, the current straight run and, for a *tracked* suit, that suit's
+card count, straight-flush run and per-card duplicates.
+
+Rank-only categories need no suit information at all. For flushes, one
+suit at a time is tracked: a hand of at most 9 cards can hold five cards of
+only one suit, so those per-suit events are disjoint and combine exactly.
+Bigger hands (several Fool jokers) track all four suits at once, which is
+exact but slower.
+
+Single queries are cached on (kept cards, deck composition, draws). The
+discard advisor scores all 256 subsets of an 8-card hand in one pass that
+carries a keep mask in the DP state, so subsets share every rank they agree
+on. Within a rank, subsets that keep as many cards (and as many of the
+tracked suit) share one state as well. That table is cached on the hand's
+cards, in id order, and the deck composition, so re-sorting the hand does
+not recompute it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations, product
+from math import comb
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from card import DECK_SIZE, Card
+from constants import HAND_MULTIPLIERS, RANKS, SUITS
+from hand_evaluator import HAND_INDEX, HAND_RANKING
+
+if TYPE_CHECKING:
+    from entities.player import Player
+
+
+_RANK_COUNT = len(RANKS)
+_ACE = _RANK_COUNT - 1
+# Ace first (low end of the wheel); it closes the A-high straight at the end
+_RANK_ORDER = (_ACE,) + tuple(range(_ACE))
+
+_MAX_DISJOINT_HAND = 9  # largest hand where two suits cannot both hold five cards
+
+_FIVE_KIND = HAND_INDEX["Five of a Kind"]
+_FOUR_KIND = HAND_INDEX["Four of a Kind"]
+_FULL_HOUSE = HAND_INDEX["Full House"]
+_STRAIGHT = HAND_INDEX["Straight"]
+_THREE_KIND = HAND_INDEX["Three of a Kind"]
+_TWO_PAIR = HAND_INDEX["Two Pair"]
+_PAIR = HAND_INDEX["Pair"]
+_HIGH_CARD = HAND_INDEX["High Card"]
+_FLUSH_FIVE = HAND_INDEX["Flush Five"]
+_ROYAL_FLUSH = HAND_INDEX["Royal Flush"]
+_STRAIGHT_FLUSH = HAND_INDEX["Straight Flush"]
+_FLUSH_HOUSE = HAND_INDEX["Flush House"]
+_FLUSH = HAND_INDEX["Flush"]
+
+# Rank feature: (top count, second count, straight run, straight found, ace held)
+_RankFeature = Tuple[int, int, int, bool, bool]
+_EMPTY_RANK: _RankFeature = (0, 0, 0, False, False)
+
+# Tracked suit feature: (cards, run, straight flush found, ace held, top dup, second dup)
+_SuitFeature = Tuple[int, int, bool, bool, int, int]
+_EMPTY_SUIT: _SuitFeature = (0, 0, False, False, 0, 0)
+
+# DP outcome: (rank-only category, category of each tracked suit or None)
+_Outcome = Tuple[int, Tuple[Optional[int], ...]]
+
+
+# ---------------------------------------------------------------------------
+# Category rules
+# ---------------------------------------------------------------------------
+
+def _push_count(top: int, second: int, count: int) -> Tuple[int, int]:
+    """Fold *count* into the (largest, second largest) pair, capped at (5, 2).
+
+    A single card never decides a category, so counts below two are left
+    out and hands that differ only in singletons share a state.
+    """
+    if count < 2:
+        return top, second
+    if count > top:
+        return min(count, 5), min(top, 2)
+    return top, max(second, min(count, 2))
+
+
+def _advance_run(run: int, found: bool, present: bool) -> Tuple[int, bool]:
+    if not present:
+        return 0, found
+    run += 1
+    return min(run, 4), found or run >= 5
+
+
+def _settle_run(run: int, ace: bool, left: int) -> Tuple[int, bool]:
+    """Forget a run (and the ace that would close it) that *left* more ranks cannot make five."""
+    if run + left + ace < 5:
+        return 0, False
+    return run, ace
+
+
+def _rank_category(feature: _RankFeature) -> int:
+    top, second, run, straight, ace = feature
+    if top >= 5:
+        return _FIVE_KIND
+    if top == 4:
+        return _FOUR_KIND
+    if top == 3 and second >= 2:
+        return _FULL_HOUSE
+    if straight or (run >= 4 and ace):
+        return _STRAIGHT
+    if top == 3:
+        return _THREE_KIND
+    if top == 2:
+        return _TWO_PAIR if second >= 2 else _PAIR
+    return _HIGH_CARD
+
+
+def _suit_category(feature: _SuitFeature) -> Optional[int]:
+    if feature[0] < 5:
+        return None
+    cards, run, straight_flush, ace, top, second = feature
+    if top >= 5:
+        return _FLUSH_FIVE
+    best = _FLUSH
+    if straight_flush:
+        best = _STRAIGHT_FLUSH
+    if top >= 3 and second >= 2:
+        best = max(best, _FLUSH_HOUSE)
+    if run >= 4 and ace:
+        best = max(best, _ROYAL_FLUSH)
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Dynamic program
+# ---------------------------------------------------------------------------
+
+def _rank_step(feature: _RankFeature, count: int, first: bool, left: int) -> _RankFeature:
+    top, second, run, straight, ace = feature
+    top, second = _push_count(top, second, count)
+    if first:
+        run, ace = (1 if count else 0), count > 0
+    else:
+        run, straight = _advance_run(run, straight, count > 0)
+    run, ace = _settle_run(run, ace, left)
+    # Drop what can no longer change the category so equal states merge
+    if top >= 4 or (top == 3 and second >= 2):
+        second = second if top == 3 else 0
+        run, straight, ace = 0, False, False
+    elif straight:
+        run, ace = 0, False
+    return top, second, run, straight, ace
+
+
+def _suit_step(feature: _SuitFeature, held: int, first: bool, left: int) -> _SuitFeature:
+    cards, run, straight_flush, ace, top, second = feature
+    cards = min(cards + held, 5)
+    top, second = _push_count(top, second, held)
+    if first:
+        run, ace = (1 if held else 0), held > 0
+    else:
+        run, straight_flush = _advance_run(run, straight_flush, held > 0)
+    run, ace = _settle_run(run, ace, left)
+    if top >= 5:
+        return 5, 0, False, False, 5, 0  # Flush Five beats everything
+    return cards, run, straight_flush, ace, top, second
+
+
+class _Transitions:
+    """Interned joint features (rank feature, tracked suit features...).
+
+    Successors are memoised per feature id and per option code (which
+    includes the ranks left), so the DP only computes each feature once.
+    """
+
+    def __init__(self, tracked: int):
+        self.ids: Dict[tuple, int] = {}
+        self.features: List[tuple] = []
+        self.rows: List[Dict[int, int]] = []
+        self.empty = self.intern((_EMPTY_RANK,) + (_EMPTY_SUIT,) * tracked)
+        self.first_row: Dict[int, int] = {}
+
+    def intern(self, feature: tuple) -> int:
+        fid = self.ids.get(feature)
+        if fid is None:
+            fid = self.ids[feature] = len(self.features)
+            self.features.append(feature)
+            self.rows.append({})
+        return fid
+
+    def successor(self, fid: int, first: bool, left: int, code: int, rank_count: int,
+                  held: Tuple[int, ...]) -> int:
+        feature = self.features[fid]
+        nxt = (_rank_step(feature[0], rank_count, first, left),)
+        nxt += tuple(_suit_step(f, h, first, left) for f, h in zip(feature[1:], held))
+        nid = self.intern(nxt)
+        (self.first_row if first else self.rows[fid])[code] = nid
+        return nid
+
+
+_TRANSITIONS: Dict[int, _Transitions] = {}
+
+# Packed DP state: keep mask | cards in hand (8 bits) | joint feature id (24 bits)
+_FEATURE_BITS = 24
+_FEATURE_MASK = (1 << _FEATURE_BITS) - 1
+_CARDS_MASK = 0xFF
+_MASK_SHIFT = _FEATURE_BITS + 8
+
+
+def _run_dp(fixed: Tuple[int, ...], optional: Tuple[int, ...], deck: Tuple[int, ...], base_draws: int,
+            tracked: Tuple[int, ...], flush_only: bool = False) -> Dict[int, Dict[_Outcome, int]]:
+    """Count draws by (rank category, category of each tracked suit).
+
+    *fixed* (counts per card id) always stays in hand. Each card id in
+    *optional* is either kept or discarded, and every discard adds a draw
+    on top of *base_draws*. Results are keyed by keep mask (bit i set when
+    optional[i] is kept), so all discard choices share one pass.
+
+    Weights are integers: the number of equally likely draws leading to
+    each outcome. With *flush_only* (one tracked suit) only draws where that
+    suit ends with five or more cards are counted.
+    """
+    table = _TRANSITIONS.get(len(tracked))
+    if table is None:
+        table = _TRANSITIONS[len(tracked)] = _Transitions(len(tracked))
+    features, rows = table.features, table.rows
+    suits = range(len(SUITS))
+    untracked = [s for s in suits if s not in tracked]
+    max_cards = sum(fixed) + base_draws + len(optional)
+
+    # Flush suit cards that may still join the hand after each step (from hand or deck)
+    later_left = [0] * (len(_RANK_ORDER) + 1)
+    if flush_only:
+        (suit,) = tracked
+        for step in range(len(_RANK_ORDER) - 1, -1, -1):
+            card_id = suit * _RANK_COUNT + _RANK_ORDER[step]
+            later_left[step] = later_left[step + 1] + fixed[card_id] + optional.count(card_id) + deck[card_id]
+
+    # state: keep mask, cards in hand and joint feature id packed into one int
+    states: Dict[int, int] = {table.empty: 1}
+    canonical: List[Tuple[List[int], Dict[Tuple[int, Tuple[int, ...]], int]]] = []
+    for step, rank in enumerate(_RANK_ORDER):
+        first = step == 0
+        left = len(_RANK_ORDER) - 1 - step
+        fixed_rank = sum(fixed[s * _RANK_COUNT + rank] for s in suits)
+        pool = sum(deck[s * _RANK_COUNT + rank] for s in untracked)
+        suit_ids = [s * _RANK_COUNT + rank for s in tracked]
+        later = later_left[step + 1]
+
+        # Which optional cards of this rank stay: (mask bits, cards kept, kept per tracked suit).
+        # Choices keeping as many cards, and as many of each tracked suit, lead to the
+        # same outcomes, so only the first is carried and the rest share its results.
+        positions = [i for i, card_id in enumerate(optional) if card_id % _RANK_COUNT == rank]
+        if positions:
+            choices = {}
+            for size in range(len(positions) + 1):
+                for chosen in combinations(positions, size):
+                    by_suit = tuple(sum(1 for i in chosen if optional[i] // _RANK_COUNT == s) for s in tracked)
+                    choices.setdefault((size, by_suit), sum(1 << i for i in chosen))
+            canonical.append((positions, choices))
+            keeps = [(bits << _MASK_SHIFT, size, by_suit) for (size, by_suit), bits in choices.items()]
+        else:
+            keeps = [(0, 0, (0,) * len(tracked))]
+
+        # Every way to draw this rank: (drawn, per tracked suit drawn, weight)
+        draws = []
+        for picks in product(*(range(deck[i] + 1) for i in suit_ids)):
+            weight = 1
+            for i, a in zip(suit_ids, picks):
+                weight *= comb(deck[i], a)
+            for b in range(pool + 1):
+                draws.append((sum(picks) + b, picks, weight * comb(pool, b)))
+
+        # Options: (mask bits, cards added, packed cards, successor code, rank count, suit counts, weight)
+        options = []
+        for bits, kept, by_suit in keeps:
+            for taken, picks, weight in draws:
+                rank_count = min(fixed_rank + kept + taken, 5)
+                held = tuple(min(fixed[i] + k + a, 5) for i, k, a in zip(suit_ids, by_suit, picks))
+                code = left * 6 + rank_count
+                for h in held:
+                    code = code * 6 + h
+                added = kept + taken
+                options.append((bits, added, (fixed_rank + added) << _FEATURE_BITS, code, rank_count, held, weight))
+
+        # A feature's moves are resolved once per step: (cards needed, packed addend, weight).
+        # Cards needed is what the option adds plus, in a flush pass, the suit cards still
+        # missing; sorted by it, a state stops at the first move its room cannot take.
+        moves_by_fid: Dict[int, List[Tuple[int, int, int]]] = {}
+        nxt: Dict[int, int] = {}
+        for state, count in states.items():
+            fid = state & _FEATURE_MASK
+            moves = moves_by_fid.get(fid)
+            if moves is None:
+                moves = moves_by_fid[fid] = []
+                row = table.first_row if first else rows[fid]
+                for bits, added, packed, code, rank_count, held, weight in options:
+                    nid = row.get(code)
+                    if nid is None:
+                        nid = table.successor(fid, first, left, code, rank_count, held)
+                    needed = added
+                    if flush_only:
+                        missing = 5 - features[nid][1][0]
+                        if missing > later:
+                            continue  # five flush suit cards are out of reach
+                        needed += max(missing, 0)
+                    moves.append((needed, bits + packed + nid, weight))
+                moves.sort()
+            room = max_cards - fixed_rank - ((state >> _FEATURE_BITS) & _CARDS_MASK)
+            base = state - fid
+            for needed, addend, weight in moves:
+                if needed > room:
+                    break
+                key = base + addend
+                nxt[key] = nxt.get(key, 0) + count * weight
+        states = nxt
+
+    deck_size, fixed_size = sum(deck), sum(fixed)
+    results: Dict[int, Dict[_Outcome, int]] = {}
+    for state, count in states.items():
+        mask = state >> _MASK_SHIFT
+        kept = mask.bit_count()
+        drawn = ((state >> _FEATURE_BITS) & _CARDS_MASK) - fixed_size - kept
+        if drawn != min(base_draws + len(optional) - kept, deck_size):
+            continue
+        feature = features[state & _FEATURE_MASK]
+        key = (_rank_category(feature[0]), tuple(_suit_category(f) for f in feature[1:]))
+        outcomes = results.setdefault(mask, {})
+        outcomes[key] = outcomes.get(key, 0) + count
+
+    # Every keep mask reads the results of the choices carried in its place
+    for mask in range(1 << len(optional)):
+        carried = 0
+        for positions, choices in canonical:
+            chosen = [i for i in positions if mask >> i & 1]
+            by_suit = tuple(sum(1 for i in chosen if optional[i] // _RANK_COUNT == s) for s in tracked)
+            carried |= choices[len(chosen), by_suit]
+        if carried != mask and carried in results:
+            results[mask] = results[carried]
+    return results
+
+
+def _odds_by_mask(fixed: Tuple[int, ...], optional: Tuple[int, ...], deck: Tuple[int, ...],
+                  base_draws: int) -> Dict[int, Tuple[float, ...]]:
+    """Probability of every HAND_RANKING category for each keep mask."""
+    weights: Dict[int, List[int]] = {}
+
+    if sum(fixed) + base_draws + len(optional) > _MAX_DISJOINT_HAND:
+        everything = tuple(range(len(SUITS)))
+        for mask, outcomes in _run_dp(fixed, optional, deck, base_draws, everything).items():
+            row = weights[mask] = [0] * len(HAND_RANKING)
+            for (rank_cat, suit_cats), count in outcomes.items():
+                row[max([rank_cat] + [c for c in suit_cats if c is not None])] += count
+    else:
+        for mask, outcomes in _run_dp(fixed, optional, deck, base_draws, ()).items():
+            row = weights[mask] = [0] * len(HAND_RANKING)
+            for (rank_cat, _), count in outcomes.items():
+                row[rank_cat] += count
+        # Swap in the flush outcome wherever one suit holds five cards
+        for suit in range(len(SUITS)):
+            for mask, outcomes in _run_dp(fixed, optional, deck, base_draws, (suit,), flush_only=True).items():
+                row = weights[mask]
+                for (rank_cat, (suit_cat,)), count in outcomes.items():
+                    if suit_cat is None:
+                        continue
+                    row[rank_cat] -= count
+                    row[max(rank_cat, suit_cat)] += count
+
+    deck_size = sum(deck)
+    odds: Dict[int, Tuple[float, ...]] = {}
+    for mask, row in weights.items():
+        total = comb(deck_size, min(base_draws + len(optional) - mask.bit_count(), deck_size))
+        odds[mask] = tuple(w / total for w in row)
+    return odds
+
+
+@lru_cache(maxsize=4096)
+def _category_odds(kept: Tuple[int, ...], deck: Tuple[int, ...], draws: int) -> Tuple[float, ...]:
+    """Odds for one kept hand, from card-id count vectors."""
+    return _odds_by_mask(kept, (), deck, draws)[0]
+
+
+@lru_cache(maxsize=256)
+def _discard_table(hand: Tuple[int, ...], deck: Tuple[int, ...]) -> Dict[int, Tuple[float, ...]]:
+    """Odds for every keep mask over *hand* (sorted card ids); discards are refilled."""
+    return _odds_by_mask((0,) * DECK_SIZE, hand, deck, 0)
+
+
+def _counts(cards: Iterable[Card]) -> Tuple[int, ...]:
+    counts = [0] * DECK_SIZE
+    for card in cards:
+        counts[card.id] += 1
+    return tuple(counts)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class DiscardAdvice:
+    """Outcome distribution of discarding the cards at *indices*."""
+
+    indices: Tuple[int, ...]
+    odds: Dict[str, float]
+    expected_multiplier: float
+
+
+def hand_odds(kept: Sequence[Card], deck: Sequence[Card], draws: int) -> Dict[str, float]:
+    """Exact probability of each final hand category.
+
+    *kept* stays in hand, then *draws* cards are drawn at random from *deck*.
+    Categories that cannot happen are left out.
+    """
+    return _named(_category_odds(_counts(kept), _counts(deck), draws))
+
+
+def _named(probabilities: Tuple[float, ...]) -> Dict[str, float]:
+    return {HAND_RANKING[i]: p for i, p in enumerate(probabilities) if p > 0}
+
+
+def discard_odds(player: 'Player', indices: Sequence[int]) -> Dict[str, float]:
+    """Odds after Player.discard_cards(indices), including the Echo Mage clone."""
+    chosen = {i for i in indices if 0 <= i < len(player.hand)}
+    kept = [card for i, card in enumerate(player.hand) if i not in chosen]
+    draws = len(chosen)
+    if draws == 1 and 'echo_mage' in player.jokers:
+        # The discarded card comes straight back and nothing is drawn
+        return _named(_category_odds(_counts(player.hand), player.deck.counts(), 0))
+    return _named(_category_odds(_counts(kept), player.deck.counts(), draws))
+
+
+def advise_discards(player: 'Player', top_k: int | None = None) -> List[DiscardAdvice]:
+    """Score every discard subset of the hand by expected hand multiplier.
+
+    All subsets come out of a single shared pass. The empty discard (keep
+    the hand) is included for comparison. Results are sorted best first;
+    ties prefer discarding fewer cards.
+
+    A fresh hand takes a noticeable fraction of a second; callers on a
+    frame loop should run this off it.
+    """
+    order = sorted(range(len(player.hand)), key=lambda i: player.hand[i].id)
+    table = _discard_table(tuple(player.hand[i].id for i in order), player.deck.counts())
+    bit = {i: 1 << slot for slot, i in enumerate(order)}  # hand index -> keep mask bit
+    everything = (1 << len(order)) - 1
+    advice: List[DiscardAdvice] = []
+    for size in range(len(order) + 1):
+        for indices in combinations(range(len(order)), size):
+            if size == 1 and 'echo_mage' in player.jokers:
+                odds = discard_odds(player, indices)
+            else:
+                odds = _named(table[everything & ~sum(bit[i] for i in indices)])
+            expected = sum(p * HAND_MULTIPLIERS[name] for name, p in odds.items())
+            advice.append(DiscardAdvice(indices, odds, expected))
+    advice.sort(key=lambda a: (-a.expected_multiplier, len(a.indices)))
+    return advice if top_k is None else advice[:top_k]
@@ -1,3 +1,4 @@
+from events import DamageDealt, EnemyAttacked, listening, publish
 from status_effects import StatusEffectManager, StunEffect
 
 
@@ -22,19 +23,22 @@ class Enemy:
         actual_damage = self.status_effects.modify_incoming_damage(int(dmg))
         actual_damage = max(0, actual_damage - self.defense)
         self.hp = max(0, self.hp - actual_damage)
-        print(f"{self.name} took {actual_damage} damage. HP {self.hp}/{self.max_hp}")
+        if listening(DamageDealt):
+            publish(DamageDealt(self.name, actual_damage, self.hp, self.max_hp))
 
     def attack_player(self, player: 'Player') -> bool:  # type: ignore
         """Attack the player. Returns True if attack was successful, False if stunned."""
         # Check if stunned
         if self.status_effects.has_effect(StunEffect):
-            print(f"{self.name} is stunned and cannot attack!")
+            if listening(EnemyAttacked):
+                publish(EnemyAttacked(self.name, 0, stunned=True))
             return False
         
         # Apply damage buffs if any
         damage = self.status_effects.modify_outgoing_damage(self.attack_value)
         
-        print(f"{self.name} attacks for {damage}!")
+        if listening(EnemyAttacked):
+            publish(EnemyAttacked(self.name, damage))
         player.take_damage(damage)
         return True
     
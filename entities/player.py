@@ -2,24 +2,34 @@ from __future__ import annotations
 
 from typing import List, TYPE_CHECKING
 
-from deck import Deck
-from card import Card
-from constants import HAND_MULTIPLIERS
-from poker import get_poker_hand, hand_multiplier
-from jokers import apply_jokers
-from meta import load_meta  # local import to avoid circular in UI
+from deck import Deck, MultisetDeck
+from card import CARD_TABLE, Card
+from poker import classify_selection
+from jokers import JokerLoadout, JokerPlan, compile_loadout, consume_jokers
+from meta import current_meta
 from status_effects import StatusEffectManager
+from events import (CardsDiscarded, CardsDrawn, DamageDealt, HandPlayed, listening, notice,
+                    publish)
 
 if TYPE_CHECKING:
     from tarot import TarotCard
 
 
+# Deck sort order by card id: suit (Clubs, Diamonds, Hearts, Spades), then rank
+_SUIT_ORDER = {'Clubs': 0, 'Diamonds': 1, 'Hearts': 2, 'Spades': 3}
+_DECK_SORT_KEYS = tuple((_SUIT_ORDER[card.suit], card.value) for card in CARD_TABLE)
+
+# Executioner's required hand is drawn from these at the start of each combat
+EXECUTIONER_HANDS = (
+    "High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush",
+)
+
 class Player:
     """Represents the player and their combat resources."""
 
-    def __init__(self):
-        meta = load_meta()
-        bonus = meta.get('permanent_hp_bonus', 0)
+    def __init__(self, deck: Deck | MultisetDeck | None = None):
+        bonus = current_meta().get('permanent_hp_bonus', 0)  # cached: no I/O per player
         self.max_hp: int = 100 + bonus
         self.hp: int = self.max_hp
         self.gold: int = 20
@@ -34,7 +44,7 @@ class Player:
         self.activated_checkpoints: list[tuple[float, float, float]] = []
         self.respawn_position: tuple[float, float, float] | None = None
 
-        self.deck: Deck = Deck()
+        self.deck: Deck | MultisetDeck = deck if deck is not None else Deck()
         self.discard_pile: List[Card] = []
         self.hand: List[Card] = []
         self.hand_size: int = 8
@@ -44,6 +54,7 @@ class Player:
         self.discards_left: int = self.max_discards
 
         # Jokers held represented by their type key (matching jokers.JOKER_DEFINITIONS)
+        self._loadout: JokerLoadout | None = None  # compiled from jokers, see loadout
         self.jokers: List[str] = []
         self.max_jokers: int = 5
 
@@ -66,14 +77,16 @@ class Player:
         """Draw cards into hand.
 
         If *count* is None we top-up the hand so that its final size equals
-        `hand_size` (+ any extras from "The Fool" jokers) instead of always
+        `hand_size` (+ extras from jokers such as "The Fool") instead of always
         adding a full hand_size every time. This prevents hand overflow after
         consecutive draw phases in the same turn cycle (issue observed in
         Ursina/Pygame UI where hand exceeded 8 cards)."""
 
         if count is None:
-            # Extra draws from "The Fool" jokers
-            extra = self.jokers.count('fool') * 1  # each Fool gives +1
+            loadout = self.loadout
+            extra = loadout.extra_draw
+            for hook in loadout.on_draw:
+                extra += hook(self)
             desired = self.hand_size + extra
             count = max(0, desired - len(self.hand))
 
@@ -83,15 +96,18 @@ class Player:
         
         new_cards = self.deck.draw(count)
         self.hand.extend(new_cards)
+        if listening(CardsDrawn):
+            publish(CardsDrawn(len(new_cards), len(self.hand), len(self.deck),
+                               tuple(card.id for card in new_cards)))
 
     def discard_cards(self, indices: List[int]) -> List[Card]:
         """Discard cards at given indices, return the discarded cards."""
         if self.discards_left <= 0:
-            print("No discards remaining!")
+            notice("No discards remaining!")
             return []
         
         if len(indices) == 0:
-            print("No cards selected for discard.")
+            notice("No cards selected for discard.")
             return []
         
         self.discards_left -= 1
@@ -102,25 +118,21 @@ class Player:
                 self.discard_pile.append(card)
                 discarded.append(card)
         
-        # Echo Mage joker: if discarding exactly one card, add a copy to hand
-        if len(discarded) == 1 and 'echo_mage' in self.jokers:
-            cloned_card = discarded[0]  # Create a reference to the same card
-            self.hand.append(cloned_card)
-            print(f"Echo Mage cloned {cloned_card}!")
-            # Refill hand with one less card since we added a clone
-            self.draw_cards(len(discarded) - 1)
-        else:
-            # Refill hand normally
-            self.draw_cards(len(discarded))
+        # Jokers may put cards back (Echo Mage); refill the rest
+        returned = 0
+        for hook in self.loadout.on_discard:
+            returned += hook(self, discarded)
+        self.draw_cards(len(discarded) - returned)
         
-        print(f"Discarded {len(discarded)} card(s). {self.discards_left} discards left.")
+        if listening(CardsDiscarded):
+            publish(CardsDiscarded(len(discarded), self.discards_left))
         return discarded
     
     def refresh_deck(self) -> None:
         """Refresh the deck by adding all discarded cards back and shuffling."""
         if self.discard_pile:
             self.deck.refresh_from_discard(self.discard_pile)
-            print("Your deck has been refreshed!")
+            notice("Your deck has been refreshed!")
     
     def reset_discards(self) -> None:
         """Reset the discard count for a new combat."""
@@ -128,25 +140,11 @@ class Player:
     
     def sort_deck(self) -> None:
         """Sort the deck cards by suit (Clubs, Diamonds, Hearts, Spades) then by rank"""
-        # Define suit order: Clubs, Diamonds, Hearts, Spades
-        suit_order = {'♣': 0, 'Clubs': 0, '♦': 1, 'Diamonds': 1, 
-                     '♥': 2, 'Hearts': 2, '♠': 3, 'Spades': 3}
-        
-        # Define rank order using CARD_VALUES from constants
-        from constants import CARD_VALUES
-        
-        def card_sort_key(card):
-            # Get suit priority (0-3)
-            suit_priority = suit_order.get(card.suit, 999)  # 999 for unknown suits
-            # Get rank priority (2-14)
-            rank_priority = CARD_VALUES.get(card.rank, 0)
-            return (suit_priority, rank_priority)
-        
-        self.deck.cards.sort(key=card_sort_key)
+        self.deck.sort(key=lambda card: _DECK_SORT_KEYS[card.id])
     
     def add_card_to_deck(self, card: Card) -> None:
         """Add a card to the deck and maintain sorted order"""
-        self.deck.cards.append(card)
+        self.deck.add_card(Card.from_id(card.id))
         self.sort_deck()
 
     # ------------------------------------------------------------------
@@ -155,60 +153,29 @@ class Player:
     def form_hand_and_attack(self, indices: List[int], enemy=None) -> tuple[float, str | None, List[str]]:
         """Form a hand and attack, applying card abilities. Returns (damage, hand_type, effects)."""
         if not indices:
-            print("No cards selected.")
+            notice("No cards selected.")
             return 0.0, None, []
         if any(i >= len(self.hand) or i < 0 for i in indices):
-            print("Invalid card index in selection.")
+            notice("Invalid card index in selection.")
             return 0.0, None, []
 
         selected = [self.hand[i] for i in indices]
-        if len(indices) == 5:
-            hand_type, _ = get_poker_hand(selected)
-            if hand_type == "Invalid Hand":
-                hand_type = "Strike"
-                mult = 1
-            else:
-                mult = hand_multiplier(hand_type)
-        else:
-            # Detect partial combinations for 2–4 card selections
-            values = [c.value for c in selected]
-            rank_counts: dict[int, int] = {}
-            for v in values:
-                rank_counts[v] = rank_counts.get(v, 0) + 1
-            counts = sorted(rank_counts.values(), reverse=True)
-
-            if counts == [4]:
-                hand_type = "Four of a Kind"
-            elif counts == [3, 1]:
-                hand_type = "Three of a Kind"
-            elif counts == [2, 2]:
-                hand_type = "Two Pair"
-            elif counts == [2, 1] or counts == [2]:
-                hand_type = "Pair"
-            elif len(selected) == 1 or counts == [1]:
-                hand_type = "High Card"
-            else:
-                hand_type = "Strike"
-
-            mult = HAND_MULTIPLIERS.get(hand_type, 1)
+        hand_type, mult = classify_selection(selected)
 
         base_damage = sum(card.value for card in selected) * mult
         
         # Apply joker effects
-        total_damage = apply_jokers(selected, base_damage, hand_type, self.jokers)
-        
-        # Apply Berserker joker damage bonus
-        if 'berserker' in self.jokers:
-            berserker_bonus = self.combat_turn * 2  # +2 damage per turn
-            total_damage += berserker_bonus
-            if berserker_bonus > 0:
-                print(f"Berserker bonus: +{berserker_bonus} damage!")
-
-        # Shaman joker: multiplier per tarot card held
-        if 'shaman' in self.jokers:
-            per_item_bonus = 0.05  # +5% per tarot card
-            multiplier = 1.0 + per_item_bonus * len(self.items)
-            total_damage = int(total_damage * multiplier)
+        loadout = self.loadout
+        plan = loadout.plan
+        total_damage = plan.apply(selected, base_damage, hand_type)
+        if plan.consumed:
+            consume_jokers(plan, self.jokers)
+            self.jokers_changed()
+
+        # Joker attack hooks (Berserker, Shaman)
+        effects: List[str] = []
+        for hook in loadout.on_attack:
+            total_damage = hook(self, enemy, hand_type, total_damage, effects)
         
         # Apply status effect damage buffs
         total_damage = self.status_effects.modify_outgoing_damage(int(total_damage))
@@ -218,13 +185,11 @@ class Player:
         if enemy and hand_type != "Strike" and getattr(self, 'abilities_unlocked', True):
             from card_abilities import apply_card_combination_abilities
             abilities_result = apply_card_combination_abilities(hand_type, self, enemy, int(base_damage))
+        effects.extend(abilities_result["effects"])
 
-        # Executioner joker: percent of current enemy HP if correct hand played
-        if enemy and 'executioner' in self.jokers and self.executioner_required_hand:
-            if hand_type == self.executioner_required_hand:
-                bonus = int(getattr(enemy, 'hp', 0) * self.executioner_percent)
-                total_damage += bonus
-                abilities_result["effects"].append(f"Executioner bonus: +{bonus} current HP damage")
+        # Joker hit hooks (Executioner), before the abilities' multiplier
+        for hook in loadout.on_hit:
+            total_damage = hook(self, enemy, hand_type, total_damage, effects)
         
         # Apply damage multiplier from abilities
         total_damage = int(total_damage * abilities_result["damage_multiplier"])
@@ -239,8 +204,9 @@ class Player:
         # Refill hand to maintain hand_size
         self.draw_cards(len(indices))
 
-        print(f"Attack using {len(selected)} card(s) as {hand_type}: base {base_damage} → total {total_damage}")
-        return float(total_damage), hand_type, abilities_result["effects"]
+        if listening(HandPlayed):
+            publish(HandPlayed(hand_type, len(selected), base_damage, total_damage))
+        return float(total_damage), hand_type, effects
 
     # ------------------------------------------------------------------
     # Stat adjustments
@@ -249,7 +215,8 @@ class Player:
         # Apply status effect damage reduction and shields
         actual_damage = self.status_effects.modify_incoming_damage(int(dmg))
         self.hp = max(0, self.hp - actual_damage)
-        print(f"Player took {actual_damage} damage. HP {self.hp}/{self.max_hp}")
+        if listening(DamageDealt):
+            publish(DamageDealt('Player', actual_damage, self.hp, self.max_hp))
 
     # ------------------------------------------------------------------
     # Progression
@@ -268,7 +235,7 @@ class Player:
         self.hp = self.max_hp
         # Next level harder
         self.exp_to_next = int(self.exp_to_next * 1.2)
-        print(f"Leveled up to {self.level}! Skill points: {self.skill_points}. Max HP is now {self.max_hp}.")
+        notice(f"Leveled up to {self.level}! Skill points: {self.skill_points}. Max HP is now {self.max_hp}.")
     
     def start_turn(self) -> None:
         """Called at the start of the player's turn to process status effects."""
@@ -286,29 +253,56 @@ class Player:
         self.status_effects.clear_all_effects()
         # Pick required hand for Executioner joker
         import random
-        hands = [
-            "High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
-            "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush"
-        ]
-        self.executioner_required_hand = random.choice(hands)
+        self.executioner_required_hand = random.choice(EXECUTIONER_HANDS)
     
     def end_combat(self) -> None:
         """Called when combat ends."""
         self.combat_turn = 0
         self.status_effects.clear_all_effects()
 
+    def after_combat(self, won: bool) -> None:
+        """Run the jokers' post-combat hooks (Explorer, Beggar) as rewards are paid."""
+        for hook in self.loadout.post_combat:
+            hook(self, won)
+
     def add_joker(self, jtype: str) -> None:
         if len(self.jokers) >= self.max_jokers:
-            print("Cannot recruit more companions - maximum of 5 companions allowed!")
+            notice("Cannot recruit more companions - maximum of 5 companions allowed!")
             return
         self.jokers.append(jtype)
-        print(f"Acquired companion: {jtype}")
+        self.jokers_changed()
+        notice(f"Acquired companion: {jtype}")
+
+    @property
+    def jokers(self) -> List[str]:
+        return self._jokers
+
+    @jokers.setter
+    def jokers(self, value: List[str]) -> None:
+        self._jokers = value
+        self._loadout = None
+
+    @property
+    def loadout(self) -> JokerLoadout:
+        """The compiled joker loadout (hooks and stats); rebuilt after a change."""
+        if self._loadout is None:
+            self._loadout = compile_loadout(tuple(self.jokers))
+        return self._loadout
+
+    def joker_plan(self) -> JokerPlan:
+        """Compiled damage plan for the current joker loadout."""
+        return self.loadout.plan
+
+    def jokers_changed(self) -> None:
+        """Drop the compiled loadout; call after editing `jokers` directly."""
+        self._loadout = None
 
     def remove_joker(self, jtype: str) -> bool:
         """Remove a companion from the player's collection. Returns True if successful."""
         if jtype in self.jokers:
             self.jokers.remove(jtype)
-            print(f"Farewelled companion: {jtype}")
+            self.jokers_changed()
+            notice(f"Farewelled companion: {jtype}")
             return True
         return False
 
@@ -318,7 +312,7 @@ class Player:
     def add_item(self, item: 'TarotCard') -> None:
         """Add a consumable (e.g., TarotCard) to inventory."""
         self.items.append(item)
-        print(f"Obtained item: {item}")
+        notice(f"Obtained item: {item}")
 
     # Utility ----------------------------------------------------------------
     def is_alive(self) -> bool:
@@ -330,10 +324,10 @@ class Player:
     def magician_swap(self, hand_idx: int) -> bool:
         """Swap a card in hand with top of deck. Returns True if success."""
         if 'magician' not in self.jokers:
-            print("No Magician joker available.")
+            notice("No Magician joker available.")
             return False
         if not (0 <= hand_idx < len(self.hand)):
-            print("Hand index out of range.")
+            notice("Hand index out of range.")
             return False
 
         # Draw top card from deck (1) and swap
@@ -341,18 +335,18 @@ class Player:
         old_card = self.hand[hand_idx]
         self.hand[hand_idx] = new_card
         self.discard_pile.append(old_card)
-        print(f"Magician swapped {old_card} → {new_card}")
+        notice(f"Magician swapped {old_card} → {new_card}")
         return True
 
     def necromancer_retrieve(self, discard_idx: int) -> bool:
         """Move a card from discard pile back to hand once per turn."""
         if 'necromancer' not in self.jokers:
-            print("No Necromancer joker available.")
+            notice("No Necromancer joker available.")
             return False
         if not (0 <= discard_idx < len(self.discard_pile)):
-            print("Discard index out of range.")
+            notice("Discard index out of range.")
             return False
         card = self.discard_pile.pop(discard_idx)
         self.hand.append(card)
-        print(f"Necromancer retrieved {card} from discard into hand.")
+        notice(f"Necromancer retrieved {card} from discard into hand.")
         return True 
\ No newline at end of file
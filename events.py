@@ -0,0 +1,282 @@
+"""Structured game events and the bus that carries them.
+
+Core code (entities, status effects, deck, jokers, the combat engine)
+reports what happens as typed events instead of printing. Each event
+class is its own channel; front ends subscribe to the channels they
+show. The console subscriber prints the same lines the game always
+printed, and the Ursina combat overlay keeps a short log.
+
+Publishing is guarded so that an unwatched channel costs one dict lookup:
+
+    if listening(DamageDealt):
+        publish(DamageDealt(self.name, amount, self.hp, self.max_hp))
+
+The event is only built (and its text only formatted, by describe())
+when somebody subscribed. Headless simulations subscribe to nothing.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple, Type, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from combat_engine import Action
+
+E = TypeVar('E', bound='Event')
+Handler = Callable[['Event'], None]
+
+
+class Event:
+    """Base class of all events; describe() renders the console line."""
+
+    __slots__ = ()
+
+    def describe(self) -> str:
+        return type(self).__name__
+
+
+# ---------------------------------------------------------------------------
+# Events
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class DamageDealt(Event):
+    """*target* lost *amount* HP (after shields, reduction and defense)."""
+
+    target: str
+    amount: int
+    hp: int
+    max_hp: int
+    source: str = 'attack'  # or 'poison'
+
+    def describe(self) -> str:
+        if self.source == 'poison':
+            return f"{self.target} takes {self.amount} poison damage! ({self.hp} HP remaining)"
+        return f"{self.target} took {self.amount} damage. HP {self.hp}/{self.max_hp}"
+
+
+@dataclass(frozen=True)
+class HandPlayed(Event):
+    hand_type: str
+    cards: int
+    base_damage: int
+    total_damage: int
+
+    def describe(self) -> str:
+        return (f"Attack using {self.cards} card(s) as {self.hand_type}: "
+                f"base {self.base_damage} → total {self.total_damage}")
+
+
+@dataclass(frozen=True)
+class EnemyAttacked(Event):
+    """An enemy's attack attempt; *stunned* attacks deal nothing."""
+
+    name: str
+    damage: int
+    stunned: bool = False
+
+    def describe(self) -> str:
+        if self.stunned:
+            return f"{self.name} is stunned and cannot attack!"
+        return f"{self.name} attacks for {self.damage}!"
+
+
+@dataclass(frozen=True)
+class EffectApplied(Event):
+    """A status effect took hold (or, for Heal and Stun, fired) on *target*."""
+
+    target: str
+    effect: str
+    amount: float = 0
+    hp: int = 0
+    max_hp: int = 0
+
+    def describe(self) -> str:
+        effect, target = self.effect, self.target
+        if effect == 'Stun':
+            return f"{target} is stunned and cannot act!"
+        if effect == 'Heal':
+            return f"{target} healed for {int(self.amount)} HP! ({self.hp}/{self.max_hp})"
+        if effect == 'Damage Buff':
+            return f"{target} gains a {int(self.amount)}% damage buff!"
+        if effect == 'Shield':
+            return f"{target} gains a {int(self.amount)} HP shield!"
+        if effect == 'Damage Reduction':
+            return f"{target} gains {int(self.amount)}% damage reduction!"
+        if effect == 'Poison':
+            return f"{target} is poisoned!"
+        return f"{target} gains {effect}!"
+
+
+@dataclass(frozen=True)
+class ShieldAbsorbed(Event):
+    absorbed: int
+    remaining: int
+
+    def describe(self) -> str:
+        if self.remaining <= 0:
+            return "Shield depleted!"
+        return f"Shield absorbed {self.absorbed} damage! ({self.remaining} shield remaining)"
+
+
+@dataclass(frozen=True)
+class DamageReduced(Event):
+    before: int
+    after: int
+
+    def describe(self) -> str:
+        return f"Damage reduced from {self.before} to {self.after}!"
+
+
+@dataclass(frozen=True)
+class CardsDrawn(Event):
+    count: int
+    hand_size: int
+    deck_left: int
+    cards: Tuple[int, ...] = ()  # ids of the drawn cards
+
+    def describe(self) -> str:
+        return f"Drew {self.count} card(s). Hand {self.hand_size}, deck {self.deck_left}."
+
+
+@dataclass(frozen=True)
+class CardsDiscarded(Event):
+    count: int
+    discards_left: int
+
+    def describe(self) -> str:
+        return f"Discarded {self.count} card(s). {self.discards_left} discards left."
+
+
+@dataclass(frozen=True)
+class DeckRefreshed(Event):
+    size: int
+
+    def describe(self) -> str:
+        return f"Deck refreshed with {self.size} cards"
+
+
+@dataclass(frozen=True)
+class JokerConsumed(Event):
+    key: str
+    name: str
+
+    def describe(self) -> str:
+        return f"{self.name} was consumed!"
+
+
+@dataclass(frozen=True)
+class RewardGranted(Event):
+    gold: int
+    exp: int
+
+    def describe(self) -> str:
+        return f"You earned {self.gold} gold!\nGained {self.exp} EXP."
+
+
+@dataclass(frozen=True)
+class TurnStarted(Event):
+    """Player turn *turn* is about to begin (before status ticks and the draw)."""
+
+    turn: int
+
+    def describe(self) -> str:
+        return f"Turn {self.turn}"
+
+
+@dataclass(frozen=True)
+class ActionTaken(Event):
+    """The combat engine is about to apply a player action."""
+
+    action: 'Action'
+
+    def describe(self) -> str:
+        return f"Player: {self.action}"
+
+
+@dataclass(frozen=True)
+class CombatEnded(Event):
+    won: bool
+    turn: int
+
+    def describe(self) -> str:
+        return f"{'Victory' if self.won else 'Defeat'} on turn {self.turn}"
+
+
+@dataclass(frozen=True)
+class Notice(Event):
+    """Free-form message for rare paths (warnings, level ups, recruits)."""
+
+    text: str
+
+    def describe(self) -> str:
+        return self.text
+
+
+# ---------------------------------------------------------------------------
+# Bus
+# ---------------------------------------------------------------------------
+
+class EventBus:
+    """Per-channel subscriber lists; a channel with no handlers has no entry."""
+
+    def __init__(self):
+        self._handlers: Dict[type, List[Handler]] = {}
+
+    def subscribe(self, channel: Type[E], handler: Callable[[E], None]) -> Callable[[], None]:
+        """Call *handler* for every *channel* event; returns an unsubscribe function."""
+        self._handlers.setdefault(channel, []).append(handler)
+        return lambda: self.unsubscribe(channel, handler)
+
+    def unsubscribe(self, channel: type, handler: Handler) -> None:
+        handlers = self._handlers.get(channel)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[channel]
+
+    def wants(self, channel: type) -> bool:
+        return channel in self._handlers
+
+    def publish(self, event: Event) -> None:
+        for handler in tuple(self._handlers.get(type(event), ())):
+            handler(event)
+
+
+bus = EventBus()
+
+# Module-level shortcuts bound to the default bus, for the hot paths
+listening = bus.wants
+publish = bus.publish
+subscribe = bus.subscribe
+
+
+def notice(text: str) -> None:
+    """Publish a Notice; for messages that are cheap or rare enough to format eagerly."""
+    if listening(Notice):
+        publish(Notice(text))
+
+
+# ---------------------------------------------------------------------------
+# Console
+# ---------------------------------------------------------------------------
+
+# Everything the game used to print; CardsDrawn was never shown
+CONSOLE_CHANNELS = (
+    DamageDealt, HandPlayed, EnemyAttacked, EffectApplied, ShieldAbsorbed, DamageReduced,
+    CardsDiscarded, DeckRefreshed, JokerConsumed, RewardGranted, Notice,
+)
+
+
+def print_event(event: Event) -> None:
+    print(event.describe())
+
+
+def attach_console(channels: Iterable[type] = CONSOLE_CHANNELS, target: EventBus = bus) -> Callable[[], None]:
+    """Print events from *channels* to stdout; returns a function that detaches again."""
+    detachers = [target.subscribe(channel, print_event) for channel in channels]
+
+    def detach() -> None:
+        for undo in detachers:
+            undo()
+    return detach
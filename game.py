@@ -6,14 +6,19 @@ Enemy for quick iterative testing.
 from __future__ import annotations
 
 import random
-from typing import List
+import sys
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
 
+from combat_engine import (
+    Action, Attack, CombatEngine, Discard, EndTurn, MagicianSwap, NecromancerRetrieve, Phase,
+)
 from entities.player import Player
-from entities.enemy import Enemy
-from poker import get_poker_hand
 from encounter import EncounterManager
+from events import attach_console
+from policies import make_policy
 from meta import load_meta, save_meta, record_run, add_permanent_hp
-from shop import open_shop
+from shop import ShopChooser, open_shop, run_shop
 
 
 
@@ -37,66 +42,105 @@ def choose_indices(prompt: str, hand_len: int, expect: int | None = None) -> Lis
         return indices
 
 
-def play_game() -> None:
+def choose_action(player: Player) -> Action | None:
+    """Show the hand and menu, and turn the reply into an engine action."""
+    print("\nYour hand:")
+    for i, card in enumerate(player.hand):
+        print(f"{i}: {card}")
+
+    print("\nActions:")
+    print("1) Form hand & attack")
+    print("2) Discard and redraw")
+    print("3) End turn")
+    if 'magician' in player.jokers:
+        print("4) Magician swap a card")
+    if 'necromancer' in player.jokers and player.discard_pile:
+        print("5) Necromancer retrieve from discard")
+    choice = input("Choose action: ")
+
+    if choice == '1':
+        if len(player.hand) < 5:
+            print("Need at least 5 cards.")
+            return None
+        indices = choose_indices("Select 5 card indices (comma-sep): ", len(player.hand), expect=5)
+        return Attack(tuple(indices)) if indices else None
+    if choice == '2':
+        indices = choose_indices("Indices to discard (comma-sep, blank=none): ", len(player.hand))
+        return Discard(tuple(indices)) if indices else None
+    if choice == '3':
+        return EndTurn()
+    if choice == '4' and 'magician' in player.jokers:
+        if not player.hand:
+            print("Hand empty.")
+            return None
+        idx_list = choose_indices("Select ONE card index to swap: ", len(player.hand), expect=1)
+        return MagicianSwap(idx_list[0]) if idx_list else None
+    if choice == '5' and 'necromancer' in player.jokers and player.discard_pile:
+        for i, card in enumerate(player.discard_pile):
+            print(f"{i}: {card}")
+        idx_list = choose_indices("Select ONE discard card to retrieve: ", len(player.discard_pile), expect=1)
+        return NecromancerRetrieve(idx_list[0]) if idx_list else None
+    print("Invalid choice.")
+    return None
+
+
+@dataclass(frozen=True)
+class RunResult:
+    """Outcome of one play_game run."""
+
+    won: bool
+    stages_cleared: int
+    turns: int
+    gold: int
+    permanent_hp_bonus: int
+    jokers: Tuple[str, ...]
+
+
+def play_game(policy: Callable[[CombatEngine], Action] | None = None, *,
+              shop_policy: ShopChooser | None = None, stages: int = 5) -> RunResult:
+    """Run the encounter loop and record the run in the meta save.
+
+    With a *policy* (see policies.py) no input is read: shops are visited
+    with *shop_policy*, or skipped when there is none. A policy that
+    returns None or an action the engine refuses raises ValueError.
+    """
     player = Player()
-    encounters = EncounterManager(stages=5)
+    encounters = EncounterManager(stages=stages)
     enemy = encounters.next_enemy()
+    cleared = turns = 0
 
     player.add_joker('joker')  # Starter joker
 
     print("Welcome to Gambition!")
 
     while player.is_alive() and enemy and enemy.is_alive():
-        print("\n--- Player Turn ---")
-        player.draw_cards()
-
-        action_taken = False
-        while not action_taken:
-            print("\nYour hand:")
-            for i, card in enumerate(player.hand):
-                print(f"{i}: {card}")
-
-            print("\nActions:")
-            print("1) Form hand & attack")
-            print("2) Discard and redraw")
-            print("3) End turn")
-            if 'magician' in player.jokers:
-                print("4) Magician swap a card")
-            if 'necromancer' in player.jokers and player.discard_pile:
-                print("5) Necromancer retrieve from discard")
-            choice = input("Choose action: ")
-
-            if choice == '1':
-                if len(player.hand) < 5:
-                    print("Need at least 5 cards.")
+        engine = CombatEngine(player, enemy, auto_enemy_turn=False)
+        while not engine.finished:
+            if engine.phase is Phase.ENEMY_TURN:
+                print("\n--- Enemy Turn ---")
+                engine.enemy_turn()
+                continue
+
+            print("\n--- Player Turn ---")
+            while engine.phase is Phase.PLAYER_TURN:
+                if policy is not None:
+                    # No one to re-prompt: a policy's illegal action raises ValueError
+                    action = policy(engine)
+                    if action is None:
+                        raise ValueError(f"Policy chose no action on turn {engine.turn}")
+                    engine.step(action)
                     continue
-                indices = choose_indices("Select 5 card indices (comma-sep): ", len(player.hand), expect=5)
-                dmg, hand_type = player.form_hand_and_attack(indices)
-                if hand_type:
-                    enemy.take_damage(dmg)
-                    action_taken = True
-            elif choice == '2':
-                indices = choose_indices("Indices to discard (comma-sep, blank=none): ", len(player.hand))
-                player.discard_cards(indices)
-            elif choice == '3':
-                action_taken = True
-            elif choice == '4' and 'magician' in player.jokers:
-                if not player.hand:
-                    print("Hand empty.")
+                action = choose_action(player)
+                if action is None:
                     continue
-                idx_list = choose_indices("Select ONE card index to swap: ", len(player.hand), expect=1)
-                if idx_list:
-                    player.magician_swap(idx_list[0])
-            elif choice == '5' and 'necromancer' in player.jokers and player.discard_pile:
-                for i, card in enumerate(player.discard_pile):
-                    print(f"{i}: {card}")
-                idx_list = choose_indices("Select ONE discard card to retrieve: ", len(player.discard_pile), expect=1)
-                if idx_list:
-                    player.necromancer_retrieve(idx_list[0])
-            else:
-                print("Invalid choice.")
-
-        if not enemy.is_alive():
+                try:
+                    engine.step(action)
+                except ValueError as exc:
+                    print(exc)
+
+        turns += engine.turn
+        if engine.won:
+            cleared += 1
             print(f"\nYou defeated the {enemy.name}!")
             if encounters.has_more():
                 enemy = encounters.next_enemy()
@@ -104,20 +148,19 @@ def play_game() -> None:
 
                 # After each victory, chance for shop or event
                 roll = random.random()
-                if roll < 0.5:
+                if roll < 0.5 and policy is None:
                     open_shop(player)
+                elif roll < 0.5 and shop_policy is not None:
+                    run_shop(player, shop_policy)
                 else:
                     print("You explore the area but find nothing of interest.")
                 continue
             else:
                 break
 
-        # Enemy turn ------------------------------------------------------
-        print("\n--- Enemy Turn ---")
-        enemy.attack_player(player)
-
     # End of combat ---------------------------------------------------------
     meta = load_meta()
+    won = False
     if player.is_alive():
         won = not enemy or not encounters.has_more()
         if won:
@@ -134,7 +177,10 @@ def play_game() -> None:
     save_meta(meta)
     if not player.is_alive():
         print("\nGame Over. You were defeated.")
+    return RunResult(won, cleared, turns, player.gold, meta['permanent_hp_bonus'], tuple(player.jokers))
 
 
 if __name__ == "__main__":
-    play_game() 
\ No newline at end of file
+    attach_console()
+    # Optional policy name (see policies.POLICIES) for an unattended game
+    play_game(make_policy(sys.argv[1]) if len(sys.argv) > 1 else None) 
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Table-driven 5-card poker hand evaluator.
+
+Every 5-card hand is reduced to two integers: the product of one prime per
+rank (unique for every multiset of ranks, so duplicate cards from custom
+decks are handled for free) and a flag telling whether all suits match.
+The product indexes a table precomputed at import time that already holds
+the hand category, its strength ordinal and the sorted card values, so a
+classification costs five dictionary lookups and a handful of multiplies.
+"""
+from __future__ import annotations
+
+from itertools import combinations_with_replacement
+from typing import Dict, Sequence, Tuple
+
+from card import DECK_SIZE, Card
+from constants import HAND_MULTIPLIERS, RANKS
+
+
+# ---------------------------------------------------------------------------
+# Hand ordering
+# ---------------------------------------------------------------------------
+
+# Hand categories from weakest to strongest (ordered by damage multiplier).
+HAND_RANKING: Tuple[str, ...] = tuple(sorted(HAND_MULTIPLIERS, key=HAND_MULTIPLIERS.__getitem__))
+HAND_INDEX: Dict[str, int] = {name: index for index, name in enumerate(HAND_RANKING)}
+
+# Strength ordinals: category index * _CATEGORY_SPAN + base-15 tie-breaker.
+_CATEGORY_SPAN = 15 ** 5
+
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# Indexed by Card.id (suit index * 13 + rank index)
+_ID_PRIME: Tuple[int, ...] = tuple(_PRIMES[card_id % len(RANKS)] for card_id in range(DECK_SIZE))
+
+_ROYAL_VALUES = (10, 11, 12, 13, 14)
+_WHEEL_VALUES = (2, 3, 4, 5, 14)
+
+# Table entry: (plain name, plain strength, flush name, flush strength, sorted values)
+_Entry = Tuple[str, int, str, int, Tuple[int, ...]]
+
+
+# ---------------------------------------------------------------------------
+# Table construction (runs once at import)
+# ---------------------------------------------------------------------------
+
+def _categorise(values: Tuple[int, ...], flush: bool) -> str:
+    """Reference classification of sorted *values*; only used to build tables."""
+    counts = sorted((values.count(v) for v in set(values)), reverse=True)
+    is_straight = len(counts) == 5 and (values[4] - values[0] == 4 or values == _WHEEL_VALUES)
+
+    if flush:
+        if counts == [5]:
+            return "Flush Five"
+        if is_straight and values == _ROYAL_VALUES:
+            return "Royal Flush"
+        if is_straight:
+            return "Straight Flush"
+        if counts == [3, 2]:
+            return "Flush House"
+        if counts == [4, 1]:
+            return "Four of a Kind"
+        return "Flush"
+
+    if counts == [5]:
+        return "Five of a Kind"
+    if counts == [4, 1]:
+        return "Four of a Kind"
+    if counts == [3, 2]:
+        return "Full House"
+    if is_straight:
+        return "Straight"
+    if counts == [3, 1, 1]:
+        return "Three of a Kind"
+    if counts == [2, 2, 1]:
+        return "Two Pair"
+    if counts == [2, 1, 1, 1]:
+        return "Pair"
+    return "High Card"
+
+
+def _strength(name: str, values: Tuple[int, ...]) -> int:
+    """Ordinal that orders hands first by category, then by kickers."""
+    if name in ("Straight", "Straight Flush", "Royal Flush"):
+        ordered = [5] if values == _WHEEL_VALUES else [values[4]]
+    else:
+        # Group by (count desc, value desc): trips before pairs before kickers
+        ordered = sorted(set(values), key=lambda v: (values.count(v), v), reverse=True)
+    tiebreak = 0
+    for v in ordered:
+        tiebreak = tiebreak * 15 + v
+    tiebreak *= 15 ** (5 - len(ordered))
+    return HAND_INDEX[name] * _CATEGORY_SPAN + tiebreak
+
+
+def _build_table() -> Dict[int, _Entry]:
+    table: Dict[int, _Entry] = {}
+    for indices in combinations_with_replacement(range(13), 5):
+        values = tuple(i + 2 for i in indices)
+        key = 1
+        for i in indices:
+            key *= _PRIMES[i]
+        plain = _categorise(values, flush=False)
+        flush = _categorise(values, flush=True)
+        table[key] = (plain, _strength(plain, values), flush, _strength(flush, values), values)
+    return table
+
+
+_HAND_TABLE: Dict[int, _Entry] = _build_table()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def classify(cards: Sequence[Card]) -> Tuple[str, int, Tuple[int, ...]]:
+    """Classify exactly 5 cards.
+
+    Returns (hand_name, strength, sorted_card_values). *strength* is an
+    ordinal where a larger number always means a better hand.
+    """
+    c0, c1, c2, c3, c4 = cards
+    entry = _HAND_TABLE[
+        _ID_PRIME[c0.id] * _ID_PRIME[c1.id] * _ID_PRIME[c2.id] * _ID_PRIME[c3.id] * _ID_PRIME[c4.id]
+    ]
+    suit = c0.suit
+    if c1.suit == suit and c2.suit == suit and c3.suit == suit and c4.suit == suit:
+        return entry[2], entry[3], entry[4]
+    return entry[0], entry[1], entry[4]
+
+
+def evaluate_hand(cards: Sequence[Card]) -> Tuple[str, int]:
+    """Return (hand_name, strength) for exactly 5 cards."""
+    name, strength, _ = classify(cards)
+    return name, strength
+
+
+def hand_category(strength: int) -> str:
+    """Recover the hand name from a strength ordinal."""
+    return HAND_RANKING[strength // _CATEGORY_SPAN]
+
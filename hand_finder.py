@@ -0,0 +1,278 @@
+"""Best-hand finder: rank the attacks available from the current hand.
+
+A player may attack with any 1–5 cards of their hand. Instead of scoring
+every subset (218 for 8 cards, 1,585 for 12) the finder works on rank
+groups. A selection is described by its rank signature, e.g. (2, 1, 1, 1)
+for a pair plus three kickers. For a fixed signature and fixed ranks in the
+multi-card slots, damage only grows with the kicker values, because every
+step of the damage pipeline is monotone in the base damage. Kickers can
+therefore be generated best-first, and a selection outside the top *k* of
+its group is dominated. Cards of equal rank are interchangeable unless suits
+matter, so flushes get a separate pass over each suit with 5+ cards.
+
+Damage is predicted with the same multiplier, joker, status-effect and
+ability maths as Player.form_hand_and_attack, but nothing is consumed or
+rolled. Random ability multipliers (Two Pair) contribute their expected value.
+"""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, TYPE_CHECKING
+
+from card import Card
+from card_abilities import damage_multiplier_outcomes
+from poker import classify_selection
+
+if TYPE_CHECKING:
+    from entities.player import Player
+    from entities.enemy import Enemy
+
+
+MAX_SELECTION = 5
+
+# Rank signatures (cards taken from each chosen rank, largest first) per selection size
+_SIGNATURES: Dict[int, List[Tuple[int, ...]]] = {
+    1: [(1,)],
+    2: [(2,), (1, 1)],
+    3: [(3,), (2, 1), (1, 1, 1)],
+    4: [(4,), (3, 1), (2, 2), (2, 1, 1), (1, 1, 1, 1)],
+    5: [(5,), (4, 1), (3, 2), (3, 1, 1), (2, 2, 1), (2, 1, 1, 1), (1, 1, 1, 1, 1)],
+}
+
+# Value windows of every straight, wheel included
+_STRAIGHTS: List[Tuple[int, ...]] = [tuple(range(top - 4, top + 1)) for top in range(14, 5, -1)] + [(14, 2, 3, 4, 5)]
+
+
+@dataclass(frozen=True)
+class HandSuggestion:
+    """One playable selection: hand indices, detected hand type and damage."""
+
+    indices: Tuple[int, ...]
+    hand_type: str
+    damage: float
+
+
+# ---------------------------------------------------------------------------
+# Damage prediction
+# ---------------------------------------------------------------------------
+
+class _DamageModel:
+    """Side-effect free replica of the damage maths in form_hand_and_attack.
+
+    Joker damage comes from the player's loadout: its plan and the same
+    on_attack/on_hit hooks, run without effects so they stay quiet.
+    """
+
+    def __init__(self, player: 'Player', enemy: 'Enemy' | None = None):
+        self.player = player
+        self.enemy = enemy
+        self.loadout = player.loadout
+        self.use_abilities = enemy is not None and getattr(player, 'abilities_unlocked', True)
+        self._cache: Dict[Tuple[str, int, int], float] = {}
+
+    def damage(self, cards: Sequence[Card], hand_type: str, mult: int) -> float:
+        base_damage = sum(card.value for card in cards) * mult
+        key = (hand_type, len(cards), base_damage)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._cache[key] = self._compute(list(cards), hand_type, base_damage)
+        return cached
+
+    def _compute(self, cards: List[Card], hand_type: str, base_damage: int) -> float:
+        player, enemy, loadout = self.player, self.enemy, self.loadout
+        total = loadout.plan.apply(cards, base_damage, hand_type)
+        for hook in loadout.on_attack:
+            total = hook(player, enemy, hand_type, total, None)
+        total = player.status_effects.peek_outgoing_damage(int(total))
+
+        outcomes = [(1.0, 1.0)]
+        if self.use_abilities and hand_type != "Strike":
+            outcomes = damage_multiplier_outcomes(hand_type, player)
+        for hook in loadout.on_hit:
+            total = hook(player, enemy, hand_type, total, None)
+
+        expected = 0.0
+        for probability, multiplier in outcomes:
+            expected += probability * int(int(total * multiplier) * player.permanent_damage_multiplier)
+        return float(expected)
+
+
+def estimate_damage(player: 'Player', indices: Sequence[int], enemy: 'Enemy' | None = None) -> Tuple[float, str]:
+    """Predict (damage, hand_type) of attacking with *indices* without playing them."""
+    cards = [player.hand[i] for i in indices]
+    hand_type, mult = classify_selection(cards)
+    return _DamageModel(player, enemy).damage(cards, hand_type, mult), hand_type
+
+
+# ---------------------------------------------------------------------------
+# Candidate generation
+# ---------------------------------------------------------------------------
+
+def _top_combinations(values: Sequence[int], size: int, limit: int,
+                      accept: Callable[[Tuple[int, ...]], bool] | None = None) -> Iterator[Tuple[int, ...]]:
+    """Yield up to *limit* position tuples of *values* (sorted high→low) by descending sum."""
+    if size == 0:
+        yield ()
+        return
+    count = len(values)
+    if size > count:
+        return
+    start = tuple(range(size))
+    heap = [(-sum(values[i] for i in start), start)]
+    seen = {start}
+    found = 0
+    while heap and found < limit:
+        _, combo = heapq.heappop(heap)
+        if accept is None or accept(combo):
+            yield combo
+            found += 1
+        for j in range(size):
+            nxt = combo[j] + 1
+            if nxt < count and (j + 1 == size or nxt < combo[j + 1]):
+                successor = combo[:j] + (nxt,) + combo[j + 1:]
+                if successor not in seen:
+                    seen.add(successor)
+                    heapq.heappush(heap, (-sum(values[i] for i in successor), successor))
+
+
+def _assign_multi(values: List[int], groups: Dict[int, List[int]], slots: List[int],
+                  start: int = 0, chosen: Tuple[int, ...] = ()) -> Iterator[Tuple[int, ...]]:
+    """Assign distinct ranks to the multi-card *slots* of a signature."""
+    depth = len(chosen)
+    if depth == len(slots):
+        yield chosen
+        return
+    # Equal consecutive slots are unordered: only walk forward to avoid repeats
+    first = start if depth and slots[depth] == slots[depth - 1] else 0
+    for pos in range(first, len(values)):
+        value = values[pos]
+        if value not in chosen and len(groups[value]) >= slots[depth]:
+            yield from _assign_multi(values, groups, slots, pos + 1, chosen + (value,))
+
+
+def _realise(picks: List[Tuple[int, int]], groups: Dict[int, List[int]], hand: Sequence[Card],
+             avoid_flush: bool) -> List[int]:
+    """Turn (value, count) picks into hand indices, preferring mixed suits."""
+    indices: List[int] = []
+    for value, count in picks:
+        indices.extend(groups[value][:count])
+    if avoid_flush and len(indices) == MAX_SELECTION:
+        suit = hand[indices[0]].suit
+        if all(hand[i].suit == suit for i in indices):
+            offset = 0
+            for value, count in picks:
+                spare = [i for i in groups[value][count:] if hand[i].suit != suit]
+                if spare:
+                    indices[offset + count - 1] = spare[0]
+                    break
+                offset += count
+    return indices
+
+
+def _is_straight(values: Sequence[int]) -> bool:
+    return max(values) - min(values) == 4 or set(values) == {14, 2, 3, 4, 5}
+
+
+def _rank_groups(pool: Sequence[int], hand: Sequence[Card], top_k: int,
+                 sizes: Sequence[int], avoid_flush: bool) -> Iterator[Iterator[List[int]]]:
+    """Yield candidate groups; each group yields selections weakest-last."""
+    groups: Dict[int, List[int]] = {}
+    for idx in pool:
+        groups.setdefault(hand[idx].value, []).append(idx)
+    values = sorted(groups, reverse=True)
+
+    def kickers(chosen, slots, singles, straight_shape):
+        rest = [v for v in values if v not in chosen]
+        accept = None
+        if straight_shape:
+            # Straights are a group of their own, see below
+            accept = lambda combo: not _is_straight([rest[p] for p in combo])
+        for combo in _top_combinations(rest, singles, top_k, accept):
+            picks = list(zip(chosen, slots)) + [(rest[p], 1) for p in combo]
+            yield _realise(picks, groups, hand, avoid_flush)
+
+    def straights():
+        windows = [w for w in _STRAIGHTS if all(v in groups for v in w)]
+        windows.sort(key=sum, reverse=True)
+        for window in windows:
+            yield _realise([(v, 1) for v in window], groups, hand, avoid_flush)
+
+    for size in sizes:
+        for signature in _SIGNATURES[size]:
+            slots = [c for c in signature if c > 1]
+            singles = len(signature) - len(slots)
+            straight_shape = singles == MAX_SELECTION
+            for chosen in _assign_multi(values, groups, slots):
+                yield kickers(chosen, slots, singles, straight_shape)
+            if straight_shape:
+                yield straights()
+
+
+def _candidate_groups(hand: Sequence[Card], top_k: int) -> Iterator[Iterator[List[int]]]:
+    # Flushes first: they usually set a high bar that prunes the groups after them
+    by_suit: Dict[str, List[int]] = {}
+    for idx, card in enumerate(hand):
+        by_suit.setdefault(card.suit, []).append(idx)
+    for suited in by_suit.values():
+        if len(suited) >= MAX_SELECTION:
+            yield from _rank_groups(suited, hand, top_k, (MAX_SELECTION,), avoid_flush=False)
+
+    yield from _rank_groups(range(len(hand)), hand, top_k, range(MAX_SELECTION, 0, -1), avoid_flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def suggest_hands(player: 'Player', top_k: int = 3, enemy: 'Enemy' | None = None) -> List[HandSuggestion]:
+    """Return the *top_k* best attacks from player.hand, highest damage first.
+
+    Selections with the same hand type and card values (i.e. that only
+    differ by swapping cards of the same rank) are reported once. Ties are
+    broken in favour of playing fewer cards.
+    """
+    if top_k <= 0 or not player.hand:
+        return []
+    hand = player.hand
+    model = _DamageModel(player, enemy)
+    seen = set()
+    suggestions: List[HandSuggestion] = []
+    floor: List[float] = []  # min-heap of the best *top_k* damages found so far
+    for group in _candidate_groups(hand, top_k):
+        for indices in group:
+            indices.sort()
+            cards = [hand[i] for i in indices]
+            hand_type, mult = classify_selection(cards)
+            damage = model.damage(cards, hand_type, mult)
+            if len(floor) == top_k and damage < floor[0]:
+                break  # everything left in this group is weaker still
+            key = (hand_type, tuple(sorted(card.value for card in cards)))
+            if key in seen:
+                continue
+            seen.add(key)
+            suggestions.append(HandSuggestion(tuple(indices), hand_type, damage))
+            if len(floor) < top_k:
+                heapq.heappush(floor, damage)
+            else:
+                heapq.heappushpop(floor, damage)
+    suggestions.sort(key=lambda s: (-s.damage, len(s.indices)))
+    return suggestions[:top_k]
+
+
+def best_base_play(hand: Sequence[Card]) -> HandSuggestion | None:
+    """The selection with the highest base damage (card values x hand multiplier).
+
+    Jokers, effects and abilities are ignored, which makes this a
+    loadout-independent view of a hand for aggregate statistics.
+    """
+    best: HandSuggestion | None = None
+    for group in _candidate_groups(hand, 1):
+        for indices in group:
+            cards = [hand[i] for i in indices]
+            hand_type, mult = classify_selection(cards)
+            damage = float(sum(card.value for card in cards) * mult)
+            if best is None or (damage, -len(indices)) > (best.damage, -len(best.indices)):
+                best = HandSuggestion(tuple(sorted(indices)), hand_type, damage)
+            break  # the first selection of a group is its strongest
+    return best
@@ -1,22 +1,68 @@
-from typing import Callable, Dict, Any, List
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
 
 from card import Card
+from events import JokerConsumed, Notice, listening, notice, publish
+
+if TYPE_CHECKING:
+    from entities.enemy import Enemy
+    from entities.player import Player
 
 # Type aliases --------------------------------------------------------------
 JokerEffect = Callable[[List[Card], float, str | None], float]
 
+# Phase hooks, listed in a definition under the phase name (see JokerLoadout):
+# on_draw(player) -> extra cards for a top-up draw
+# on_discard(player, discarded) -> cards put back in hand (that many fewer are drawn)
+# on_attack(player, enemy, hand_type, damage, effects) -> damage, after the damage plan
+# on_hit(player, enemy, hand_type, damage, effects) -> damage, after the hand's abilities
+#   and before their multiplier
+#   (effects is None when the damage is only being predicted: say nothing then)
+# post_combat(player, won) -> None, when the rewards are paid out
+DrawHook = Callable[['Player'], int]
+DiscardHook = Callable[['Player', List[Card]], int]
+AttackHook = Callable[['Player', Optional['Enemy'], str, float, Optional[List[str]]], float]
+PostCombatHook = Callable[['Player', bool], None]
+PHASES = ('on_draw', 'on_discard', 'on_attack', 'on_hit', 'post_combat')
+
+
+# Maps (hand_type, card_count) to (scale, offset) so that an effect equals
+# ``base_damage * scale + offset``; see damage_model.py.
+AffineForm = Callable[[str | None, int], Tuple[float, float]]
+
 
 # Helper wrappers -----------------------------------------------------------
+# Each helper also sets ``_effect.affine``. Effects without it (e.g. custom
+# lambdas) are treated as non-affine by the damage model.
+
+def _passive(hand: List[Card], base_damage: float, hand_type: str | None) -> float:
+    """Effect of jokers that do not touch attack damage (skipped when compiled)."""
+    return base_damage
+
+
+_passive.affine = lambda hand_type, count: (1, 0)
+
 
 def _simple_add_per_card(add_amount: float) -> JokerEffect:
     def _effect(hand: List[Card], base_damage: float, hand_type: str | None) -> float:
         return base_damage + add_amount * len(hand)
+    _effect.affine = lambda hand_type, count: (1, add_amount * count)
     return _effect
 
 
 def _multiplier_by_card_count() -> JokerEffect:
     def _effect(hand: List[Card], base_damage: float, hand_type: str | None) -> float:
         return base_damage * len(hand)
+    _effect.affine = lambda hand_type, count: (count, 0)
+    return _effect
+
+
+def _flat_multiplier(factor: float) -> JokerEffect:
+    def _effect(hand: List[Card], base_damage: float, hand_type: str | None) -> float:
+        return base_damage * factor
+    _effect.affine = lambda hand_type, count: (factor, 0)
     return _effect
 
 
@@ -25,9 +71,85 @@ def _conditional_multiplier(valid_hands: List[str], factor: float) -> JokerEffec
         if hand_type in valid_hands:
             return base_damage * factor
         return base_damage
+    _effect.affine = lambda hand_type, count: (factor, 0) if hand_type in valid_hands else (1, 0)
     return _effect
 
 
+# Phase hooks ----------------------------------------------------------------
+
+def _echo_clone(player: 'Player', discarded: List[Card]) -> int:
+    if len(discarded) != 1:
+        return 0
+    cloned_card = discarded[0]  # A reference to the same card
+    player.hand.append(cloned_card)
+    if listening(Notice):
+        publish(Notice(f"Echo Mage cloned {cloned_card}!"))
+    return 1
+
+
+def _bonus_per_turn(per_turn: int) -> AttackHook:
+    def _hook(player: 'Player', enemy: Optional['Enemy'], hand_type: str, damage: float,
+              effects: Optional[List[str]]) -> float:
+        bonus = player.combat_turn * per_turn
+        if bonus > 0 and effects is not None and listening(Notice):
+            publish(Notice(f"Berserker bonus: +{bonus} damage!"))
+        return damage + bonus
+    return _hook
+
+
+def _bonus_per_tarot(per_tarot: float) -> AttackHook:
+    def _hook(player: 'Player', enemy: Optional['Enemy'], hand_type: str, damage: float,
+              effects: Optional[List[str]]) -> float:
+        return int(damage * (1.0 + per_tarot * len(player.items)))
+    return _hook
+
+
+def _execute(player: 'Player', enemy: Optional['Enemy'], hand_type: str, damage: float,
+             effects: Optional[List[str]]) -> float:
+    """Percent of the enemy's current HP when the required hand is played."""
+    if enemy and player.executioner_required_hand and hand_type == player.executioner_required_hand:
+        bonus = int(getattr(enemy, 'hp', 0) * player.executioner_percent)
+        if effects is not None:
+            effects.append(f"Executioner bonus: +{bonus} current HP damage")
+        return damage + bonus
+    return damage
+
+
+def _find_after_victory(chance: float) -> PostCombatHook:
+    def _hook(player: 'Player', won: bool) -> None:
+        if not won or random.random() >= chance:
+            return
+        from card import DECK_SIZE
+        from tarot import TAROT_DEFINITIONS
+        if random.random() < 0.5:
+            card = Card.from_id(random.randrange(DECK_SIZE))
+            player.add_card_to_deck(card)
+            notice(f"Explorer found a card: {card}")
+        else:
+            tarot = TAROT_DEFINITIONS[random.choice(list(TAROT_DEFINITIONS))]
+            player.items.append(tarot)
+            notice(f"Explorer found a tarot: {tarot.name}")
+    return _hook
+
+
+def _beggar_toll(player: 'Player', won: bool) -> None:
+    if not won:
+        return
+    if player.beggar_fights_remaining is None:
+        player.beggar_fights_remaining = 5
+    if player.beggar_fights_remaining > 0:
+        take = min(player.gold, 5)
+        player.gold -= take
+        player.beggar_fights_remaining -= 1
+        notice(f"The Beggar takes {take} gold. Fights left: {player.beggar_fights_remaining}")
+    if player.beggar_fights_remaining == 0:
+        player.permanent_damage_multiplier = round(player.permanent_damage_multiplier * 1.5, 3)
+        player.jokers.remove('beggar')
+        player.jokers_changed()
+        player.beggar_fights_remaining = None
+        notice("The Beggar reveals true power! Permanent damage +50%. Then vanishes.")
+
+
 # ----------------------------------------------------------------------------
 # Joker catalogue
 # ----------------------------------------------------------------------------
@@ -35,7 +157,7 @@ JOKER_DEFINITIONS: Dict[str, Dict[str, Any]] = {
     'blank': {
         'name': 'The Blank',
         'description': 'No inherent effect, but can be used as a base for other Jokers.',
-        'effect': lambda hand, dmg, ht: dmg,
+        'effect': _passive,
     },
     'joker': {
         'name': 'The Joker',
@@ -65,113 +187,206 @@ JOKER_DEFINITIONS: Dict[str, Dict[str, Any]] = {
     'fool': {
         'name': 'The Fool',
         'description': 'Draw +1 card each draw phase.',
-        'effect': lambda hand, dmg, ht: dmg,  # passive, handled elsewhere
+        'effect': _passive,
         'per_turn_extra_draw': 1,
     },
     'magician': {
         'name': 'The Magician',
         'description': 'Once per turn, swap a card in hand with top of deck.',
-        'effect': lambda hand, dmg, ht: dmg,  # active ability
+        'effect': _passive,  # active ability
     },
     'business_card': {
         'name': 'The Businessman',
         'description': 'Single-use: triples final damage of a hand.',
-        'effect': lambda hand, dmg, ht: dmg * 3,
+        'effect': _flat_multiplier(3),
         'single_use': True,
     },
     'gemini': {
         'name': 'The Gemini',
         'description': 'Duplicates the effects of two other Jokers.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled specially in apply_jokers
+        'effect': _passive,  # handled specially in apply_jokers
     },
     'necromancer': {
         'name': 'The Necromancer',
         'description': 'Lets you retrieve a card from the discard pile once per turn.',
-        'effect': lambda hand, dmg, ht: dmg,  # active ability handled elsewhere
+        'effect': _passive,  # active ability handled elsewhere
     },
     # New jokers
     'fortune_teller': {
         'name': 'Fortune Teller',
         'description': 'Increases all probability-based effects by 50%.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled in card abilities
+        'effect': _passive,
         'chance_multiplier': 1.5,
     },
     'berserker': {
         'name': 'Berserker',
         'description': 'Damage increases by 2 each turn in combat.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled in combat system
+        'effect': _passive,
         'damage_per_turn': 2,
+        'on_attack': _bonus_per_turn(2),
     },
     'echo_mage': {
         'name': 'Echo Mage',
         'description': 'When you discard exactly one card, add a copy to your hand.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled in discard system
+        'effect': _passive,
         'clone_on_single_discard': True,
+        'on_discard': _echo_clone,
     },
     # Requested new companions
     'executive': {
         'name': 'The Executive',
         'description': 'Grants bonus gold when an enemy is defeated.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled post-combat
+        'effect': _passive,
         'gold_bonus_factor': 0.5,
     },
     'shaman': {
         'name': 'The Shaman',
         'description': 'Increases damage by 5% per Tarot card held.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled during attack
+        'effect': _passive,
         'per_tarot_bonus': 0.05,
+        'on_attack': _bonus_per_tarot(0.05),
     },
     'executioner': {
         'name': 'The Executioner',
         'description': 'Deals bonus damage equal to a percent of enemy current HP if a required hand is played.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled during attack
+        'effect': _passive,
         'percent': 0.2,
+        'on_hit': _execute,
     },
     'explorer': {
         'name': 'The Explorer',
         'description': 'Chance to find a random tarot card or normal card after each victory.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled post-combat
+        'effect': _passive,
         'find_chance': 0.3,
+        'post_combat': _find_after_victory(0.3),
     },
     'beggar': {
         'name': 'The Beggar',
         'description': 'Takes your gold after each victory for 5 fights, then disappears revealing +50% permanent damage.',
-        'effect': lambda hand, dmg, ht: dmg,  # handled post-combat
+        'effect': _passive,
+        'post_combat': _beggar_toll,
     },
     # More jokers can be added here
 }
 
 
-def apply_jokers(hand: List[Card], base_damage: float, hand_type: str, jokers: List[str]) -> float:
-    """Apply joker effects sequentially and return updated damage.
+# ----------------------------------------------------------------------------
+# Compiled damage plans
+# ----------------------------------------------------------------------------
 
-    Jokers marked as single_use will be consumed (removed from *jokers* list)
-    after their effect is applied.
+@dataclass(frozen=True)
+class JokerPlan:
+    """A joker loadout resolved into the exact sequence of damage effects.
+
+    Unknown jokers and passive effects are dropped, Gemini duplicates are
+    appended, and single-use jokers are listed in *consumed*.
     """
-    damage = base_damage
+
+    loadout: Tuple[str, ...]
+    effects: Tuple[JokerEffect, ...]
+    consumed: Tuple[str, ...]
+
+    def apply(self, hand: List[Card], base_damage: float, hand_type: str | None) -> float:
+        damage = base_damage
+        for effect in self.effects:
+            damage = effect(hand, damage, hand_type)
+        return damage
+
+
+@lru_cache(maxsize=512)
+def compile_jokers(loadout: Tuple[str, ...]) -> JokerPlan:
+    """Compile a joker loadout (in play order) into a cached JokerPlan."""
+    effects: List[JokerEffect] = []
     consumed: List[str] = []
-    for jtype in jokers:
+    for jtype in loadout:
         definition = JOKER_DEFINITIONS.get(jtype)
         if not definition:
             continue
-        effect = definition['effect']
-        damage = effect(hand, damage, hand_type)
+        effects.append(definition['effect'])
         if definition.get('single_use'):
             consumed.append(jtype)
 
-    # Gemini duplication: apply effects of two other jokers again (per Gemini)
-    if 'gemini' in jokers:
-        # gather list of other joker types (in order)
-        other_jokers = [j for j in jokers if j != 'gemini']
-        duplicate_targets = other_jokers[:2]  # first two
-        for _ in range(jokers.count('gemini')):
+    # Gemini duplication: apply effects of the first two other jokers again (per Gemini)
+    gemini_count = loadout.count('gemini')
+    if gemini_count:
+        duplicate_targets = [j for j in loadout if j != 'gemini'][:2]
+        for _ in range(gemini_count):
             for target in duplicate_targets:
-                defn = JOKER_DEFINITIONS[target]
-                damage = defn['effect'](hand, damage, hand_type)
+                effects.append(JOKER_DEFINITIONS[target]['effect'])
+
+    return JokerPlan(loadout, tuple(e for e in effects if e is not _passive), tuple(consumed))
+
+
+# ----------------------------------------------------------------------------
+# Loadouts
+# ----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class JokerLoadout:
+    """Everything a joker loadout does, resolved once per loadout.
 
-    # Remove consumed jokers
-    for j in consumed:
+    Holds the damage plan, the count of each joker, the hooks of each
+    phase (PHASES, once per distinct joker, in catalogue order) and the
+    passive stats summed or combined from the definitions. Game code calls
+    only the hooks of the phase it is in, so a new joker is a catalogue
+    entry rather than a check in each module.
+    """
+
+    jokers: Tuple[str, ...]
+    counts: Dict[str, int]
+    plan: JokerPlan
+    on_draw: Tuple[DrawHook, ...] = ()
+    on_discard: Tuple[DiscardHook, ...] = ()
+    on_attack: Tuple[AttackHook, ...] = ()
+    on_hit: Tuple[AttackHook, ...] = ()
+    post_combat: Tuple[PostCombatHook, ...] = ()
+    extra_draw: int = 0  # per_turn_extra_draw, per copy
+    chance_multiplier: float = 1.0  # the best chance_multiplier
+    gold_multiplier: float = 1.0  # 1 + the best gold_bonus_factor
+
+    def has(self, jtype: str) -> bool:
+        return jtype in self.counts
+
+
+@lru_cache(maxsize=512)
+def compile_loadout(jokers: Tuple[str, ...]) -> JokerLoadout:
+    """Compile a joker loadout (in play order) into a cached JokerLoadout."""
+    counts: Dict[str, int] = {}
+    for jtype in jokers:
+        counts[jtype] = counts.get(jtype, 0) + 1
+    # Hooks run in catalogue order, not loadout order, so a loadout deals the same
+    # damage however it is arranged (Berserker's flat bonus before Shaman's multiplier)
+    definitions = [d for j, d in JOKER_DEFINITIONS.items() if j in counts]
+    hooks = {phase: tuple(d[phase] for d in definitions if phase in d) for phase in PHASES}
+    return JokerLoadout(
+        jokers, counts, compile_jokers(jokers), **hooks,
+        extra_draw=sum(JOKER_DEFINITIONS[j].get('per_turn_extra_draw', 0) * n
+                       for j, n in counts.items() if j in JOKER_DEFINITIONS),
+        chance_multiplier=max((d['chance_multiplier'] for d in definitions if 'chance_multiplier' in d),
+                              default=1.0),
+        gold_multiplier=1.0 + max((d['gold_bonus_factor'] for d in definitions if 'gold_bonus_factor' in d),
+                                  default=0.0),
+    )
+
+
+def consume_jokers(plan: JokerPlan, jokers: List[str]) -> None:
+    """Remove the plan's single-use jokers from *jokers* after an attack."""
+    for j in plan.consumed:
         jokers.remove(j)
-        print(f"{JOKER_DEFINITIONS[j]['name']} was consumed!")
+        if listening(JokerConsumed):
+            publish(JokerConsumed(j, JOKER_DEFINITIONS[j]['name']))
+
+
+def apply_jokers(hand: List[Card], base_damage: float, hand_type: str, jokers: List[str],
+                 consume: bool = True) -> float:
+    """Apply joker effects sequentially and return updated damage.
 
-    return damage 
\ No newline at end of file
+    Jokers marked as single_use will be consumed (removed from *jokers* list)
+    after their effect is applied, unless *consume* is False (used when only
+    predicting damage).
+    """
+    plan = compile_jokers(tuple(jokers))
+    damage = plan.apply(hand, base_damage, hand_type)
+    if consume:
+        consume_jokers(plan, jokers)
+    return damage
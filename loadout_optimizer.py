@@ -0,0 +1,377 @@
+"""Joker loadout optimizer: rank companion multisets against a deck and an enemy.
+
+The deck is profiled once. Sampled hands are reduced to their best base
+play (hand_finder.best_base_play) and aggregated into (hand_type,
+card_count) -> (probability, mean base damage) buckets. Every built-in
+damage joker is affine per bucket (see damage_model), so the joker stage
+of a loadout over the whole distribution costs a few multiply-adds per
+bucket. Berserker, Shaman, Executioner and Fortune Teller are layered on
+top in the order of Player.form_hand_and_attack, together with the Two
+Pair / Royal Flush ability multipliers; enemy defense comes off each
+bucket's mean.
+
+A loadout is scored by expected turns-to-kill (fractional, from the
+expected enemy HP curve) and the expected damage of its first attack.
+The search walks multisets of up to *max_jokers* candidates depth first
+with a branch-and-bound cut: a subtree is dropped once even its best
+conceivable completion (every free slot taking the best remaining factor
+and offset per bucket, every remaining special switched on) cannot enter
+the current top *k*. The subtrees below each first joker run in a
+process pool.
+
+Only the damage pipeline is modelled: Fool's extra draw, active abilities
+(Magician, Necromancer), economy jokers and ability side effects (heal,
+poison, shields) do not change a score. Best plays are picked without
+jokers, so loadouts that would change which hand is best are slightly
+undervalued.
+
+    python loadout_optimizer.py --enemy "Twisted Commander" --top 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from card import Card, CARD_TABLE
+from card_abilities import damage_multiplier_outcomes
+from entities.enemy import ENEMY_TEMPLATES
+from entities.player import EXECUTIONER_HANDS
+from hand_finder import best_base_play
+from jokers import JOKER_DEFINITIONS, compile_jokers
+
+# Jokers that act outside the joker damage stage (see Player.form_hand_and_attack)
+SPECIALS = ('berserker', 'shaman', 'executioner', 'fortune_teller')
+MAX_TURNS = 100
+
+
+@dataclass(frozen=True)
+class HandProfile:
+    """Best-play distribution of a deck, as (hand_type, card_count, probability, mean base damage)."""
+
+    hand_size: int
+    samples: int
+    buckets: Tuple[Tuple[str, int, float, float], ...]
+
+    def stats(self) -> Dict[Tuple[str, int], Tuple[float, float]]:
+        """The buckets in AffineDamage.expected_damage's format."""
+        return {(hand_type, count): (p, mean) for hand_type, count, p, mean in self.buckets}
+
+
+@dataclass(frozen=True)
+class EnemyProfile:
+    hp: int
+    defense: int = 0
+
+    @classmethod
+    def from_template(cls, name: str) -> 'EnemyProfile':
+        template = ENEMY_TEMPLATES[name]
+        return cls(template['hp'], template['defense'])
+
+
+@dataclass(frozen=True)
+class LoadoutScore:
+    """Expected performance of one loadout; *loadout* is in acquisition order."""
+
+    loadout: Tuple[str, ...]
+    damage_per_turn: float  # expected damage of the first attack
+    turns_to_kill: float    # math.inf if the enemy outlasts MAX_TURNS
+
+    def key(self) -> Tuple[float, float, int]:
+        return (self.turns_to_kill, -self.damage_per_turn, len(self.loadout))
+
+
+def profile_deck(cards: Sequence[Card] | None = None, hand_size: int = 8, samples: int = 4000,
+                 seed: int = 0) -> HandProfile:
+    """Sample *samples* hands from *cards* (default: a full deck) and aggregate their best plays."""
+    cards = list(CARD_TABLE) if cards is None else list(cards)
+    rng = random.Random(seed)
+    draws = min(hand_size, len(cards))
+    totals: Dict[Tuple[str, int], List[float]] = {}
+    for _ in range(samples):
+        play = best_base_play(rng.sample(cards, draws))
+        if play is None:
+            continue
+        bucket = totals.setdefault((play.hand_type, len(play.indices)), [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += play.damage
+    buckets = tuple(
+        (hand_type, count, n / samples, total / n)
+        for (hand_type, count), (n, total) in sorted(totals.items(), key=lambda kv: -kv[1][0])
+    )
+    return HandProfile(hand_size, samples, buckets)
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def _kind(name: str) -> str | None:
+    """'add', 'scale', 'special', 'gemini' or 'passive'; None if not affine."""
+    if name in SPECIALS:
+        return 'special'
+    if name == 'gemini':
+        return 'gemini'
+    effects = compile_jokers((name,)).effects
+    if not effects:
+        return 'passive'
+    if not hasattr(effects[0], 'affine'):
+        return None
+    return 'affine'
+
+
+class _Evaluator:
+    """Scores loadouts against one profile; built inside each worker.
+
+    Joker effects are closures and do not pickle, so workers receive the
+    plain profile and rebuild their per-bucket forms here.
+    """
+
+    _ORDER = ('add', 'scale', 'special', 'gemini', 'passive')
+
+    def __init__(self, profile: HandProfile, enemy: EnemyProfile, candidates: Sequence[str],
+                 items: int = 0, max_turns: int = MAX_TURNS):
+        self.enemy = enemy
+        self.items = items
+        self.max_turns = max_turns
+        self.probability = [p for _, _, p, _ in profile.buckets]
+        self.base = [mean for _, _, _, mean in profile.buckets]
+        keys = [(hand_type, count) for hand_type, count, _, _ in profile.buckets]
+
+        class _Luck:  # damage_multiplier_outcomes only looks at .jokers
+            def __init__(self, jokers):
+                self.jokers = jokers
+
+        def expected_multiplier(hand_type: str, jokers: List[str]) -> float:
+            if hand_type == "Strike":
+                return 1.0
+            return sum(p * m for p, m in damage_multiplier_outcomes(hand_type, _Luck(jokers)))
+
+        self.ability = [expected_multiplier(t, []) for t, _ in keys]
+        self.ability_lucky = [expected_multiplier(t, ['fortune_teller']) for t, _ in keys]
+        self.executable = [t in EXECUTIONER_HANDS for t, _ in keys]
+        self.single_use = {name for name, d in JOKER_DEFINITIONS.items() if d.get('single_use')}
+
+        # Per-effect (scale, offset) for every bucket
+        self.forms: Dict[object, List[Tuple[float, float]]] = {}
+        kinds: Dict[str, str] = {}
+        for name in candidates:
+            kind = _kind(name)
+            if kind is None:
+                continue  # custom non-affine effect: cannot be scored in closed form
+            for effect in compile_jokers((name,)).effects:
+                self.forms[effect] = [effect.affine(t, c) for t, c in keys]
+            if kind == 'affine':
+                forms = self.forms[compile_jokers((name,)).effects[0]]
+                kind = 'add' if all(s == 1 for s, _ in forms) else 'scale'
+            kinds[name] = kind
+        # Canonical order: offsets before factors, so a multiset's order is its best one
+        self.candidates = sorted(kinds, key=lambda n: (self._ORDER.index(kinds[n]), list(candidates).index(n)))
+        self.kinds = kinds
+
+        identity = [(1.0, 0.0)] * len(keys)
+        self.best_form_all = self._best_forms(self.candidates, identity)
+        self.best_form_from = [self._best_forms(self.candidates[i:], identity)
+                               for i in range(len(self.candidates))]
+
+    def _best_forms(self, names: Sequence[str], identity) -> List[Tuple[float, float]]:
+        best = list(identity)
+        for name in names:
+            for effect in compile_jokers((name,)).effects:
+                best = [(max(s, bs), max(o, bo)) for (s, o), (bs, bo) in zip(self.forms[effect], best)]
+        return best
+
+    def _values(self, loadout: Sequence[str]) -> List[float]:
+        values = list(self.base)
+        for effect in compile_jokers(tuple(loadout)).effects:
+            values = [v * s + o for v, (s, o) in zip(values, self.forms[effect])]
+        return values
+
+    def _run(self, first: List[float], rest: List[float], flags) -> Tuple[float, float]:
+        """(first attack damage, turns to kill) from expected per-bucket joker damage."""
+        berserker = 'berserker' in flags
+        shaman = 1.0 + 0.05 * self.items if 'shaman' in flags else None
+        ability = self.ability_lucky if 'fortune_teller' in flags else self.ability
+        execute = 0.2 / len(EXECUTIONER_HANDS) if 'executioner' in flags else 0.0
+        defense = self.enemy.defense
+        hp = float(self.enemy.hp)
+        opening = 0.0
+        for turn in range(1, self.max_turns + 1):
+            values = first if turn == 1 else rest
+            bonus = 2 * turn if berserker else 0
+            damage = 0.0
+            for p, value, mult, executable in zip(self.probability, values, ability, self.executable):
+                total = value + bonus
+                if shaman is not None:
+                    total *= shaman
+                if executable:
+                    total += execute * hp
+                damage += p * max(0.0, total * mult - defense)
+            if turn == 1:
+                opening = damage
+            if damage >= hp:
+                return opening, turn - 1 + hp / damage
+            hp -= damage
+        return opening, math.inf
+
+    def evaluate(self, loadout: Sequence[str]) -> LoadoutScore:
+        """Score a multiset (canonical order); Gemini gets the best pair to copy."""
+        orders = [tuple(loadout)]
+        if 'gemini' in loadout:
+            others = [j for j in loadout if j != 'gemini']
+            gems = ['gemini'] * (len(loadout) - len(others))
+            pairs = dict.fromkeys((others[i], others[k]) for i in range(len(others))
+                                  for k in range(i + 1, len(others)))
+            orders = []
+            for pair in pairs:
+                rest = list(others)
+                rest.remove(pair[0])
+                rest.remove(pair[1])
+                orders.append(pair + tuple(rest) + tuple(gems))
+            orders = orders or [tuple(others + gems)]
+
+        best: LoadoutScore | None = None
+        flags = set(loadout) & set(SPECIALS)
+        for order in orders:
+            persistent = [j for j in order if j not in self.single_use]
+            first = self._values(order)
+            rest = first if len(persistent) == len(order) else self._values(persistent)
+            score = LoadoutScore(order, *self._run(first, rest, flags))
+            if best is None or score.key() < best.key():
+                best = score
+        return best
+
+    def bound(self, loadout: Sequence[str], start: int, free: int) -> Tuple[float, float]:
+        """Optimistic (turns to kill, first damage) of any completion of *loadout*."""
+        remaining = self.candidates[start:]
+        values = self._values([j for j in loadout if j != 'gemini'])
+        for _ in range(free):
+            values = [v * s + o for v, (s, o) in zip(values, self.best_form_from[start])]
+        copies = 2 * (loadout.count('gemini') + (free if 'gemini' in remaining else 0))
+        for _ in range(copies):
+            values = [v * s + o for v, (s, o) in zip(values, self.best_form_all)]
+        flags = (set(loadout) | set(remaining)) & set(SPECIALS)
+        opening, turns = self._run(values, values, flags)
+        return turns, opening
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+class _TopK:
+    def __init__(self, k: int):
+        self.k = k
+        self.items: List[LoadoutScore] = []
+
+    def push(self, score: LoadoutScore) -> None:
+        self.items.append(score)
+        self.items.sort(key=LoadoutScore.key)
+        del self.items[self.k:]
+
+    def beaten(self, turns: float, opening: float) -> bool:
+        """True if a subtree bounded by (turns, opening) cannot enter the top k."""
+        if len(self.items) < self.k:
+            return False
+        worst = self.items[-1]
+        return turns > worst.turns_to_kill or (turns == worst.turns_to_kill
+                                               and opening <= worst.damage_per_turn)
+
+
+def search_subtree(profile: HandProfile, enemy: EnemyProfile, candidates: Sequence[str], first: int,
+                   max_jokers: int, top_k: int, items: int = 0, prune: bool = True) -> Tuple[List[LoadoutScore], int]:
+    """Worker entry point: best loadouts whose first canonical joker is candidate *first*.
+
+    Returns (top scores, loadouts evaluated).
+    """
+    evaluator = _Evaluator(profile, enemy, candidates, items)
+    names = evaluator.candidates
+    top = _TopK(top_k)
+    visited = 0
+
+    def visit(loadout: List[str], start: int) -> None:
+        nonlocal visited
+        visited += 1
+        top.push(evaluator.evaluate(loadout))
+        free = max_jokers - len(loadout)
+        if not free or (prune and top.beaten(*evaluator.bound(loadout, start, free))):
+            return
+        for index in range(start, len(names)):
+            loadout.append(names[index])
+            visit(loadout, index)
+            loadout.pop()
+
+    if first < len(names) and max_jokers > 0:
+        visit([names[first]], first)
+    return top.items, visited
+
+
+def optimize_loadouts(profile: HandProfile, enemy: EnemyProfile, *, max_jokers: int = 5, top_k: int = 10,
+                      candidates: Sequence[str] | None = None, items: int = 0, prune: bool = True,
+                      workers: int | None = None) -> List[LoadoutScore]:
+    """Rank joker multisets of up to *max_jokers* by expected turns-to-kill.
+
+    *candidates* defaults to every joker in JOKER_DEFINITIONS; *items* is
+    the Tarot count Shaman scales with. ``workers=0`` searches in-process.
+    """
+    candidates = tuple(JOKER_DEFINITIONS if candidates is None else candidates)
+    evaluator = _Evaluator(profile, enemy, candidates, items)
+    top = _TopK(top_k)
+    top.push(evaluator.evaluate(()))
+    args = [(profile, enemy, candidates, first, max_jokers, top_k, items, prune)
+            for first in range(len(evaluator.candidates))]
+    if workers == 0:
+        results = [search_subtree(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(search_subtree, *zip(*args)))
+    for scores, _ in results:
+        for score in scores:
+            top.push(score)
+    return top.items
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Rank joker loadouts against an enemy.")
+    parser.add_argument('--enemy', default='Twisted Commander', choices=list(ENEMY_TEMPLATES))
+    parser.add_argument('--hp', type=int, default=None, help="override the template's HP")
+    parser.add_argument('--defense', type=int, default=None, help="override the template's defense")
+    parser.add_argument('--hand-size', type=int, default=8)
+    parser.add_argument('--samples', type=int, default=4000, help="hands sampled for the deck profile")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-jokers', type=int, default=5)
+    parser.add_argument('--items', type=int, default=0, help="Tarot cards held (Shaman)")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count, 0: in-process)")
+    parser.add_argument('--json', action='store_true', help="print one JSON object per loadout")
+    args = parser.parse_args(argv)
+
+    enemy = EnemyProfile.from_template(args.enemy)
+    enemy = EnemyProfile(enemy.hp if args.hp is None else args.hp,
+                         enemy.defense if args.defense is None else args.defense)
+    profile = profile_deck(hand_size=args.hand_size, samples=args.samples, seed=args.seed)
+    scores = optimize_loadouts(profile, enemy, max_jokers=args.max_jokers, top_k=args.top,
+                               items=args.items, workers=args.workers)
+    for rank, score in enumerate(scores, 1):
+        if args.json:
+            print(json.dumps({'rank': rank, 'loadout': list(score.loadout),
+                              'damage_per_turn': round(score.damage_per_turn, 2),
+                              'turns_to_kill': None if math.isinf(score.turns_to_kill)
+                              else round(score.turns_to_kill, 3)}))
+        else:
+            loadout = ' + '.join(score.loadout) or '-'
+            print(f"{rank:>3}. {score.turns_to_kill:6.2f} turns, {score.damage_per_turn:7.1f} dmg: {loadout}")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
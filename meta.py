@@ -1,8 +1,19 @@
+from __future__ import annotations
+
+import atexit
 import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Tuple
+
+from events import notice
 
 META_FILE = Path(__file__).with_suffix('').parent / 'save_meta.json'
+WRITE_DELAY = 1.0  # seconds between file writes; saves in between are coalesced
 
 # Default meta structure
 DEFAULT_META: Dict[str, Any] = {
@@ -14,18 +25,178 @@ DEFAULT_META: Dict[str, Any] = {
 }
 
 
-def load_meta() -> Dict[str, Any]:
-    if META_FILE.exists():
+def _copy_meta(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: list(value) if isinstance(value, list) else value for key, value in data.items()}
+
+
+class MemoryMetaStore:
+    """Meta progression kept in memory instead of save_meta.json.
+
+    Install one with use_meta_store() to run simulations or tests without
+    touching the player's real save.
+    """
+
+    def __init__(self, data: Dict[str, Any] | None = None):
+        self.data = _copy_meta(data if data is not None else DEFAULT_META)
+
+    def load(self) -> Dict[str, Any]:
+        return _copy_meta(self.data)
+
+    def current(self) -> Dict[str, Any]:
+        """The data itself, for reading only."""
+        return self.data
+
+    def save(self, data: Dict[str, Any]) -> None:
+        self.data = _copy_meta(data)
+
+    def flush(self) -> None:
+        pass
+
+
+class FileMetaStore:
+    """Meta progression in a JSON file, parsed once and cached.
+
+    load() re-reads the file only when its modification time (or size)
+    changed since it was last read or written; current() never touches
+    the disk once the cache is warm. save() updates the cache at once and
+    writes the file, but at most once per *write_delay* seconds: saves
+    that come sooner are coalesced into one write at the end of the
+    interval. flush() (also run at exit) writes a pending save now.
+    Writes go to a temporary file that is renamed over the old one, so a
+    crash never leaves a half-written save.
+    """
+
+    def __init__(self, path: Path, write_delay: float = WRITE_DELAY):
+        self.path = path
+        self.write_delay = write_delay
+        self._data: Dict[str, Any] | None = None
+        self._stamp: Tuple[int, int] | None = None  # (mtime_ns, size) of the file as cached; None: no file
+        self._dirty = False
+        self._written = float('-inf')  # time.monotonic() of the last write
+        self._timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+
+    def _stat(self) -> Tuple[int, int] | None:
         try:
-            with META_FILE.open('r', encoding='utf-8') as fp:
-                return json.load(fp)
-        except json.JSONDecodeError:
-            print('Corrupted meta file – resetting.')
-    return DEFAULT_META.copy()
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self, stamp: Tuple[int, int] | None) -> None:
+        data = None
+        if stamp is not None:
+            try:
+                with self.path.open('r', encoding='utf-8') as fp:
+                    data = json.load(fp)
+            except FileNotFoundError:
+                stamp = None
+            except json.JSONDecodeError:
+                notice('Corrupted meta file – resetting.')
+        self._data = data if isinstance(data, dict) else _copy_meta(DEFAULT_META)
+        self._stamp = stamp
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self._dirty:  # an unwritten save is newer than the file
+                stamp = self._stat()
+                if self._data is None or stamp != self._stamp:
+                    self._read(stamp)
+            return _copy_meta(self._data)
+
+    def current(self) -> Dict[str, Any]:
+        """The cached data, for reading only; the file is read only if nothing is cached yet."""
+        with self._lock:
+            if self._data is None:
+                self._read(self._stat())
+            return self._data
+
+    def save(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data = _copy_meta(data)
+            self._dirty = True
+            if self._timer is not None:
+                return  # the pending write will include this save
+            wait = self._written + self.write_delay - time.monotonic()
+            if wait <= 0:
+                self.flush()
+            else:
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write a pending save now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            fd, tmp = tempfile.mkstemp(prefix=self.path.name, suffix='.tmp', dir=self.path.parent)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                    json.dump(self._data, fp, indent=2)
+                    fp.flush()
+                    os.fsync(fp.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._dirty = False
+            self._written = time.monotonic()
+            self._stamp = self._stat()
+
+
+_store: MemoryMetaStore | FileMetaStore | None = None  # None: the file store of META_FILE
+_file_stores: Dict[Path, FileMetaStore] = {}
+
+
+def meta_store() -> MemoryMetaStore | FileMetaStore:
+    """The store load_meta/save_meta use: the installed one, else the (shared) one of META_FILE."""
+    if _store is not None:
+        return _store
+    store = _file_stores.get(META_FILE)
+    if store is None:
+        store = _file_stores[META_FILE] = FileMetaStore(META_FILE)
+    return store
+
+
+@contextmanager
+def use_meta_store(store: MemoryMetaStore | FileMetaStore) -> Iterator[MemoryMetaStore | FileMetaStore]:
+    """Route load_meta/save_meta to *store* for the duration of the block."""
+    global _store
+    previous, _store = _store, store
+    try:
+        yield store
+    finally:
+        _store = previous
+
+
+def load_meta() -> Dict[str, Any]:
+    """A fresh copy of the meta data (re-read if the file changed)."""
+    return meta_store().load()
+
+
+def current_meta() -> Dict[str, Any]:
+    """The meta data as last loaded or saved, without checking the file; do not modify it."""
+    return meta_store().current()
 
 
 def save_meta(data: Dict[str, Any]):
-    META_FILE.write_text(json.dumps(data, indent=2))
+    meta_store().save(data)
+
+
+@atexit.register
+def flush_meta() -> None:
+    """Write every pending save now."""
+    for store in [*_file_stores.values(), _store]:
+        if store is None:
+            continue
+        try:
+            store.flush()
+        except OSError as exc:
+            notice(f"Could not save meta progression: {exc}")
 
 
 def add_permanent_hp(meta: Dict[str, Any], amount: int):
@@ -843,6 +843,7 @@ class DialogueManager:
         if player_stats:
             if 'beggar' not in player_stats.jokers:
                 player_stats.jokers.append('beggar')
+                player_stats.jokers_changed()
                 print("The Beggar has joined your team as a companion!")
                 print("You now have the Beggar joker ability!")
             else:
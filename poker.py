@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 from card import Card
 from constants import HAND_MULTIPLIERS
+from hand_evaluator import HAND_INDEX, HAND_RANKING, classify
 
 
 # ---------------------------------------------------------------------------
@@ -15,66 +19,129 @@ def get_poker_hand(cards: List[Card]) -> Tuple[str, List[int]]:
 
     Returns a tuple: (hand_name, sorted_card_values)
     If the hand is invalid (not 5 cards) returns ("Invalid Hand", []).
+    Classification is a table lookup, see :mod:`hand_evaluator`.
     """
     if len(cards) != 5:
         return "Invalid Hand", []
+    hand_name, _, values = classify(cards)
+    return hand_name, list(values)
 
-    values = sorted([card.value for card in cards])
-    suits = [card.suit for card in cards]
 
-    # Count occurrences of each rank value
-    rank_counts = {}
-    for v in values:
-        rank_counts[v] = rank_counts.get(v, 0) + 1
+def classify_selection(cards: Sequence[Card]) -> Tuple[str, int]:
+    """Classify an attack selection of any size and return (hand_type, mult).
 
-    is_flush = len(set(suits)) == 1
-    # Straight check (wheel straight included)
-    is_sequential = all(values[i + 1] == values[i] + 1 for i in range(4))
-    is_wheel_straight = values == [2, 3, 4, 5, 14]  # Ace acting low
-    is_straight = is_sequential or is_wheel_straight
+    Five cards form a full poker hand. Smaller selections only score rank
+    groups (High Card, Pair, Two Pair, Three/Four of a Kind); any other
+    combination is a "Strike" with a multiplier of 1.
+    """
+    if len(cards) == 5:
+        hand_type, _, _ = classify(cards)
+        return hand_type, HAND_MULTIPLIERS.get(hand_type, 0)
 
+    # Detect partial combinations for 2–4 card selections
+    rank_counts: dict[int, int] = {}
+    for card in cards:
+        rank_counts[card.value] = rank_counts.get(card.value, 0) + 1
     counts = sorted(rank_counts.values(), reverse=True)
 
-    # New combinations first (highest priority)
-    if counts == [5]:  # Five of a Kind
-        return "Five of a Kind", values
-    
-    # Check for Flush Five (5 cards same rank and suit)
-    if counts == [5] and is_flush:
-        return "Flush Five", values
-    
-    # Check for Royal Flush
-    if is_straight and is_flush and values == [10, 11, 12, 13, 14]:
-        return "Royal Flush", values
-    
-    # Check for Straight Flush
-    if is_straight and is_flush:
-        return "Straight Flush", values
-    
-    # Check for Flush House (Full House + Flush)
-    if counts == [3, 2] and is_flush:
-        return "Flush House", values
-    
-    # Standard combinations
-    if counts == [4, 1]:
-        return "Four of a Kind", values
-    if counts == [3, 2]:
-        return "Full House", values
-    if is_flush:
-        return "Flush", values
-    if is_straight:
-        return "Straight", values
-    if counts == [3, 1, 1]:
-        return "Three of a Kind", values
-    if counts == [2, 2, 1]:
-        return "Two Pair", values
-    if counts == [2, 1, 1, 1]:
-        return "Pair", values
-    return "High Card", values
+    if counts == [4]:
+        hand_type = "Four of a Kind"
+    elif counts == [3, 1]:
+        hand_type = "Three of a Kind"
+    elif counts == [2, 2]:
+        hand_type = "Two Pair"
+    elif counts == [2, 1] or counts == [2]:
+        hand_type = "Pair"
+    elif len(cards) == 1 or counts == [1]:
+        hand_type = "High Card"
+    else:
+        hand_type = "Strike"
+    return hand_type, HAND_MULTIPLIERS.get(hand_type, 1)
 
 
 # Convenience function ------------------------------------------------------
 
 def hand_multiplier(hand_name: str) -> int:
     """Return the base multiplier for a poker hand."""
-    return HAND_MULTIPLIERS.get(hand_name, 0) 
\ No newline at end of file
+    return HAND_MULTIPLIERS.get(hand_name, 0) 
+
+
+# ---------------------------------------------------------------------------
+# Vectorised batch classification (requires NumPy)
+# ---------------------------------------------------------------------------
+
+# 13-bit rank masks of every straight (bit 0 = '2', bit 12 = 'A'), wheel included
+_STRAIGHT_MASKS = [0b11111 << low for low in range(9)] + [0b1000000001111]
+_ROYAL_MASK = 0b11111 << 8
+
+_BATCH_ROWS = 1 << 18  # rows per chunk, bounds the size of the rank histogram
+
+
+def encode_cards(cards: Sequence[Card]) -> List[int]:
+    """Encode cards as integers 0..51 (suit index * 13 + rank index)."""
+    return [c.id for c in cards]
+
+
+def classify_hands_array(card_ids: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """Classify many 5-card hands at once.
+
+    *card_ids* is an (N, 5) integer array of cards encoded as in
+    encode_cards. Returns (categories, multipliers): categories index
+    hand_evaluator.HAND_RANKING and multipliers hold the matching
+    HAND_MULTIPLIERS values. Results match get_poker_hand card for card.
+    """
+    import numpy as np
+
+    ids = np.asarray(card_ids)
+    if ids.ndim != 2 or ids.shape[1] != 5:
+        raise ValueError(f"Expected an (N, 5) array of card ids, got shape {ids.shape}")
+
+    categories = np.empty(len(ids), dtype=np.int8)
+    for start in range(0, len(ids), _BATCH_ROWS):
+        categories[start:start + _BATCH_ROWS] = _classify_chunk(np, ids[start:start + _BATCH_ROWS])
+
+    multiplier_table = np.array([HAND_MULTIPLIERS[name] for name in HAND_RANKING], dtype=np.int64)
+    return categories, multiplier_table[categories]
+
+
+def _classify_chunk(np, ids: 'np.ndarray') -> 'np.ndarray':
+    rows = np.arange(len(ids))
+    ranks = ids % 13
+    suits = ids // 13
+
+    # Rank histogram, built one column at a time (ranks within a column never collide)
+    counts = np.zeros((len(ids), 13), dtype=np.uint8)
+    for col in range(5):
+        counts[rows, ranks[:, col]] += 1
+    max_count = counts.max(axis=1)
+    distinct = np.count_nonzero(counts, axis=1)
+
+    rank_mask = np.zeros(len(ids), dtype=np.int64)
+    for col in range(5):
+        rank_mask |= np.left_shift(1, ranks[:, col]).astype(np.int64)
+
+    flush = (suits == suits[:, :1]).all(axis=1)
+    straight = (distinct == 5) & np.isin(rank_mask, _STRAIGHT_MASKS)
+    full_house = (max_count == 3) & (distinct == 2)
+
+    # Same precedence as hand_evaluator's reference classification
+    conditions = [
+        flush & (max_count == 5),
+        max_count == 5,
+        straight & flush & (rank_mask == _ROYAL_MASK),
+        straight & flush,
+        full_house & flush,
+        max_count == 4,
+        full_house,
+        flush,
+        straight,
+        max_count == 3,
+        (max_count == 2) & (distinct == 3),
+        max_count == 2,
+    ]
+    names = [
+        "Flush Five", "Five of a Kind", "Royal Flush", "Straight Flush", "Flush House",
+        "Four of a Kind", "Full House", "Flush", "Straight", "Three of a Kind", "Two Pair", "Pair",
+    ]
+    return np.select(conditions, [HAND_INDEX[n] for n in names], default=HAND_INDEX["High Card"])
+
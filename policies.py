@@ -0,0 +1,290 @@
+"""Automated play policies for the combat engine.
+
+A policy looks at a CombatEngine in its PLAYER_TURN phase and returns the
+next action; any callable ``policy(engine) -> Action`` works with
+CombatEngine.run, game.play_game and simulate.py. The built-ins are plain
+module-level classes holding only numbers and seeds, so they pickle into
+worker processes.
+
+* RandomPolicy      - random legal plays, as a baseline.
+* GreedyPolicy      - the highest predicted damage attack right now.
+* DiscardToImprove  - redraw the cards outside a weak best hand first.
+* LookaheadPolicy   - samples refills from the actual deck contents to
+                      decide between attacking now and discarding, within
+                      a time budget.
+
+Shop policies are the same idea for shop.run_shop: ``policy(player,
+items)`` returns the index of the next item to buy, or None to leave.
+
+Policies without a seed draw from the global ``random`` module, so a
+seeded simulation stays reproducible.
+"""
+from __future__ import annotations
+
+import copy
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Sequence, Tuple, TYPE_CHECKING
+
+from card import Card
+from combat_engine import Action, Attack, CombatEngine, Discard, EndTurn
+from hand_evaluator import HAND_INDEX
+from hand_finder import MAX_SELECTION, HandSuggestion, suggest_hands
+
+if TYPE_CHECKING:
+    from entities.player import Player
+    from shop import ShopItem
+
+
+class Policy(ABC):
+    """Base class: choose the next action for the player."""
+
+    name = 'policy'
+
+    @abstractmethod
+    def choose(self, engine: CombatEngine) -> Action:
+        ...
+
+    def __call__(self, engine: CombatEngine) -> Action:
+        return self.choose(engine)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"{type(self).__name__}()"
+
+
+def _best(engine: CombatEngine) -> HandSuggestion | None:
+    suggestions = suggest_hands(engine.player, top_k=1, enemy=engine.enemy)
+    return suggestions[0] if suggestions else None
+
+
+def _attack_best(engine: CombatEngine) -> Action:
+    best = _best(engine)
+    return Attack(best.indices) if best else EndTurn()
+
+
+# ---------------------------------------------------------------------------
+# Built-in policies
+# ---------------------------------------------------------------------------
+
+class RandomPolicy(Policy):
+    """Attack with 1-5 random cards; sometimes discard random cards first."""
+
+    name = 'random'
+
+    def __init__(self, discard_chance: float = 0.2, seed: int | None = None):
+        self.discard_chance = discard_chance
+        self._rng = random.Random(seed) if seed is not None else None
+
+    def choose(self, engine: CombatEngine) -> Action:
+        rng = self._rng or random
+        hand_len = len(engine.player.hand)
+        if not hand_len:
+            return EndTurn()
+        if engine.can_discard() and rng.random() < self.discard_chance:
+            return Discard(tuple(rng.sample(range(hand_len), rng.randint(1, hand_len))))
+        return Attack(tuple(rng.sample(range(hand_len), rng.randint(1, min(MAX_SELECTION, hand_len)))))
+
+
+class GreedyPolicy(Policy):
+    """Always play the highest predicted damage selection."""
+
+    name = 'greedy'
+
+    def choose(self, engine: CombatEngine) -> Action:
+        return _attack_best(engine)
+
+
+class DiscardToImprove(Policy):
+    """Discard everything outside the best hand while it is weaker than *target*.
+
+    The scoring core (pairs, trips, ...) is kept and the rest is redrawn,
+    as long as discards remain; then the best hand is played.
+    """
+
+    name = 'discard'
+
+    def __init__(self, target: str = 'Three of a Kind'):
+        self.target = HAND_INDEX[target]
+
+    def choose(self, engine: CombatEngine) -> Action:
+        best = _best(engine)
+        if best is None:
+            return EndTurn()
+        strength = HAND_INDEX.get(best.hand_type, -1)  # Strike ranks lowest
+        if strength < self.target and engine.can_discard():
+            rest = tuple(i for i in range(len(engine.player.hand)) if i not in best.indices)
+            if rest:
+                return Discard(rest)
+        return Attack(best.indices)
+
+
+class LookaheadPolicy(Policy):
+    """Compare attacking now with candidate discards by sampling the deck.
+
+    Candidates are "redraw everything outside one of the top suggestions"
+    plus "keep only the biggest suit". Each is scored by the mean best
+    attack damage over refills drawn from the remaining deck; candidates
+    are sampled round-robin until *time_budget* seconds (or *max_samples*
+    refills each) are used up. A discard is taken only if its estimate
+    beats attacking now by *margin*.
+    """
+
+    name = 'lookahead'
+
+    def __init__(self, time_budget: float = 0.02, max_samples: int = 64, candidates: int = 3,
+                 margin: float = 1.1, seed: int | None = None):
+        self.time_budget = time_budget
+        self.max_samples = max_samples
+        self.candidates = candidates
+        self.margin = margin
+        self._rng = random.Random(seed) if seed is not None else None
+
+    def choose(self, engine: CombatEngine) -> Action:
+        player = engine.player
+        suggestions = suggest_hands(player, top_k=self.candidates, enemy=engine.enemy)
+        if not suggestions:
+            return EndTurn()
+        attack_now = Attack(suggestions[0].indices)
+        if not engine.can_discard():
+            return attack_now
+        deck = list(player.deck.unordered())
+        discards = self._candidate_discards(player.hand, suggestions, len(deck))
+        if not discards:
+            return attack_now
+
+        rng = self._rng or random
+        scratch = copy.copy(player)  # shares everything but the hand we overwrite
+        totals: Dict[Tuple[int, ...], float] = dict.fromkeys(discards, 0.0)
+        counts: Dict[Tuple[int, ...], int] = dict.fromkeys(discards, 0)
+        deadline = time.perf_counter() + self.time_budget
+        for _ in range(self.max_samples):
+            for discard in discards:
+                kept = [card for i, card in enumerate(player.hand) if i not in discard]
+                scratch.hand = kept + rng.sample(deck, len(discard))
+                best = suggest_hands(scratch, top_k=1, enemy=engine.enemy)
+                totals[discard] += best[0].damage if best else 0.0
+                counts[discard] += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        choice = max(discards, key=lambda d: totals[d] / counts[d])
+        if totals[choice] / counts[choice] > suggestions[0].damage * self.margin:
+            return Discard(choice)
+        return attack_now
+
+    @staticmethod
+    def _candidate_discards(hand: Sequence[Card], suggestions: List[HandSuggestion],
+                            deck_size: int) -> List[Tuple[int, ...]]:
+        candidates: List[Tuple[int, ...]] = []
+        for suggestion in suggestions:
+            candidates.append(tuple(i for i in range(len(hand)) if i not in suggestion.indices))
+        by_suit: Dict[str, List[int]] = {}
+        for i, card in enumerate(hand):
+            by_suit.setdefault(card.suit, []).append(i)
+        flush_suit = max(by_suit.values(), key=len)
+        candidates.append(tuple(i for i in range(len(hand)) if i not in flush_suit))
+        unique = dict.fromkeys(c for c in candidates if 0 < len(c) <= deck_size)
+        return list(unique)
+
+
+# ---------------------------------------------------------------------------
+# Shop policies
+# ---------------------------------------------------------------------------
+
+def _affordable(player: 'Player', items: List['ShopItem']) -> List[int]:
+    """Indices of items the player can pay for and actually use."""
+    room = len(player.jokers) < player.max_jokers
+    return [i for i, item in enumerate(items)
+            if item.cost <= player.gold and (item.kind != 'joker' or room)]
+
+
+class ShopPolicy(ABC):
+    """Base class: pick the next shop item to buy, or None to leave."""
+
+    name = 'shop'
+
+    @abstractmethod
+    def choose(self, player: 'Player', items: List['ShopItem']) -> int | None:
+        ...
+
+    def __call__(self, player: 'Player', items: List['ShopItem']) -> int | None:
+        return self.choose(player, items)
+
+
+class SkipShop(ShopPolicy):
+    """Never buy anything."""
+
+    name = 'skip'
+
+    def choose(self, player: 'Player', items: List['ShopItem']) -> int | None:
+        return None
+
+
+class PreferKind(ShopPolicy):
+    """Buy affordable items in order of *kinds* (e.g. jokers before HP)."""
+
+    name = 'prefer'
+
+    def __init__(self, kinds: Sequence[str] = ('joker', 'hp')):
+        self.kinds = tuple(kinds)
+
+    def choose(self, player: 'Player', items: List['ShopItem']) -> int | None:
+        affordable = [i for i in _affordable(player, items) if items[i].kind in self.kinds]
+        if not affordable:
+            return None
+        return min(affordable, key=lambda i: self.kinds.index(items[i].kind))
+
+
+class RandomShopping(ShopPolicy):
+    """Buy a random affordable item with probability *buy_chance*, per pick."""
+
+    name = 'random'
+
+    def __init__(self, buy_chance: float = 0.5, seed: int | None = None):
+        self.buy_chance = buy_chance
+        self._rng = random.Random(seed) if seed is not None else None
+
+    def choose(self, player: 'Player', items: List['ShopItem']) -> int | None:
+        rng = self._rng or random
+        affordable = _affordable(player, items)
+        if not affordable or rng.random() >= self.buy_chance:
+            return None
+        return rng.choice(affordable)
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+POLICIES: Dict[str, Callable[..., Policy]] = {
+    RandomPolicy.name: RandomPolicy,
+    GreedyPolicy.name: GreedyPolicy,
+    DiscardToImprove.name: DiscardToImprove,
+    LookaheadPolicy.name: LookaheadPolicy,
+}
+
+
+SHOP_POLICIES: Dict[str, Callable[..., ShopPolicy]] = {
+    SkipShop.name: SkipShop,
+    PreferKind.name: PreferKind,
+    RandomShopping.name: RandomShopping,
+}
+
+
+def make_policy(name: str, **options) -> Policy:
+    """Build a built-in policy by name (see POLICIES)."""
+    try:
+        factory = POLICIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown policy: {name} (choose from {', '.join(POLICIES)})") from None
+    return factory(**options)
+
+
+def make_shop_policy(name: str, **options) -> ShopPolicy:
+    """Build a built-in shop policy by name (see SHOP_POLICIES)."""
+    try:
+        factory = SHOP_POLICIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown shop policy: {name} (choose from {', '.join(SHOP_POLICIES)})") from None
+    return factory(**options)
@@ -0,0 +1,685 @@
+"""Compact binary combat logs: record fights, replay them, seek to a turn.
+
+A log file is ``MAGIC`` followed by records, each a varint payload length
+and the payload, whose first byte is the record kind. Every combat is a
+run of records from HEADER to END, so many fights can be appended to one
+archive and streamed back with read_logs():
+
+    HEADER    seed, keyframe interval, enemy name
+    KEYFRAME  full state between two turns (always one before the fight)
+    TURN      a player turn begins
+    DRAW      card ids drawn into the hand
+    ACTION    the player's action (Attack indices, Discard, item, ...)
+    HAND      hand type and damage of an attack
+    EFFECT    a status effect took hold
+    JOKER     a single-use joker was consumed
+    END       outcome
+
+A recorded CombatEngine runs with a seed (it reseeds the RNG at every
+turn and action), so seed plus actions fully determine the fight; the
+draws, hands, effects and jokers are kept for reading a log and for
+noticing when a replay under changed rules no longer matches. Keyframes
+are written every few turns; seek() restores the nearest one and only
+re-executes the turns after it. Keyframes store explicit fields rather
+than pickles, since logs arrive with player bug reports.
+
+    with CombatRecorder(engine, 'fights.bin'):   # before engine.start()
+        engine.start()
+        ...
+    for log in read_logs('fights.bin'):
+        print(replay(log, strict=False))
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+from collections import deque
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+import status_effects
+from card import CARD_TABLE
+from combat_engine import (
+    Action, Attack, CombatEngine, Discard, EndTurn, MagicianSwap, NecromancerRetrieve, Phase, Strike, UseItem,
+)
+from deck import Deck, MultisetDeck
+from entities.enemy import Enemy
+from entities.player import Player
+from events import (ActionTaken, CardsDrawn, CombatEnded, EffectApplied, HandPlayed, JokerConsumed, TurnStarted,
+                    subscribe)
+from status_effects import StatusEffect, StatusEffectManager, effect_state, restore_effect
+from tarot import TAROT_DEFINITIONS
+
+MAGIC = b'CMBLOG1\n'
+KEYFRAME_EVERY = 5
+
+# Record kinds (first payload byte)
+HEADER, KEYFRAME, TURN, DRAW, ACTION, HAND, EFFECT, JOKER, END = range(1, 10)
+
+_ACTIONS = (Attack, Discard, UseItem, EndTurn, MagicianSwap, NecromancerRetrieve, Strike)
+_ACTION_CODES = {cls: code for code, cls in enumerate(_ACTIONS)}
+
+# Value tags of recorded status effect attributes
+_BOOL, _INT, _FLOAT, _STR, _NONE = range(5)
+
+_DOUBLE = struct.Struct('<d')
+
+
+class ReplayDivergence(ValueError):
+    """A replay drew different cards than the recorded fight."""
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _put_uint(buf: bytearray, n: int) -> None:
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+class RecordWriter:
+    """Builds one record payload: varints, zigzag ints, doubles, blobs.
+
+    Shared with save_game, whose files are framed the same way.
+    """
+
+    __slots__ = ('buf',)
+
+    def __init__(self, kind: int):
+        self.buf = bytearray((kind,))
+
+    def uint(self, n: int) -> None:
+        _put_uint(self.buf, n)
+
+    def int(self, n: int) -> None:
+        self.uint(n << 1 if n >= 0 else (-n << 1) - 1)
+
+    def float(self, x: float) -> None:
+        self.buf += _DOUBLE.pack(x)
+
+    def blob(self, data: bytes) -> None:
+        self.uint(len(data))
+        self.buf += data
+
+    def str(self, text: str) -> None:
+        self.blob(text.encode())
+
+    def ids(self, card_ids: Sequence[int]) -> None:
+        self.blob(bytes(card_ids))
+
+    def strs(self, texts: Sequence[str]) -> None:
+        self.uint(len(texts))
+        for text in texts:
+            self.str(text)
+
+    def record(self) -> bytes:
+        """The payload framed with its length prefix."""
+        framed = bytearray()
+        _put_uint(framed, len(self.buf))
+        return bytes(framed + self.buf)
+
+
+class RecordReader:
+    """Reads back what RecordWriter wrote, starting after the kind byte."""
+
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data: bytes, pos: int = 1):
+        self.data = data
+        self.pos = pos
+
+    def uint(self) -> int:
+        data = self.data
+        result = shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def int(self) -> int:
+        n = self.uint()
+        return (n >> 1) ^ -(n & 1)
+
+    def float(self) -> float:
+        (x,) = _DOUBLE.unpack_from(self.data, self.pos)
+        self.pos += 8
+        return x
+
+    def blob(self) -> bytes:
+        size = self.uint()
+        data = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return data
+
+    def str(self) -> str:
+        return self.blob().decode()
+
+    def ids(self) -> List[int]:
+        return list(self.blob())
+
+    def strs(self) -> List[str]:
+        return [self.str() for _ in range(self.uint())]
+
+
+def _write_action(w: RecordWriter, action: Action) -> None:
+    w.uint(_ACTION_CODES[type(action)])
+    if isinstance(action, (Attack, Discard)):
+        w.uint(len(action.indices))
+        for index in action.indices:
+            w.int(index)
+    elif isinstance(action, Strike):
+        w.float(action.damage)
+    elif not isinstance(action, EndTurn):
+        w.int(action.index)
+
+
+def _read_action(r: RecordReader) -> Action:
+    cls = _ACTIONS[r.uint()]
+    if cls is Attack or cls is Discard:
+        return cls(tuple(r.int() for _ in range(r.uint())))
+    if cls is Strike:
+        return Strike(r.float())
+    if cls is EndTurn:
+        return EndTurn()
+    return cls(r.int())
+
+
+# ---------------------------------------------------------------------------
+# Keyframes
+# ---------------------------------------------------------------------------
+
+def _write_effects(w: RecordWriter, manager: StatusEffectManager) -> None:
+    w.uint(len(manager.effects))
+    for effect in manager.effects:
+        w.str(type(effect).__name__)
+        fields = effect_state(effect)
+        w.uint(len(fields))
+        for key, value in fields.items():
+            w.str(key)
+            if value is None:
+                w.uint(_NONE)
+            elif isinstance(value, bool):
+                w.uint(_BOOL)
+                w.uint(value)
+            elif isinstance(value, int):
+                w.uint(_INT)
+                w.int(value)
+            elif isinstance(value, float):
+                w.uint(_FLOAT)
+                w.float(value)
+            elif isinstance(value, str):
+                w.uint(_STR)
+                w.str(value)
+            else:
+                raise TypeError(f"Cannot record {type(effect).__name__}.{key} ({type(value).__name__})")
+
+
+def _read_effects(r: RecordReader) -> List[StatusEffect]:
+    effects = []
+    for _ in range(r.uint()):
+        name = r.str()
+        cls = getattr(status_effects, name, None)
+        if not (isinstance(cls, type) and issubclass(cls, StatusEffect)):
+            raise ValueError(f"Unknown status effect in log: {name}")
+        fields = {}
+        for _ in range(r.uint()):
+            key, tag = r.str(), r.uint()
+            if tag == _NONE:
+                value = None
+            elif tag == _BOOL:
+                value = bool(r.uint())
+            elif tag == _INT:
+                value = r.int()
+            elif tag == _FLOAT:
+                value = r.float()
+            else:
+                value = r.str()
+            fields[key] = value
+        effects.append(restore_effect(cls, fields))
+    return effects
+
+
+def _write_state(w: RecordWriter, engine: CombatEngine) -> None:
+    player, enemy = engine.player, engine.enemy
+    w.uint(engine.turn)
+    w.float(engine._tarot_bonus)
+    w.str(engine.last_hand)
+
+    for value in (player.hp, player.max_hp, player.hand_size, player.discards_left,
+                  player.max_discards, player.combat_turn):
+        w.int(value)
+    w.float(player.permanent_damage_multiplier)
+    w.float(player.executioner_percent)
+    w.uint(bool(player.abilities_unlocked))
+    w.str(player.executioner_required_hand or '')
+    w.ids([card.id for card in player.hand])
+    w.ids([card.id for card in player.discard_pile])
+    deck = player.deck
+    if isinstance(deck, MultisetDeck):
+        w.uint(2)
+        for count in deck.counts():
+            w.uint(count)
+    else:
+        w.uint(int(deck.shuffle_pending))
+        w.ids([card.id for card in deck.unordered()])
+    w.strs(player.jokers)
+    w.strs([getattr(item, 'key', '') for item in player.items])
+    _write_effects(w, player.status_effects)
+
+    for value in (enemy.hp, enemy.max_hp, enemy.attack_value, enemy.defense):
+        w.int(value)
+    _write_effects(w, enemy.status_effects)
+
+
+def _read_state(r: RecordReader, log: 'CombatLog') -> CombatEngine:
+    turn = r.uint()
+    tarot_bonus = r.float()
+    last_hand = r.str()
+
+    hp, max_hp, hand_size, discards_left, max_discards, combat_turn = (r.int() for _ in range(6))
+    damage_multiplier, executioner_percent = r.float(), r.float()
+    abilities_unlocked = bool(r.uint())
+    executioner_hand = r.str() or None
+    hand, discard_pile = r.ids(), r.ids()
+    deck_kind = r.uint()
+    if deck_kind == 2:
+        deck = MultisetDeck([r.uint() for _ in range(len(CARD_TABLE))])
+    else:
+        deck = Deck.from_ids(r.ids())
+        if deck_kind:
+            deck.shuffle()
+
+    player = Player(deck)
+    player.hp, player.max_hp, player.hand_size = hp, max_hp, hand_size
+    player.discards_left, player.max_discards, player.combat_turn = discards_left, max_discards, combat_turn
+    player.permanent_damage_multiplier = damage_multiplier
+    player.executioner_percent = executioner_percent
+    player.abilities_unlocked = abilities_unlocked
+    player.executioner_required_hand = executioner_hand
+    player.hand = [CARD_TABLE[i] for i in hand]
+    player.discard_pile = [CARD_TABLE[i] for i in discard_pile]
+    player.jokers = r.strs()
+    player.items = [TAROT_DEFINITIONS[key] for key in r.strs() if key in TAROT_DEFINITIONS]
+    player.status_effects.effects = _read_effects(r)
+
+    enemy_hp, enemy_max_hp, attack, defense = (r.int() for _ in range(4))
+    enemy = Enemy(log.enemy_name, enemy_max_hp, attack, defense)
+    enemy.hp = enemy_hp
+    enemy.status_effects.effects = _read_effects(r)
+
+    engine = CombatEngine(player, enemy, start=False, seed=log.seed)
+    engine.turn = turn
+    engine._tarot_bonus = tarot_bonus
+    engine.last_hand = last_hand
+    if turn:
+        engine.phase = Phase.ENEMY_TURN  # between turns; resume() begins the next one
+    return engine
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class CombatRecorder:
+    """Append one fight of *engine* to *target* (a path or a binary stream).
+
+    Attach before engine.start(); the engine is given a random seed if it
+    has none. Recording stops at the end of the fight or on close(). Only
+    one fight per process should be recorded at a time, since the recorder
+    listens on the global event bus.
+    """
+
+    def __init__(self, engine: CombatEngine, target: Union[str, os.PathLike, BinaryIO], *,
+                 keyframe_every: int = KEYFRAME_EVERY):
+        if engine.phase is not Phase.SETUP:
+            raise ValueError("Attach the recorder before the combat starts")
+        if keyframe_every < 1:
+            raise ValueError("keyframe_every must be positive")
+        if engine.seed is None:
+            engine.seed = int.from_bytes(os.urandom(8), 'little') >> 1
+        self.engine = engine
+        self.keyframe_every = keyframe_every
+        if isinstance(target, (str, os.PathLike)):
+            self._stream: BinaryIO | None = open(target, 'ab')
+            self._owns_stream = True
+        else:
+            self._stream = target
+            self._owns_stream = False
+        if self._stream.tell() == 0:
+            self._stream.write(MAGIC)
+
+        w = RecordWriter(HEADER)
+        w.uint(engine.seed)
+        w.uint(keyframe_every)
+        w.str(engine.enemy.name)
+        self._emit(w)
+        self._keyframe()
+
+        handlers: List[Tuple[type, Callable]] = [
+            (TurnStarted, self._on_turn), (CardsDrawn, self._on_draw), (ActionTaken, self._on_action),
+            (HandPlayed, self._on_hand), (EffectApplied, self._on_effect), (JokerConsumed, self._on_joker),
+            (CombatEnded, self._on_end),
+        ]
+        self._unsubscribe = [subscribe(channel, handler) for channel, handler in handlers]
+
+    def __enter__(self) -> 'CombatRecorder':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop listening and flush; closes the file if the recorder opened it."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+        if self._stream is not None:
+            self._stream.flush()
+            if self._owns_stream:
+                self._stream.close()
+            self._stream = None
+
+    def _emit(self, w: RecordWriter) -> None:
+        if self._stream is not None:
+            self._stream.write(w.record())
+
+    def _keyframe(self) -> None:
+        w = RecordWriter(KEYFRAME)
+        _write_state(w, self.engine)
+        self._emit(w)
+
+    # Event handlers -------------------------------------------------------
+    def _on_turn(self, event: TurnStarted) -> None:
+        if event.turn > 1 and (event.turn - 1) % self.keyframe_every == 0:
+            self._keyframe()
+        w = RecordWriter(TURN)
+        w.uint(event.turn)
+        self._emit(w)
+
+    def _on_draw(self, event: CardsDrawn) -> None:
+        w = RecordWriter(DRAW)
+        w.ids(event.cards)
+        self._emit(w)
+
+    def _on_action(self, event: ActionTaken) -> None:
+        w = RecordWriter(ACTION)
+        _write_action(w, event.action)
+        self._emit(w)
+
+    def _on_hand(self, event: HandPlayed) -> None:
+        w = RecordWriter(HAND)
+        w.str(event.hand_type)
+        w.uint(event.cards)
+        w.int(int(event.base_damage))
+        w.int(int(event.total_damage))
+        self._emit(w)
+
+    def _on_effect(self, event: EffectApplied) -> None:
+        w = RecordWriter(EFFECT)
+        w.str(event.target)
+        w.str(event.effect)
+        w.float(event.amount)
+        self._emit(w)
+
+    def _on_joker(self, event: JokerConsumed) -> None:
+        w = RecordWriter(JOKER)
+        w.str(event.key)
+        self._emit(w)
+
+    def _on_end(self, event: CombatEnded) -> None:
+        w = RecordWriter(END)
+        w.uint(event.won)
+        w.uint(event.turn)
+        w.int(self.engine.player.hp)
+        w.int(self.engine.enemy.hp)
+        self._emit(w)
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Outcome:
+    """How a fight ended (or stood, for an unfinished replay)."""
+
+    won: bool | None  # None while the fight is still going
+    turn: int
+    player_hp: int
+    enemy_hp: int
+
+
+@dataclass
+class CombatLog:
+    """One recorded fight: its header and raw record payloads."""
+
+    seed: int
+    keyframe_every: int
+    enemy_name: str
+    records: List[bytes]
+    keyframes: Dict[int, int]  # engine turn at the keyframe -> record index
+
+    @property
+    def outcome(self) -> Outcome | None:
+        """The recorded result, or None if the fight was never finished."""
+        last = self.records[-1] if self.records else b''
+        if not last or last[0] != END:
+            return None
+        r = RecordReader(last)
+        return Outcome(bool(r.uint()), r.uint(), r.int(), r.int())
+
+    def actions(self) -> List[Action]:
+        return [_read_action(RecordReader(record)) for record in self.records if record[0] == ACTION]
+
+    def decoded(self) -> Iterator[Tuple[str, object]]:
+        """Yield (kind, value) pairs for reading a log; keyframes are skipped."""
+        for record in self.records:
+            kind, r = record[0], RecordReader(record)
+            if kind == TURN:
+                yield 'turn', r.uint()
+            elif kind == DRAW:
+                yield 'draw', [CARD_TABLE[i] for i in r.ids()]
+            elif kind == ACTION:
+                yield 'action', _read_action(r)
+            elif kind == HAND:
+                yield 'hand', (r.str(), r.uint(), r.int(), r.int())
+            elif kind == EFFECT:
+                yield 'effect', (r.str(), r.str(), r.float())
+            elif kind == JOKER:
+                yield 'joker', r.str()
+            elif kind == END:
+                yield 'end', self.outcome
+
+
+def _read_uint(stream: BinaryIO) -> int | None:
+    result = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("Truncated combat log")
+            return None
+        result |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return result
+        shift += 7
+
+
+def _iter_records(stream: BinaryIO) -> Iterator[bytes]:
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a combat log")
+    while True:
+        size = _read_uint(stream)
+        if size is None:
+            return
+        payload = stream.read(size)
+        if len(payload) != size or not size:
+            raise ValueError("Truncated combat log")
+        yield payload
+
+
+def read_logs(source: Union[str, os.PathLike, BinaryIO]) -> Iterator[CombatLog]:
+    """Stream the fights of a log file in order; unfinished ones are included."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as stream:
+            yield from read_logs(stream)
+        return
+
+    log: CombatLog | None = None
+    for record in _iter_records(source):
+        kind = record[0]
+        if kind == HEADER:
+            if log is not None:
+                yield log
+            r = RecordReader(record)
+            log = CombatLog(r.uint(), r.uint(), r.str(), [], {})
+            continue
+        if log is None:
+            raise ValueError("Combat log record before any header")
+        if kind == KEYFRAME:
+            log.keyframes[RecordReader(record).uint()] = len(log.records)
+        log.records.append(record)
+        if kind == END:
+            yield log
+            log = None
+    if log is not None:
+        yield log
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ReplayResult:
+    outcome: Outcome
+    diverged_turn: int | None = None  # first turn whose draws differed from the log
+    rejected_actions: int = 0  # recorded actions the rules refused (skipped)
+
+
+def _restore(log: CombatLog, turn: int) -> Tuple[CombatEngine, int]:
+    """Engine at the start of *turn* (before its draws), from the nearest keyframe."""
+    key = max((k for k in log.keyframes if k < turn), default=None)
+    if key is None:
+        raise ValueError(f"No keyframe before turn {turn}")
+    index = log.keyframes[key]
+    return _read_state(RecordReader(log.records[index]), log), index
+
+
+def _execute(log: CombatLog, engine: CombatEngine, index: int, *, until_turn: int | None,
+             strict: bool) -> ReplayResult:
+    drawn: deque = deque()
+    unsubscribe = subscribe(CardsDrawn, lambda event: drawn.append(event.cards))
+    diverged: int | None = None
+    rejected = 0
+    try:
+        if engine.phase is Phase.SETUP:
+            engine.start()
+        else:
+            engine.resume()
+        for record in log.records[index + 1:]:
+            kind = record[0]
+            if kind == DRAW and diverged is None:
+                expected = bytes(RecordReader(record).blob())
+                if not drawn or bytes(drawn.popleft()) != expected:
+                    if strict:
+                        raise ReplayDivergence(f"Replay of seed {log.seed} diverged on turn {engine.turn}")
+                    diverged = engine.turn
+            elif kind == ACTION:
+                if engine.finished or (until_turn is not None and engine.turn >= until_turn):
+                    break
+                try:
+                    engine.step(_read_action(RecordReader(record)))
+                except ValueError:
+                    rejected += 1  # refused now, or already refused when recorded
+            elif kind == END:
+                break
+    finally:
+        unsubscribe()
+
+    won = engine.won if engine.finished else None
+    outcome = Outcome(won, engine.turn, engine.player.hp, engine.enemy.hp)
+    return ReplayResult(outcome, diverged, rejected)
+
+
+def replay(log: CombatLog, *, strict: bool = True) -> ReplayResult:
+    """Re-execute a whole fight through the current combat rules.
+
+    With *strict*, a draw that differs from the log raises
+    ReplayDivergence; otherwise the first divergent turn is reported and the
+    fight goes on (re-scoring after rule changes). Actions the rules refuse
+    are skipped and counted either way, as the UI may have sent them too.
+    """
+    engine, index = _restore(log, 1)
+    return _execute(log, engine, index, until_turn=None, strict=strict)
+
+
+def seek(log: CombatLog, turn: int, *, strict: bool = True) -> CombatEngine:
+    """Engine positioned at the start of player turn *turn*, cards drawn.
+
+    Restores the closest keyframe before *turn* and replays only the turns
+    after it. The engine keeps its seed, so stepping it further continues
+    the fight exactly as recorded.
+    """
+    if turn < 1:
+        raise ValueError("Turns start at 1")
+    engine, index = _restore(log, turn)
+    _execute(log, engine, index, until_turn=turn, strict=strict)
+    return engine
+
+
+def rescore(source: Union[str, os.PathLike, BinaryIO]) -> Iterator[Tuple[CombatLog, ReplayResult]]:
+    """Replay every fight of an archive leniently under the current rules."""
+    for log in read_logs(source):
+        yield log, replay(log, strict=False)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay or inspect recorded combat logs.")
+    parser.add_argument('path', help="combat log file")
+    parser.add_argument('--fight', type=int, default=None, help="only this fight (0-based index)")
+    parser.add_argument('--show', action='store_true', help="print the records of each fight")
+    parser.add_argument('--seek', type=int, default=None, metavar='TURN',
+                        help="print the state at the start of TURN")
+    args = parser.parse_args(argv)
+
+    wins = finished = changed = diverged = 0
+    for number, log in enumerate(read_logs(args.path)):
+        if args.fight is not None and number != args.fight:
+            continue
+        if args.show:
+            print(f"# fight {number}: {log.enemy_name}, seed {log.seed}")
+            for kind, value in log.decoded():
+                print(f"{kind:>6} {value}")
+        if args.seek is not None:
+            engine = seek(log, args.seek, strict=False)
+            player, enemy = engine.player, engine.enemy
+            print(f"fight {number} turn {engine.turn}: player {player.hp}/{player.max_hp} HP, "
+                  f"{enemy.name} {enemy.hp}/{enemy.max_hp} HP, hand {player.hand}, jokers {player.jokers}")
+            continue
+        result = replay(log, strict=False)
+        finished += result.outcome.won is not None
+        wins += bool(result.outcome.won)
+        diverged += result.diverged_turn is not None
+        changed += result.outcome != log.outcome
+        if args.fight is not None:
+            print(f"recorded {log.outcome}\nreplayed {result.outcome}")
+    if args.seek is None:
+        print(f"{finished} finished fights, {wins} won; {changed} changed outcome, "
+              f"{diverged} diverged from the recorded draws")
+
+
+if __name__ == "__main__":
+    main()
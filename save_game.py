@@ -0,0 +1,506 @@
+"""Game saves: an append-only journal of state changes plus snapshots.
+
+meta.py keeps the counters that outlive a run; this module keeps the run
+itself: GameState's own fields, the story act and events, quest statuses
+and objective counts, NPC relationships, unlocked districts, defeated
+bosses, and the player's stats, deck, jokers and items.
+
+The state is split into entries: one per quest and per NPC, and one each
+for the game, story, quest log, world, bosses and player. An entry's
+value is a small tuple of plain values (its signature), cheap enough to
+rebuild and compare every frame. A save is a directory of two files,
+framed like replay logs (a varint length, then a payload whose first
+byte is the record kind), with one record per entry:
+
+    snapshot.bin  MAGIC, SNAPSHOT header (generation), every entry
+    journal.bin   MAGIC, JOURNAL header (generation), entries that changed
+
+GameSaver.checkpoint() journals the entries whose signature changed
+since they were last saved. After COMPACT_AFTER journal records the
+next checkpoint writes every entry as the snapshot of a new generation
+and starts an empty journal. Loading keeps the last record of each entry
+(snapshot first, then the journal if it is of the same generation: a
+crash between writing a snapshot and resetting the journal leaves an
+older journal the snapshot already covers) and applies each entry once,
+so it costs the same however long the game was played. A torn last
+journal record is dropped.
+
+Checkpoints only build records; a background thread does the writes and
+fsyncs, so a checkpoint never waits on the disk.
+
+    saver = GameSaver(game_state)   # SAVE_DIR; loads the save, if any
+    ...
+    saver.tick()      # every frame; checkpoints at most every interval seconds
+    saver.close()     # last checkpoint, then waits for the writes
+
+A fight in progress is not saved (see replay.py for recording fights);
+the player's status effects and per-combat counters are left alone.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+from card import CARD_TABLE
+from deck import Deck, MultisetDeck
+from events import notice
+from replay import RecordReader, RecordWriter
+from tarot import TAROT_DEFINITIONS
+
+SAVE_DIR = Path(__file__).with_suffix('').parent / 'save_game'
+MAGIC = b'GMBSAVE1'
+SNAPSHOT_FILE = 'snapshot.bin'
+JOURNAL_FILE = 'journal.bin'
+COMPACT_AFTER = 256  # journal records before the next checkpoint writes a snapshot
+SAVE_INTERVAL = 1.0  # seconds between checkpoints made by tick()
+
+# Record kinds (first payload byte)
+SNAPSHOT, JOURNAL, GAME, STORY, QUEST_LOG, QUEST, NPC, WORLD, BOSSES, PLAYER = range(1, 11)
+
+# Value tags of signature elements
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _TUPLE = range(8)
+
+Key = Tuple[int, str]  # (record kind, quest or NPC id; '' for the single entries)
+Signature = Tuple[Any, ...]
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _write_value(w: RecordWriter, value: Any) -> None:
+    if value is None:
+        w.uint(_NONE)
+    elif value is True or value is False:
+        w.uint(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        w.uint(_INT)
+        w.int(value)
+    elif isinstance(value, float):
+        w.uint(_FLOAT)
+        w.float(value)
+    elif isinstance(value, str):
+        w.uint(_STR)
+        w.str(value)
+    elif isinstance(value, bytes):
+        w.uint(_BYTES)
+        w.blob(value)
+    elif isinstance(value, tuple):
+        w.uint(_TUPLE)
+        w.uint(len(value))
+        for item in value:
+            _write_value(w, item)
+    else:
+        raise TypeError(f"Cannot save {type(value).__name__}")
+
+
+def _read_value(r: RecordReader) -> Any:
+    tag = r.uint()
+    if tag == _NONE:
+        return None
+    if tag == _FALSE or tag == _TRUE:
+        return tag == _TRUE
+    if tag == _INT:
+        return r.int()
+    if tag == _FLOAT:
+        return r.float()
+    if tag == _STR:
+        return r.str()
+    if tag == _BYTES:
+        return bytes(r.blob())
+    if tag == _TUPLE:
+        return tuple(_read_value(r) for _ in range(r.uint()))
+    raise ValueError(f"Unknown value tag {tag} in save")
+
+
+def _entry_record(key: Key, signature: Signature) -> bytes:
+    w = RecordWriter(key[0])
+    w.str(key[1])
+    _write_value(w, signature)
+    return w.record()
+
+
+def _header_record(kind: int, generation: int) -> bytes:
+    w = RecordWriter(kind)
+    w.uint(generation)
+    return w.record()
+
+
+def _split(data: bytes) -> Tuple[List[bytes], int]:
+    """The complete records after MAGIC, and the offset just past the last one."""
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a save file")
+    records, end = [], len(MAGIC)
+    while end < len(data):
+        r = RecordReader(data, end)
+        try:
+            size = r.uint()
+        except IndexError:
+            break
+        if not size or r.pos + size > len(data):
+            break
+        records.append(data[r.pos:r.pos + size])
+        end = r.pos + size
+    return records, end
+
+
+# ---------------------------------------------------------------------------
+# Entries
+# ---------------------------------------------------------------------------
+
+def _value(member: Any) -> Any:
+    return None if member is None else member.value
+
+
+def _deck_state(deck: Deck | MultisetDeck) -> Tuple[int, Any]:
+    if isinstance(deck, MultisetDeck):
+        return 2, deck.counts()
+    return int(deck.shuffle_pending), bytes(card.id for card in deck.unordered())
+
+
+def _player_signature(player) -> Signature:
+    return (player.hp, player.max_hp, player.gold, player.level, player.exp, player.exp_to_next,
+            player.skill_points, player.permanent_damage_multiplier, player.hand_size,
+            player.max_discards, player.max_jokers, *_deck_state(player.deck),
+            bytes(card.id for card in player.hand), bytes(card.id for card in player.discard_pile),
+            tuple(player.jokers), tuple(getattr(item, 'key', '') for item in player.items),
+            tuple(tuple(point) for point in player.activated_checkpoints),
+            None if player.respawn_position is None else tuple(player.respawn_position),
+            player.beggar_fights_remaining)
+
+
+def entries(state) -> Iterator[Tuple[Key, Signature]]:
+    """Every entry of *state* (a GameState) with its current signature."""
+    quests, story, world = state.quest_manager, state.story_manager, state.world_map
+    yield (GAME, ''), (_value(state.current_district), state.game_started, state.game_completed,
+                       tuple(state.events_triggered), tuple(state.visual_cues_triggered),
+                       tuple(state.world_events_triggered))
+    yield (STORY, ''), (story.current_act.value, tuple(story.triggered_events))
+    yield (QUEST_LOG, ''), (tuple(quests.active_quests), tuple(quests.completed_quests),
+                            tuple(quests.failed_quests))
+    for quest_id, quest in quests.available_quests.items():
+        yield (QUEST, quest_id), (quest.status.value, tuple(obj.current_count for obj in quest.objectives))
+    for npc_id, npc in state.dialogue_manager.npcs.items():
+        yield (NPC, npc_id), (npc.met_player, npc.relationship_level, tuple(npc.quests_given),
+                              tuple(npc.quests_completed))
+    yield (WORLD, ''), (tuple(district.value for district in world.unlocked_districts),
+                        _value(world.current_district))
+    yield (BOSSES, ''), tuple(state.boss_manager.defeated_bosses)
+    yield (PLAYER, ''), _player_signature(state.player)
+
+
+def _apply_game(state, name: str, sig: Signature) -> None:
+    districts = {district.value: district for district in state.world_map.districts}
+    current, state.game_started, state.game_completed = sig[:3]
+    state.current_district = districts.get(current, state.current_district)
+    state.events_triggered, state.visual_cues_triggered, state.world_events_triggered = map(list, sig[3:])
+
+
+def _apply_story(state, name: str, sig: Signature) -> None:
+    story = state.story_manager
+    story.current_act = type(story.current_act)(sig[0])
+    story.triggered_events = list(sig[1])
+    story.story_flags = dict.fromkeys(story.triggered_events, True)
+
+
+def _apply_quest_log(state, name: str, sig: Signature) -> None:
+    quests = state.quest_manager
+    active, completed, failed = sig
+    quests.active_quests = {quest_id: quests.available_quests[quest_id] for quest_id in active
+                            if quest_id in quests.available_quests}
+    quests.completed_quests = list(completed)
+    quests.failed_quests = list(failed)
+
+
+def _apply_quest(state, name: str, sig: Signature) -> None:
+    quest = state.quest_manager.available_quests.get(name)
+    if quest is None:
+        return  # dropped from the game since the save
+    quest.status = type(quest.status)(sig[0])
+    for objective, count in zip(quest.objectives, sig[1]):
+        objective.current_count = min(count, objective.required_count)
+        objective.completed = objective.current_count >= objective.required_count
+
+
+def _apply_npc(state, name: str, sig: Signature) -> None:
+    npc = state.dialogue_manager.npcs.get(name)
+    if npc is None:
+        return
+    npc.met_player, npc.relationship_level = sig[0], sig[1]
+    npc.quests_given, npc.quests_completed = list(sig[2]), list(sig[3])
+
+
+def _apply_world(state, name: str, sig: Signature) -> None:
+    world = state.world_map
+    districts = {district.value: district for district in world.districts}
+    world.unlocked_districts = [districts[value] for value in sig[0] if value in districts]
+    for district_type, district in world.districts.items():
+        district.unlocked = district_type in world.unlocked_districts
+    world.current_district = districts.get(sig[1])
+
+
+def _apply_bosses(state, name: str, sig: Signature) -> None:
+    state.boss_manager.defeated_bosses = list(sig)
+
+
+def _apply_player(state, name: str, sig: Signature) -> None:
+    player = state.player
+    (player.hp, player.max_hp, player.gold, player.level, player.exp, player.exp_to_next,
+     player.skill_points, player.permanent_damage_multiplier, player.hand_size,
+     player.max_discards, player.max_jokers) = sig[:11]
+    deck_kind, deck, hand, discard_pile, jokers, items, checkpoints, respawn, beggar_fights = sig[11:]
+    if deck_kind == 2:
+        player.deck = MultisetDeck(deck)
+    else:
+        player.deck = Deck.from_ids(list(deck))
+        if deck_kind:
+            player.deck.shuffle()
+    player.hand = [CARD_TABLE[i] for i in hand]
+    player.discard_pile = [CARD_TABLE[i] for i in discard_pile]
+    player.discards_left = player.max_discards
+    player.jokers = list(jokers)
+    player.items = [TAROT_DEFINITIONS[key] for key in items if key in TAROT_DEFINITIONS]
+    player.activated_checkpoints = list(checkpoints)
+    player.respawn_position = respawn
+    player.beggar_fights_remaining = beggar_fights  # the Beggar's toll countdown spans fights
+
+
+_APPLY: Dict[int, Callable[[Any, str, Signature], None]] = {
+    GAME: _apply_game, STORY: _apply_story, QUEST_LOG: _apply_quest_log, QUEST: _apply_quest,
+    NPC: _apply_npc, WORLD: _apply_world, BOSSES: _apply_bosses, PLAYER: _apply_player,
+}
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+class SaveData:
+    """What a save directory holds: the latest signature of every entry."""
+
+    def __init__(self, generation: int = 0):
+        self.generation = generation
+        self.entries: Dict[Key, Signature] = {}
+        self.journal_records = 0  # records in the journal tail that were applied
+        self.journal_end: int | None = None  # offset past its last whole record; None: no usable journal
+
+    def apply(self, state) -> None:
+        """Restore *state* (a GameState built as for a new game) to the saved one."""
+        for (kind, name), sig in self.entries.items():
+            _APPLY[kind](state, name, sig)
+
+
+def _read_file(path: Path) -> bytes | None:
+    try:
+        with open(path, 'rb') as fp:
+            return fp.read()
+    except FileNotFoundError:
+        return None
+
+
+def _header(records: List[bytes], kind: int) -> int:
+    if not records or records[0][0] != kind:
+        raise ValueError("Save file without its header")
+    return RecordReader(records[0]).uint()
+
+
+def _read_entries(records: List[bytes], into: Dict[Key, Signature]) -> None:
+    for record in records:
+        r = RecordReader(record)
+        key = (record[0], r.str())
+        into[key] = _read_value(r)
+
+
+def read_save(path: Union[str, os.PathLike]) -> SaveData:
+    """Read the snapshot and journal in *path*; an empty SaveData if there is no save."""
+    path = Path(path)
+    data = SaveData()
+    snapshot = _read_file(path / SNAPSHOT_FILE)
+    if snapshot is not None:
+        records, _ = _split(snapshot)
+        data.generation = _header(records, SNAPSHOT)
+        _read_entries(records[1:], data.entries)
+
+    journal = _read_file(path / JOURNAL_FILE)
+    if journal is not None:
+        records, end = _split(journal)
+        if records and _header(records, JOURNAL) == data.generation:
+            _read_entries(records[1:], data.entries)
+            data.journal_records = len(records) - 1
+            data.journal_end = end
+    return data
+
+
+def load_game(state, path: Union[str, os.PathLike]) -> bool:
+    """Apply the save in *path* to *state*; False if there is none."""
+    data = read_save(path)
+    if not data.entries:
+        return False
+    data.apply(state)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def _replace(path: Path, data: bytes) -> None:
+    """Write *data* to a temporary file and rename it over *path*."""
+    fd, tmp = tempfile.mkstemp(prefix=path.name, suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class _SaveWriter:
+    """Background thread that appends to the journal and writes snapshots, in order."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._queue: queue.Queue[Tuple[str, Any] | None] = queue.Queue()
+        self._journal = None
+        self._thread = threading.Thread(target=self._run, name='save-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def open_journal(self, generation: int, end: int | None) -> None:
+        """Continue the journal at offset *end*, or start one of *generation* if *end* is None."""
+        self._queue.put(('open', (generation, end)))
+
+    def append(self, records: bytes) -> None:
+        self._queue.put(('append', records))
+
+    def snapshot(self, generation: int, records: bytes) -> None:
+        self._queue.put(('snapshot', (generation, records)))
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            op = self._queue.get()
+            try:
+                if op is None:
+                    if self._journal is not None:
+                        self._journal.close()
+                    return
+                getattr(self, '_' + op[0])(op[1])
+            except Exception as exc:  # a failed save must not stop the game, nor later saves
+                notice(f"Could not save the game: {exc}")
+            finally:
+                self._queue.task_done()
+
+    def _open(self, args: Tuple[int, int | None]) -> None:
+        generation, end = args
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        journal = self.path / JOURNAL_FILE
+        if end is None:
+            _replace(journal, MAGIC + _header_record(JOURNAL, generation))
+        self._journal = open(journal, 'r+b')
+        if end is not None:
+            self._journal.truncate(end)  # drop a torn last record
+        self._journal.seek(0, os.SEEK_END)
+
+    def _append(self, records: bytes) -> None:
+        if self._journal is None:
+            raise OSError(f"No journal open in {self.path}")
+        self._journal.write(records)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _snapshot(self, args: Tuple[int, bytes]) -> None:
+        generation, records = args
+        _replace(self.path / SNAPSHOT_FILE, MAGIC + _header_record(SNAPSHOT, generation) + records)
+        self._open((generation, None))
+
+
+class GameSaver:
+    """Keeps a save directory in step with a GameState.
+
+    The save in *path* is applied to *state* first; with load=False, or
+    when there is none, the save is started over from *state* as it is.
+    """
+
+    def __init__(self, state, path: Union[str, os.PathLike] = SAVE_DIR, *, load: bool = True,
+                 interval: float = SAVE_INTERVAL, compact_after: int = COMPACT_AFTER):
+        self.state = state
+        self.path = Path(path)
+        self.interval = interval
+        self.compact_after = compact_after
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        data = read_save(self.path)
+        if not load:  # keep the generation, so the old journal can never match the new snapshot
+            data.entries, data.journal_records, data.journal_end = {}, 0, None
+        data.apply(state)
+        self.loaded = bool(data.entries)
+        self._saved: Dict[Key, Signature] = data.entries
+        self._generation = data.generation
+        self._journal_records = data.journal_records
+        self._last = time.monotonic()
+        self._writer = _SaveWriter(self.path)
+        if self.loaded:
+            self._writer.open_journal(self._generation, data.journal_end)
+        else:
+            self._compact()  # a new game starts from a snapshot of its opening state
+        atexit.register(self.close)
+
+    def tick(self) -> None:
+        """checkpoint() if *interval* seconds passed since the last one; call every frame."""
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.checkpoint()
+
+    def checkpoint(self) -> int:
+        """Journal the entries that changed (or write a snapshot when due); returns how many."""
+        saved = self._saved
+        changed = [(key, sig) for key, sig in entries(self.state) if saved.get(key) != sig]
+        if not changed:
+            return 0
+        for key, sig in changed:
+            saved[key] = sig
+        if self._journal_records + len(changed) > self.compact_after:
+            self._compact()
+        else:
+            self._writer.append(b''.join(_entry_record(key, sig) for key, sig in changed))
+            self._journal_records += len(changed)
+        return len(changed)
+
+    def _compact(self) -> None:
+        saved = self._saved
+        saved.update(entries(self.state))
+        self._generation += 1
+        self._journal_records = 0
+        self._writer.snapshot(self._generation, b''.join(_entry_record(key, sig) for key, sig in saved.items()))
+
+    def flush(self) -> None:
+        """Wait until every checkpoint so far is on disk."""
+        self._writer.flush()
+
+    def close(self) -> None:
+        """Make a last checkpoint and wait for the writes; also run at exit."""
+        atexit.unregister(self.close)
+        self.checkpoint()
+        self._writer.close()
@@ -1,14 +1,17 @@
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 
 from jokers import JOKER_DEFINITIONS
 from entities.player import Player
 
 
 class ShopItem:
-    def __init__(self, name: str, cost: int, purchase_fn: Callable[[Player], None]):
+    def __init__(self, name: str, cost: int, purchase_fn: Callable[[Player], None], kind: str = 'misc',
+                 key: str = ''):
         self.name = name
         self.cost = cost
         self.purchase_fn = purchase_fn
+        self.kind = kind  # 'joker', 'hp' or 'misc'; lets shop policies tell offers apart
+        self.key = key
 
     def buy(self, player: Player):
         if player.gold < self.cost:
@@ -36,11 +39,12 @@ def generate_shop_items() -> List[ShopItem]:
         def make_purchase_fn(k):
             return lambda p: p.add_joker(k)
 
-        items.append(ShopItem(JOKER_DEFINITIONS[key]['name'], cost=15, purchase_fn=make_purchase_fn(key)))
+        items.append(ShopItem(JOKER_DEFINITIONS[key]['name'], cost=15, purchase_fn=make_purchase_fn(key),
+                              kind='joker', key=key))
 
     # HP upgrade
     items.append(ShopItem("Increase Max HP by 10", cost=25, purchase_fn=lambda p: (
-        setattr(p, 'max_hp', p.max_hp + 10), setattr(p, 'hp', p.max_hp))))
+        setattr(p, 'max_hp', p.max_hp + 10), setattr(p, 'hp', p.max_hp)), kind='hp'))
 
     return items
 
@@ -74,4 +78,29 @@ def open_shop(player: Player):
         except ValueError:
             print("Enter a number or X to exit.")
 
-    print("Leaving shop.\n") 
\ No newline at end of file
+    print("Leaving shop.\n")
+
+
+# ---------------------------------------------------------------------------
+# Non-interactive shop
+# ---------------------------------------------------------------------------
+
+# Picks the index of the next item to buy, or None to leave (see policies.py)
+ShopChooser = Callable[[Player, List[ShopItem]], Optional[int]]
+
+
+def run_shop(player: Player, choose: ShopChooser, items: Optional[List[ShopItem]] = None) -> List[ShopItem]:
+    """Visit a shop with *choose* making the decisions; returns what was bought.
+
+    The visit ends when the policy leaves, picks an invalid item or cannot
+    afford its pick.
+    """
+    if items is None:
+        items = generate_shop_items()
+    bought: List[ShopItem] = []
+    while items:
+        idx = choose(player, items)
+        if idx is None or not 0 <= idx < len(items) or not items[idx].buy(player):
+            break
+        bought.append(items.pop(idx))
+    return bought
@@ -0,0 +1,258 @@
+"""Batch combat simulator for balance sweeps.
+
+Runs many headless fights (see combat_engine.py) for every configuration
+in a grid of enemy template x joker loadout x HP bonus x hand size, spread
+over a process pool, and prints aggregated statistics per configuration
+as soon as all of its fights are in:
+
+    python simulate.py --fights 5000 --loadouts "" joker,shaman each
+
+Fights are submitted in chunks. Each chunk seeds the global ``random``
+module (which all game code uses) from (seed, configuration, chunk), so
+every chunk has its own reproducible stream and results do not depend on
+the number of workers. Chunks return mergeable counters rather than raw
+samples, keeping the traffic between processes small.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from combat_engine import Action, CombatEngine
+from entities.enemy import ENEMY_TEMPLATES, create_enemy
+from entities.player import Player
+from jokers import JOKER_DEFINITIONS
+from policies import POLICIES, GreedyPolicy, make_policy
+
+DEFAULT_CHUNK = 250
+MAX_TURNS = 100
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass(frozen=True)
+class SimConfig:
+    """One grid point: who we fight and what the player starts with."""
+
+    enemy: str
+    jokers: Tuple[str, ...] = ()
+    hp_bonus: int = 0
+    hand_size: int = 8
+
+    def label(self) -> str:
+        loadout = '+'.join(self.jokers) or '-'
+        return f"{self.enemy} | {loadout} | hp+{self.hp_bonus} | hand {self.hand_size}"
+
+
+@dataclass
+class SimStats:
+    """Mergeable fight statistics for one configuration."""
+
+    fights: int = 0
+    wins: int = 0
+    turns_to_kill: Counter = field(default_factory=Counter)  # turns -> wins
+    damage: Counter = field(default_factory=Counter)         # damage per attack -> count
+    hand_types: Counter = field(default_factory=Counter)
+
+    def merge(self, other: 'SimStats') -> None:
+        self.fights += other.fights
+        self.wins += other.wins
+        self.turns_to_kill.update(other.turns_to_kill)
+        self.damage.update(other.damage)
+        self.hand_types.update(other.hand_types)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.fights if self.fights else 0.0
+
+    def mean_turns_to_kill(self) -> float | None:
+        if not self.wins:
+            return None
+        return sum(t * n for t, n in self.turns_to_kill.items()) / self.wins
+
+    def damage_percentile(self, pct: float) -> int | None:
+        """Nearest-rank percentile of damage per attack."""
+        total = sum(self.damage.values())
+        if not total:
+            return None
+        rank = max(1, -(-pct * total // 100))
+        seen = 0
+        for value in sorted(self.damage):
+            seen += self.damage[value]
+            if seen >= rank:
+                return value
+        return None  # pragma: no cover
+
+    def summary(self) -> Dict[str, object]:
+        attacks = sum(self.hand_types.values())
+        return {
+            'fights': self.fights,
+            'win_rate': round(self.win_rate, 4),
+            'turns_to_kill': self.mean_turns_to_kill(),
+            'damage': {f'p{p}': self.damage_percentile(p) for p in PERCENTILES},
+            'hand_types': {name: round(n / attacks, 4) for name, n in self.hand_types.most_common()},
+        }
+
+
+# ---------------------------------------------------------------------------
+# Fights
+# ---------------------------------------------------------------------------
+
+def make_player(config: SimConfig) -> Player:
+    player = Player()
+    player.max_hp = player.hp = 100 + config.hp_bonus
+    player.hand_size = config.hand_size
+    player.jokers = list(config.jokers)
+    return player
+
+
+def run_fight(config: SimConfig, stats: SimStats, policy: Callable[[CombatEngine], Action]) -> None:
+    """Play one fight and record it into *stats*."""
+    engine = CombatEngine(make_player(config), create_enemy(config.enemy))
+    while not engine.finished and engine.turn <= MAX_TURNS:
+        result = engine.step(policy(engine))
+        if result.hand_type:
+            stats.damage[int(result.damage_dealt)] += 1
+            stats.hand_types[result.hand_type] += 1
+    stats.fights += 1
+    if engine.won:
+        stats.wins += 1
+        stats.turns_to_kill[engine.turn] += 1
+
+
+def run_chunk(config: SimConfig, seed: int, config_index: int, chunk_index: int, fights: int,
+              policy: Callable[[CombatEngine], Action]) -> SimStats:
+    """Worker entry point: *fights* fights on this chunk's own RNG stream."""
+    random.seed(f"{seed}:{config_index}:{chunk_index}")
+    stats = SimStats()
+    for _ in range(fights):
+        run_fight(config, stats, policy)
+    return stats
+
+
+class _NullWriter:
+    """A stdout that drops everything; far cheaper than writing to os.devnull."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def quiet() -> contextlib.AbstractContextManager:
+    """Discard print() output inside the block (game code reports through print)."""
+    return contextlib.redirect_stdout(_NullWriter())
+
+
+def silence_worker() -> None:
+    """Process pool initializer: nobody reads a worker's stdout."""
+    sys.stdout = _NullWriter()
+
+
+def chunks(total: int, size: int) -> Iterator[Tuple[int, int]]:
+    """Split *total* items into (chunk index, chunk length) pieces of *size*."""
+    for index, start in enumerate(range(0, total, size)):
+        yield index, min(size, total - start)
+
+
+def simulate(configs: Sequence[SimConfig], fights: int, *, seed: int = 0, workers: int | None = None,
+             chunk_size: int = DEFAULT_CHUNK, policy: Callable[[CombatEngine], Action] | None = None,
+             ) -> Iterator[Tuple[SimConfig, SimStats]]:
+    """Yield (config, stats) for every configuration as soon as it is complete.
+
+    *policy* plays every fight (default: GreedyPolicy) and must pickle when
+    workers are used. ``workers=0`` runs everything in this process (in
+    grid order).
+    """
+    if policy is None:
+        policy = GreedyPolicy()
+    if workers == 0:
+        for config_index, config in enumerate(configs):
+            stats = SimStats()
+            for chunk_index, count in chunks(fights, chunk_size):
+                stats.merge(run_chunk(config, seed, config_index, chunk_index, count, policy))
+            yield config, stats
+        return
+
+    totals = [SimStats() for _ in configs]
+    pending = [len(range(0, fights, chunk_size)) for _ in configs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=silence_worker) as pool:
+        futures = {
+            pool.submit(run_chunk, config, seed, config_index, chunk_index, count, policy): config_index
+            for config_index, config in enumerate(configs)
+            for chunk_index, count in chunks(fights, chunk_size)
+        }
+        for future in as_completed(futures):
+            config_index = futures[future]
+            totals[config_index].merge(future.result())
+            pending[config_index] -= 1
+            if not pending[config_index]:
+                yield configs[config_index], totals[config_index]
+
+
+def build_grid(enemies: Sequence[str], loadouts: Sequence[Tuple[str, ...]],
+               hp_bonuses: Sequence[int], hand_sizes: Sequence[int]) -> List[SimConfig]:
+    return [SimConfig(e, l, h, s) for e, l, h, s in product(enemies, loadouts, hp_bonuses, hand_sizes)]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_loadouts(specs: Sequence[str], parser: argparse.ArgumentParser) -> List[Tuple[str, ...]]:
+    loadouts: List[Tuple[str, ...]] = []
+    for spec in specs:
+        if spec == 'each':
+            loadouts.extend((name,) for name in JOKER_DEFINITIONS)
+            continue
+        loadout = tuple(name.strip() for name in spec.split(',') if name.strip())
+        unknown = [name for name in loadout if name not in JOKER_DEFINITIONS]
+        if unknown:
+            parser.error(f"unknown joker(s): {', '.join(unknown)}")
+        loadouts.append(loadout)
+    return loadouts
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate fights over a grid of balance configurations.")
+    parser.add_argument('--enemies', nargs='+', default=list(ENEMY_TEMPLATES),
+                        choices=list(ENEMY_TEMPLATES), metavar='NAME', help="enemy templates (default: all)")
+    parser.add_argument('--loadouts', nargs='+', default=[''],
+                        help="comma-separated joker keys per loadout; '' for none, 'each' for every single joker")
+    parser.add_argument('--hp-bonus', nargs='+', type=int, default=[0])
+    parser.add_argument('--hand-size', nargs='+', type=int, default=[8])
+    parser.add_argument('--policy', default=GreedyPolicy.name, choices=list(POLICIES))
+    parser.add_argument('--fights', type=int, default=1000, help="fights per configuration")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count, 0: in-process)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK)
+    parser.add_argument('--json', action='store_true', help="print one JSON object per configuration")
+    args = parser.parse_args(argv)
+
+    grid = build_grid(args.enemies, _parse_loadouts(args.loadouts, parser), args.hp_bonus, args.hand_size)
+    out = sys.stdout
+    with quiet():
+        for config, stats in simulate(grid, args.fights, seed=args.seed, workers=args.workers,
+                                      chunk_size=args.chunk_size, policy=make_policy(args.policy)):
+            summary = stats.summary()
+            if args.json:
+                line = json.dumps({'enemy': config.enemy, 'jokers': list(config.jokers),
+                                   'hp_bonus': config.hp_bonus, 'hand_size': config.hand_size, **summary})
+            else:
+                damage = ' '.join(f"{k}={v}" for k, v in summary['damage'].items())
+                top = ', '.join(f"{k} {v:.0%}" for k, v in list(summary['hand_types'].items())[:3])
+                line = (f"{config.label()}: win {summary['win_rate']:.1%}, "
+                        f"ttk {summary['turns_to_kill'] or 0:.2f}, dmg {damage}, hands {top}")
+            print(line, file=out, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Run-level simulator: whole roguelike runs, meta progression included.
+
+A *career* is a sequence of game.play_game runs sharing one meta save, so
+the permanent HP bonus earned by a win carries into the next run exactly
+as it does for a player. Every career uses a MemoryMetaStore (the real
+save_meta.json is never touched), its own RNG stream seeded from
+(seed, career), and runs with print() output discarded. Careers are spread
+over a process pool in chunks; the result is a progression curve: win
+rate, stages cleared, gold and permanent HP bonus by run number. Shops
+are visited with PreferKind unless another shop policy is given
+(``skip`` leaves every shop without buying).
+
+    python simulate_runs.py --careers 2000 --runs 30 --shop-policy skip
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence
+
+from combat_engine import Action, CombatEngine
+from game import RunResult, play_game
+from meta import MemoryMetaStore, use_meta_store
+from policies import POLICIES, SHOP_POLICIES, GreedyPolicy, PreferKind, make_policy, make_shop_policy
+from shop import ShopChooser
+from simulate import chunks, quiet, silence_worker
+
+DEFAULT_CHUNK = 20
+
+
+@dataclass
+class ProgressionStats:
+    """Per-run-number sums over many careers; mergeable across workers."""
+
+    runs: int
+    careers: int = 0
+    wins: List[int] = field(default_factory=list)
+    stages_cleared: List[int] = field(default_factory=list)
+    gold: List[int] = field(default_factory=list)
+    hp_bonus: List[int] = field(default_factory=list)
+
+    def __post_init__(self):
+        for column in (self.wins, self.stages_cleared, self.gold, self.hp_bonus):
+            column.extend([0] * (self.runs - len(column)))
+
+    def record(self, run_index: int, result: RunResult) -> None:
+        self.wins[run_index] += result.won
+        self.stages_cleared[run_index] += result.stages_cleared
+        self.gold[run_index] += result.gold
+        self.hp_bonus[run_index] += result.permanent_hp_bonus
+
+    def merge(self, other: 'ProgressionStats') -> None:
+        self.careers += other.careers
+        for mine, theirs in ((self.wins, other.wins), (self.stages_cleared, other.stages_cleared),
+                             (self.gold, other.gold), (self.hp_bonus, other.hp_bonus)):
+            for i, value in enumerate(theirs):
+                mine[i] += value
+
+    def curve(self) -> List[Dict[str, float]]:
+        """Means per run number (1-based)."""
+        n = self.careers or 1
+        return [
+            {'run': i + 1, 'win_rate': self.wins[i] / n, 'stages_cleared': self.stages_cleared[i] / n,
+             'gold': self.gold[i] / n, 'permanent_hp_bonus': self.hp_bonus[i] / n}
+            for i in range(self.runs)
+        ]
+
+
+def run_careers(first: int, count: int, runs: int, stages: int, seed: int,
+                policy: Callable[[CombatEngine], Action], shop_policy: ShopChooser | None) -> ProgressionStats:
+    """Worker entry point: play careers first..first+count-1."""
+    stats = ProgressionStats(runs)
+    with quiet():
+        for career in range(first, first + count):
+            random.seed(f"{seed}:{career}")
+            with use_meta_store(MemoryMetaStore()):
+                for run_index in range(runs):
+                    stats.record(run_index, play_game(policy, shop_policy=shop_policy, stages=stages))
+            stats.careers += 1
+    return stats
+
+
+def simulate_careers(careers: int, runs: int, *, stages: int = 5, seed: int = 0,
+                     policy: Callable[[CombatEngine], Action] | None = None,
+                     shop_policy: ShopChooser | None = None, workers: int | None = None,
+                     chunk_size: int = DEFAULT_CHUNK) -> ProgressionStats:
+    """Play *careers* careers of *runs* runs each; ``workers=0`` stays in-process."""
+    if policy is None:
+        policy = GreedyPolicy()
+    if shop_policy is None:
+        shop_policy = PreferKind()
+    total = ProgressionStats(runs)
+    pieces = [(index * chunk_size, count) for index, count in chunks(careers, chunk_size)]
+    if workers == 0:
+        for first, count in pieces:
+            total.merge(run_careers(first, count, runs, stages, seed, policy, shop_policy))
+        return total
+    with ProcessPoolExecutor(max_workers=workers, initializer=silence_worker) as pool:
+        futures = [pool.submit(run_careers, first, count, runs, stages, seed, policy, shop_policy)
+                   for first, count in pieces]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate whole runs and meta progression.")
+    parser.add_argument('--careers', type=int, default=200, help="independent players")
+    parser.add_argument('--runs', type=int, default=20, help="runs per career")
+    parser.add_argument('--stages', type=int, default=5, help="encounters per run")
+    parser.add_argument('--policy', default=GreedyPolicy.name, choices=list(POLICIES))
+    parser.add_argument('--shop-policy', default=PreferKind.name, choices=list(SHOP_POLICIES),
+                        help="shop decisions (skip: buy nothing)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count, 0: in-process)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK, help="careers per task")
+    parser.add_argument('--json', action='store_true', help="print the curve as JSON lines")
+    args = parser.parse_args(argv)
+
+    stats = simulate_careers(args.careers, args.runs, stages=args.stages, seed=args.seed,
+                             policy=make_policy(args.policy), shop_policy=make_shop_policy(args.shop_policy),
+                             workers=args.workers, chunk_size=args.chunk_size)
+    for point in stats.curve():
+        if args.json:
+            print(json.dumps(point))
+        else:
+            print(f"run {point['run']:>3}: win {point['win_rate']:.1%}, stages {point['stages_cleared']:.2f}, "
+                  f"gold {point['gold']:.1f}, hp bonus {point['permanent_hp_bonus']:.1f}")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
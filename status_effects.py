@@ -1,15 +1,75 @@
 from __future__ import annotations
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple, TypeVar
 import random
 
+from events import DamageDealt, DamageReduced, EffectApplied, ShieldAbsorbed, listening, publish
+
+
+def _announce(target: Any, effect: str, amount: float = 0) -> None:
+    if listening(EffectApplied):
+        publish(EffectApplied(getattr(target, 'name', 'Target'), effect, amount,
+                              getattr(target, 'hp', 0), getattr(target, 'max_hp', 0)))
+
+
+# Duration of effects that last until removed, depleted or the combat ends
+PERMANENT = None
+
+POOL_SIZE = 64  # released effects kept per type for reuse
+
+E = TypeVar('E', bound='StatusEffect')
+
 
 class StatusEffect:
-    """Base class for status effects that can be applied to players or enemies."""
-    
-    def __init__(self, name: str, duration: int = 1):
+    """Base class for status effects that can be applied to players or enemies.
+
+    *duration* counts the target's turns; PERMANENT (None) never expires;
+    0 makes the effect instant: applied once and never stored.
+
+    Effects use __slots__, and each type keeps a small pool of released
+    instances: ``acquire(...)`` takes one (or makes a new one) and the
+    manager hands it back once the effect is gone. Only acquired effects
+    are recycled, so an effect built with the constructor stays valid for
+    as long as anyone holds it.
+    """
+
+    __slots__ = ('name', 'duration', 'active', '_pooled')
+    _free: List[StatusEffect] = []  # per type, see __init_subclass__
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._free = []
+
+    def __init__(self, name: str, duration: Optional[int] = 1):
         self.name = name
         self.duration = duration
         self.active = True
+        self._pooled = False
+
+    @classmethod
+    def acquire(cls: type[E], *args: Any, **kwargs: Any) -> E:
+        """An effect from the type's pool (or a new one) initialised with the arguments.
+
+        Hand it to a manager and let go of it: it is reused once it expires.
+        """
+        if cls._free:
+            effect = cls._free.pop()
+            effect.__init__(*args, **kwargs)
+        else:
+            effect = cls(*args, **kwargs)
+        effect._pooled = True
+        return effect
+
+    def release(self) -> None:
+        """Return an acquired effect to its pool; other effects are left alone."""
+        if self._pooled:
+            self._pooled = False
+            free = type(self)._free
+            if len(free) < POOL_SIZE:
+                free.append(self)
+
+    @property
+    def permanent(self) -> bool:
+        return self.duration is None
     
     def apply(self, target: Any) -> None:
         """Apply the effect to the target."""
@@ -25,6 +85,8 @@ class StatusEffect:
     
     def reduce_duration(self) -> bool:
         """Reduce duration by 1. Returns True if effect should be removed."""
+        if self.duration is None:
+            return False
         self.duration -= 1
         if self.duration <= 0:
             self.active = False
@@ -34,17 +96,21 @@ class StatusEffect:
 
 class StunEffect(StatusEffect):
     """Prevents the target from taking actions."""
-    
+
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("Stunned", 1)
     
     def apply(self, target: Any) -> None:
-        print(f"{getattr(target, 'name', 'Target')} is stunned and cannot act!")
+        _announce(target, 'Stun')
 
 
 class HealEffect(StatusEffect):
     """Instantly heals the target."""
-    
+
+    __slots__ = ('amount',)
+
     def __init__(self, amount: int):
         super().__init__("Heal", 0)  # Instant effect
         self.amount = amount
@@ -54,30 +120,34 @@ class HealEffect(StatusEffect):
             old_hp = target.hp
             target.hp = min(target.max_hp, target.hp + self.amount)
             healed = target.hp - old_hp
-            print(f"{getattr(target, 'name', 'Target')} healed for {healed} HP! ({target.hp}/{target.max_hp})")
+            _announce(target, 'Heal', healed)
 
 
 class DamageBuffEffect(StatusEffect):
     """Increases damage for next attack."""
-    
+
+    __slots__ = ('multiplier',)
+
     def __init__(self, multiplier: float):
         super().__init__("Damage Buff", 1)
         self.multiplier = multiplier
     
     def apply(self, target: Any) -> None:
-        print(f"{getattr(target, 'name', 'Target')} gains a {int((self.multiplier - 1) * 100)}% damage buff!")
+        _announce(target, 'Damage Buff', (self.multiplier - 1) * 100)
 
 
 class ShieldEffect(StatusEffect):
     """Provides temporary HP shield."""
-    
+
+    __slots__ = ('amount', 'original_amount')
+
     def __init__(self, amount: int):
-        super().__init__("Shield", 999)  # Lasts until depleted
+        super().__init__("Shield", PERMANENT)  # Lasts until depleted
         self.amount = amount
         self.original_amount = amount
     
     def apply(self, target: Any) -> None:
-        print(f"{getattr(target, 'name', 'Target')} gains a {self.amount} HP shield!")
+        _announce(target, 'Shield', self.amount)
     
     def absorb_damage(self, damage: int) -> int:
         """Absorb damage and return remaining damage."""
@@ -87,113 +157,319 @@ class ShieldEffect(StatusEffect):
         
         if self.amount <= 0:
             self.active = False
-            print(f"Shield depleted!")
-        else:
-            print(f"Shield absorbed {absorbed} damage! ({self.amount} shield remaining)")
+        if listening(ShieldAbsorbed):
+            publish(ShieldAbsorbed(absorbed, self.amount))
         
         return remaining
 
 
 class DamageReductionEffect(StatusEffect):
     """Reduces incoming damage by a percentage."""
-    
-    def __init__(self, reduction: float, duration: int = 999):
+
+    __slots__ = ('reduction',)
+
+    def __init__(self, reduction: float, duration: Optional[int] = PERMANENT):
         super().__init__("Damage Reduction", duration)
         self.reduction = reduction
     
     def apply(self, target: Any) -> None:
-        print(f"{getattr(target, 'name', 'Target')} gains {int(self.reduction * 100)}% damage reduction!")
+        _announce(target, 'Damage Reduction', self.reduction * 100)
     
     def reduce_damage(self, damage: int) -> int:
         """Reduce damage and return the reduced amount."""
         reduced = int(damage * (1 - self.reduction))
-        print(f"Damage reduced from {damage} to {reduced}!")
+        if listening(DamageReduced):
+            publish(DamageReduced(damage, reduced))
         return reduced
 
 
 class PoisonEffect(StatusEffect):
     """Deals damage over time to the target."""
-    
+
+    __slots__ = ('damage_per_turn',)
+
     def __init__(self, damage_per_turn: int, duration: int = 3):
         super().__init__("Poison", duration)
         self.damage_per_turn = damage_per_turn
     
     def apply(self, target: Any) -> None:
-        print(f"{getattr(target, 'name', 'Target')} is poisoned!")
+        _announce(target, 'Poison', self.damage_per_turn)
     
     def tick(self, target: Any) -> None:
         if hasattr(target, 'hp'):
             target.hp = max(0, target.hp - self.damage_per_turn)
-            print(f"{getattr(target, 'name', 'Target')} takes {self.damage_per_turn} poison damage! ({target.hp} HP remaining)")
+            if listening(DamageDealt):
+                publish(DamageDealt(getattr(target, 'name', 'Target'), self.damage_per_turn, target.hp,
+                                    getattr(target, 'max_hp', target.hp), source='poison'))
+
+
+def _fields(cls: type) -> Tuple[str, ...]:
+    fields = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name != '_pooled' and name not in fields:
+                fields.append(name)
+    return tuple(fields)
+
+
+def effect_state(effect: StatusEffect) -> Dict[str, Any]:
+    """The attributes that make up *effect*, by name (for saves and replays)."""
+    state = {name: getattr(effect, name) for name in _fields(type(effect)) if hasattr(effect, name)}
+    state.update(getattr(effect, '__dict__', {}))  # subclasses without __slots__
+    return state
+
+
+def restore_effect(cls: type[E], state: Dict[str, Any]) -> E:
+    """Rebuild an effect from effect_state() without running its __init__."""
+    effect = cls.__new__(cls)
+    effect._pooled = False
+    for name, value in state.items():
+        setattr(effect, name, value)
+    return effect
+
+
+def _pooled_poison(effect: StatusEffect) -> bool:
+    """Poisons whose tick is the stock one; the manager deals their damage in one sum."""
+    return isinstance(effect, PoisonEffect) and type(effect).tick is PoisonEffect.tick
 
 
 class StatusEffectManager:
-    """Manages status effects for a character."""
-    
+    """Manages status effects for a character.
+
+    Effects are kept in per-type buckets (plus one insertion-ordered index
+    for ticking), and the numbers the damage paths need are maintained as
+    effects come and go: the shield pool, the combined damage reduction
+    factor and the damage-buff product. Incoming and outgoing damage
+    therefore cost O(1) however many effects are stacked. Only active
+    effects are stored; consumed, depleted and expired ones are dropped.
+
+    Expiry runs on a timer wheel: each timed effect is filed under the
+    absolute turn it expires on, so a tick only visits the effects due
+    that turn plus those with per-turn work. Poisons are pooled into one
+    damage-per-turn total, so stacking them does not slow ticks down.
+    PERMANENT effects are never scheduled.
+
+    Instant effects (heals) are applied without being stored, and effects
+    taken from a pool with ``acquire`` go back to it when they are dropped.
+    """
+
     def __init__(self):
-        self.effects: List[StatusEffect] = []
-    
+        self._order: Dict[StatusEffect, None] = {}  # all effects, insertion ordered
+        self._buckets: Dict[type, List[StatusEffect]] = {}  # by exact type
+        self._shields: List[ShieldEffect] = []
+        self._reductions: List[DamageReductionEffect] = []
+        self._buffs: List[DamageBuffEffect] = []
+        self._shield_pool = 0
+        self._keep = 1.0  # product of (1 - reduction)
+        self._buff = 1.0  # product of buff multipliers
+
+        self._turn = 0  # ticks so far
+        self._wheel: Dict[int, List[StatusEffect]] = {}  # expiry turn -> effects
+        self._expiry: Dict[StatusEffect, int] = {}
+        self._tickers: Dict[StatusEffect, None] = {}  # effects with their own tick()
+        self._poison = 0  # pooled damage per turn of the poisons
+
+    @property
+    def effects(self) -> List[StatusEffect]:
+        """All effects in the order they were added (a copy).
+
+        Their ``duration`` is brought up to date (turns left) on the way out.
+        """
+        for effect, turn in self._expiry.items():
+            effect.duration = turn - self._turn
+        return list(self._order)
+
+    @effects.setter
+    def effects(self, effects: List[StatusEffect]) -> None:
+        """Replace every effect without applying them (restoring saved state)."""
+        self._reset()  # nothing is released: *effects* may hold the current ones
+        for effect in effects:
+            if effect.active and effect.duration != 0:  # instants were applied already
+                self._insert(effect)
+
+    # ------------------------------------------------------------------
+    # Bookkeeping
+    # ------------------------------------------------------------------
+    def _insert(self, effect: StatusEffect) -> None:
+        self._order[effect] = None
+        self._buckets.setdefault(type(effect), []).append(effect)
+        if effect.duration is not None:
+            turn = self._turn + effect.duration
+            self._expiry[effect] = turn
+            self._wheel.setdefault(turn, []).append(effect)
+        if _pooled_poison(effect):
+            self._poison += effect.damage_per_turn
+        elif type(effect).tick is not StatusEffect.tick:
+            self._tickers[effect] = None
+        if isinstance(effect, ShieldEffect):
+            self._shields.append(effect)
+            self._shield_pool += effect.amount
+        elif isinstance(effect, DamageReductionEffect):
+            self._reductions.append(effect)
+            self._keep *= 1 - effect.reduction
+        elif isinstance(effect, DamageBuffEffect):
+            self._buffs.append(effect)
+            self._buff *= effect.multiplier
+
+    def _remove(self, effect: StatusEffect) -> None:
+        """Drop *effect* and return it to its pool (if it came from one)."""
+        del self._order[effect]
+        bucket = self._buckets[type(effect)]
+        bucket.remove(effect)
+        if not bucket:
+            del self._buckets[type(effect)]
+        # Its wheel slot entry is left behind and skipped when the slot comes up
+        self._expiry.pop(effect, None)
+        if _pooled_poison(effect):
+            self._poison -= effect.damage_per_turn
+        else:
+            self._tickers.pop(effect, None)
+        # Products are recomputed rather than divided (a 100% reduction is a factor of 0)
+        if isinstance(effect, ShieldEffect):
+            self._shields.remove(effect)
+            self._shield_pool -= effect.amount
+        elif isinstance(effect, DamageReductionEffect):
+            self._reductions.remove(effect)
+            self._keep = 1.0
+            for reduction in self._reductions:
+                self._keep *= 1 - reduction.reduction
+        elif isinstance(effect, DamageBuffEffect):
+            self._buffs.remove(effect)
+            self._buff = 1.0
+            for buff in self._buffs:
+                self._buff *= buff.multiplier
+        effect.release()
+
+    # ------------------------------------------------------------------
+    # Effects
+    # ------------------------------------------------------------------
     def add_effect(self, effect: StatusEffect, target: Any) -> None:
         """Add a status effect and apply it immediately."""
-        # Remove existing effects of the same type (except stackable ones)
-        if not isinstance(effect, (PoisonEffect,)):  # Poison can stack
-            self.effects = [e for e in self.effects if type(e) != type(effect)]
-        
-        self.effects.append(effect)
+        if effect.duration == 0:  # instant: nothing to keep
+            effect.apply(target)
+            effect.active = False
+            effect.release()
+            return
+        # Replace existing effects of the same type (except stackable ones)
+        if not isinstance(effect, PoisonEffect):  # Poison can stack
+            for old in list(self._buckets.get(type(effect), ())):
+                self._remove(old)
+        self._insert(effect)
         effect.apply(target)
-    
+
     def tick_effects(self, target: Any) -> None:
-        """Process all effects for one turn."""
-        expired = []
-        for effect in self.effects:
-            if effect.active:
+        """Advance one turn: poison and other per-turn work, then expiries."""
+        self._turn += 1
+        turn = self._turn
+        if self._tickers:
+            for effect in tuple(self._tickers):
                 effect.tick(target)
-                if effect.reduce_duration():
+        if self._poison and hasattr(target, 'hp'):
+            damage = self._poison
+            target.hp = max(0, target.hp - damage)
+            if listening(DamageDealt):
+                publish(DamageDealt(getattr(target, 'name', 'Target'), damage, target.hp,
+                                    getattr(target, 'max_hp', target.hp), source='poison'))
+        due = self._wheel.pop(turn, None)
+        if due:
+            for effect in due:
+                if self._expiry.get(effect) == turn:
+                    effect.duration = 0
+                    effect.active = False
                     effect.expire(target)
-                    expired.append(effect)
-        
-        # Remove expired effects
-        for effect in expired:
-            self.effects.remove(effect)
-    
+                    self._remove(effect)
+
+    def remaining_turns(self, effect: StatusEffect) -> Optional[int]:
+        """Ticks until *effect* expires; None if it is permanent or not held."""
+        turn = self._expiry.get(effect)
+        return None if turn is None else turn - self._turn
+
     def has_effect(self, effect_type: type) -> bool:
         """Check if target has a specific type of effect."""
-        return any(isinstance(e, effect_type) and e.active for e in self.effects)
-    
+        return self.get_effect(effect_type) is not None
+
     def get_effect(self, effect_type: type) -> StatusEffect | None:
-        """Get the first active effect of a specific type."""
-        for effect in self.effects:
-            if isinstance(effect, effect_type) and effect.active:
-                return effect
+        """Get the first active effect of a specific type (or a subclass of it)."""
+        bucket = self._buckets.get(effect_type)
+        if bucket:
+            return bucket[0]
+        for cls, bucket in self._buckets.items():
+            if issubclass(cls, effect_type):
+                return bucket[0]
         return None
-    
+
     def clear_all_effects(self) -> None:
         """Remove all status effects."""
-        self.effects.clear()
-    
+        for effect in self._order:
+            effect.release()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._order.clear()
+        self._buckets.clear()
+        self._shields.clear()
+        self._reductions.clear()
+        self._buffs.clear()
+        self._shield_pool = 0
+        self._keep = self._buff = 1.0
+        self._wheel.clear()
+        self._expiry.clear()
+        self._tickers.clear()
+        self._poison = 0
+
+    # ------------------------------------------------------------------
+    # Damage
+    # ------------------------------------------------------------------
+    @property
+    def shield_pool(self) -> int:
+        """Damage the shields can still absorb."""
+        return self._shield_pool
+
     def modify_outgoing_damage(self, damage: int) -> int:
-        """Apply damage buffs to outgoing damage."""
-        modified = damage
-        for effect in self.effects:
-            if isinstance(effect, DamageBuffEffect) and effect.active:
-                modified = int(modified * effect.multiplier)
-                effect.active = False  # Consume the buff
+        """Apply damage buffs to outgoing damage (consuming them)."""
+        if not self._buffs:
+            return damage
+        modified = int(damage * self._buff)
+        for buff in list(self._buffs):
+            buff.active = False  # Consume the buff
+            self._remove(buff)
         return modified
-    
+
+    def peek_outgoing_damage(self, damage: int) -> int:
+        """Like modify_outgoing_damage, but without consuming any buff."""
+        return int(damage * self._buff) if self._buffs else damage
+
+    def _drain(self, amount: int) -> None:
+        """Take *amount* from the shields, oldest first; depleted shields go away."""
+        for shield in list(self._shields):
+            take = min(shield.amount, amount)
+            shield.amount -= take
+            self._shield_pool -= take
+            amount -= take
+            if shield.amount <= 0:
+                shield.active = False
+                self._remove(shield)
+            if not amount:
+                break
+
     def modify_incoming_damage(self, damage: int) -> int:
-        """Apply shields and damage reduction to incoming damage."""
-        modified = damage
-        
-        # Apply damage reduction first
-        for effect in self.effects:
-            if isinstance(effect, DamageReductionEffect) and effect.active:
-                modified = effect.reduce_damage(modified)
-        
-        # Then apply shields
-        for effect in self.effects:
-            if isinstance(effect, ShieldEffect) and effect.active:
-                modified = effect.absorb_damage(modified)
-                if not effect.active:
-                    self.effects.remove(effect)
-        
-        return modified 
\ No newline at end of file
+        """Apply damage reduction, then shields, to incoming damage."""
+        if self._reductions:
+            reduced = int(damage * self._keep)
+            if listening(DamageReduced):
+                publish(DamageReduced(damage, reduced))
+            damage = reduced
+
+        if self._shields:
+            absorbed = min(self._shield_pool, damage)
+            damage -= absorbed
+            first = self._shields[0]
+            if absorbed < first.amount:  # the usual case: the oldest shield holds
+                first.amount -= absorbed
+                self._shield_pool -= absorbed
+            else:
+                self._drain(absorbed)
+            if listening(ShieldAbsorbed):
+                publish(ShieldAbsorbed(absorbed, self._shield_pool))
+
+        return damage
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Callable, Dict, Any
 
+from events import notice
+
 # Forward reference to avoid circular import
 CombatUIType = Any  # will be refined when imported inside combat module
 
@@ -34,7 +36,7 @@ def _moon_effect(ui):  # noqa: ANN001
 
 def _tower_effect(ui):  # noqa: ANN001
     """Placeholder: prints message for future implementation."""
-    print('The Tower shakes the battlefield! (effect TBD)')
+    notice('The Tower shakes the battlefield! (effect TBD)')
     ui.last_hand = 'Tower Foresight'
 
 TAROT_DEFINITIONS: Dict[str, TarotCard] = {
@@ -0,0 +1,41 @@
+import importlib.util
+import sys
+import unittest
+
+from benchmarks import CASES, Case, compare, run, time_case
+from benchmarks.allocations import measure
+from status_effects import StatusEffectManager
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+    def test_compare_flags_slowdowns_past_the_threshold(self):
+        baseline = {'fast': 100.0, 'steady': 100.0, 'gone': 50.0}
+        current = {'fast': 130.0, 'steady': 120.0, 'new': 1.0}
+        regressions = compare(current, baseline, threshold=0.25)
+        self.assertEqual([r.name for r in regressions], ['fast'])
+        self.assertAlmostEqual(regressions[0].ratio, 1.3)
+
+    def test_time_case_reports_per_operation(self):
+        timing = time_case(Case('noop', lambda: (lambda: None), batch=10), min_time=0.001, repeat=1)
+        self.assertGreater(timing.ns_per_op, 0)
+        self.assertGreaterEqual(timing.loops, 1)
+
+    def test_every_case_runs(self):
+        timings, skipped = run(min_time=0.0, repeat=1)
+        self.assertEqual(set(timings) | set(skipped), set(CASES))
+        self.assertIn('poker.get_poker_hand', timings)
+        self.assertIn('construct.DialogueManager', timings)  # runs on the ursina stand-in
+        self.assertTrue(all(t.relative > 0 for t in timings.values()))
+        if importlib.util.find_spec('ursina') is None:
+            self.assertNotIn('ursina', sys.modules)  # the stand-in is gone after the setups
+
+    def test_pooled_effects_keep_allocations_flat(self):
+        add_effect = StatusEffectManager.add_effect
+        short, long = measure(turns=100), measure(turns=2000)
+        self.assertGreater(short['effects_allocated'], 0)
+        self.assertLess(long['effects_allocated'], 100)
+        self.assertIs(StatusEffectManager.add_effect, add_effect)  # the tracker is removed
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from card import Card
+import pickle
+
+from card import CARD_TABLE, Card, card_ids, cards_from_ids
 from constants import CARD_VALUES
 
 
@@ -18,6 +20,25 @@ class CardTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             Card('Hearts', '1')
 
+    def test_id_round_trip(self):
+        for card_id in range(52):
+            card = Card.from_id(card_id)
+            self.assertEqual(card.id, card_id)
+            self.assertEqual(Card(card.suit, card.rank), card)
+            self.assertEqual(Card(card.suit, card.rank).id, card_id)
+
+    def test_from_id_returns_interned_instance(self):
+        self.assertIs(Card.from_id(12), CARD_TABLE[12])
+        self.assertEqual(cards_from_ids(card_ids(CARD_TABLE)), list(CARD_TABLE))
+        with self.assertRaises(ValueError):
+            Card.from_id(52)
+
+    def test_equality_and_pickling_ignore_derived_fields(self):
+        card = Card('Spades', 'A')
+        self.assertEqual(hash(card), hash(Card.from_id(card.id)))
+        self.assertEqual(pickle.loads(pickle.dumps(card)), card)
+        self.assertFalse(hasattr(card, '__dict__'))
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main() 
\ No newline at end of file
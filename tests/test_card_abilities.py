@@ -0,0 +1,91 @@
+import random
+import unittest
+from unittest import mock
+
+from card_abilities import (
+    HAND_ABILITIES, SHIELD, STUN, Ability, HandAbilities, apply_card_combination_abilities,
+    damage_multiplier_outcomes, get_ability_description,
+)
+from entities.enemy import Enemy
+from entities.player import Player
+from status_effects import PoisonEffect, ShieldEffect, StunEffect
+from tarot import TAROT_DEFINITIONS
+
+
+class CardAbilitiesTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.player = Player()
+        self.enemy = Enemy('Dummy', 500, 5)
+
+    def apply(self, hand, base_damage=60, **kwargs):
+        return apply_card_combination_abilities(hand, self.player, self.enemy, base_damage, **kwargs)
+
+    def test_pair_heals_half_the_base_damage(self):
+        self.player.hp = 10
+        result = self.apply('Pair')
+        self.assertEqual(self.player.hp, 40)
+        self.assertEqual(result, {"effects": ["Healed for 30 HP!"], "damage_multiplier": 1.0})
+
+    def test_five_of_a_kind_combines_pair_three_and_four(self):
+        self.player.hp = 10
+        self.player.items = [TAROT_DEFINITIONS['sun']]
+        result = self.apply('Five of a Kind', 60)
+        self.assertEqual(self.player.hp, 40)
+        self.assertEqual(self.enemy.status_effects.get_effect(PoisonEffect).damage_per_turn, 6)
+        self.assertEqual(self.player.status_effects.get_effect(PoisonEffect).damage_per_turn, 3)
+        self.assertEqual(self.player.items, [])
+        self.assertEqual(result["effects"], ["Combined abilities: Heal (30), Poison (6), Items activated"])
+
+    def test_combined_hands_report_one_line(self):
+        self.assertEqual(self.apply('Three of a Kind', 100)["effects"],
+                         ["Poison applied! (10 damage/turn to enemy, 5 to self)"])
+        self.assertEqual(self.apply('Flush House')["effects"],
+                         ["Combined abilities: Shield (30) + Damage Reduction (30%)"])
+
+    def test_flush_five_needs_an_enemy_with_max_hp(self):
+        result = apply_card_combination_abilities('Flush Five', self.player, None, 60)
+        self.assertEqual(result, {"effects": [], "damage_multiplier": 1.0})
+
+    def test_chances_roll_and_fortune_teller_raises_them(self):
+        with mock.patch('card_abilities.random.random', return_value=0.4):
+            self.assertEqual(self.apply('High Card')["effects"], [])
+            self.player.jokers = ['fortune_teller']
+            self.assertEqual(self.apply('High Card')["effects"], ["Enemy stunned!"])
+            self.assertEqual(self.apply('Two Pair')["damage_multiplier"], 2.0)
+        self.assertTrue(self.enemy.status_effects.has_effect(StunEffect))
+
+    def test_expected_mode_is_deterministic_and_side_effect_free(self):
+        self.player.hp = 10
+        state = random.getstate()
+        self.assertEqual(self.apply('Pair', expected=True)["expected"], {'player.heal': 30})
+        self.assertEqual(self.apply('Two Pair', expected=True)["damage_multiplier"], 1.5)
+        self.assertAlmostEqual(self.apply('High Card', expected=True)["expected"]['enemy.stun'], 0.3)
+        self.assertEqual(self.apply('Flush Five', expected=True)["expected"], {'enemy.max_hp_damage': 50})
+        self.player.jokers = ['fortune_teller']
+        self.assertEqual(self.apply('Two Pair', expected=True)["damage_multiplier"], 1.75)
+        self.assertEqual(self.apply('Three of a Kind', 100, expected=True)["expected"],
+                         {'enemy.poison': 10, 'player.poison': 5})
+        self.assertEqual((self.player.hp, self.enemy.hp), (10, 500))
+        self.assertEqual(self.player.status_effects.effects + self.enemy.status_effects.effects, [])
+        self.assertEqual(random.getstate(), state)
+
+    def test_multiplier_outcomes_come_from_the_registry(self):
+        self.assertEqual(damage_multiplier_outcomes('Two Pair', self.player), [(0.5, 2.0), (0.5, 1.0)])
+        self.assertEqual(damage_multiplier_outcomes('Royal Flush', self.player), [(1.0, 4.0)])
+        self.assertEqual(damage_multiplier_outcomes('Pair', self.player), [(1.0, 1.0)])
+
+    def test_new_abilities_are_registry_entries(self):
+        entry = HandAbilities("Stun and shield", (Ability(STUN, 'enemy', message="Enemy stunned!"),
+                                                  Ability(SHIELD, magnitude=lambda base: base, message="{amount}")))
+        with mock.patch.dict(HAND_ABILITIES, {'Test Hand': entry}):
+            result = self.apply('Test Hand', 12)
+            self.assertEqual(get_ability_description('Test Hand'), "Stun and shield")
+        self.assertEqual(result["effects"], ["Enemy stunned!", "12"])
+        self.assertEqual(self.player.status_effects.shield_pool, 12)
+        self.assertIsInstance(self.player.status_effects.get_effect(ShieldEffect), ShieldEffect)
+        self.assertEqual(get_ability_description('Test Hand'), "No special ability")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
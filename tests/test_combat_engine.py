@@ -0,0 +1,103 @@
+import random
+import unittest
+
+from combat_engine import (
+    ActionResult, Attack, CombatEngine, Discard, EndTurn, Phase, Strike, UseItem,
+)
+from card import Card
+from entities.enemy import Enemy
+from entities.player import Player
+from hand_finder import suggest_hands
+from tarot import TAROT_DEFINITIONS
+
+
+def greedy(engine):
+    return Attack(suggest_hands(engine.player, top_k=1, enemy=engine.enemy)[0].indices)
+
+
+class CombatEngineTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(11)
+        self.player = Player()
+        self.player.abilities_unlocked = False
+
+    def give_pair(self):
+        """Put a pair of twos at hand indices 0 and 1 (4 damage with no jokers)."""
+        self.player.hand[:2] = [Card('Hearts', '2'), Card('Clubs', '2')]
+
+    def test_start_deals_a_hand(self):
+        engine = CombatEngine(self.player, Enemy('Dummy', 500, 1))
+        self.assertIs(engine.phase, Phase.PLAYER_TURN)
+        self.assertEqual(len(self.player.hand), self.player.hand_size)
+        self.assertEqual(engine.turn, 1)
+
+    def test_attack_hands_over_to_enemy(self):
+        enemy = Enemy('Dummy', 500, 7)
+        engine = CombatEngine(self.player, enemy, auto_enemy_turn=False)
+        self.give_pair()
+        result = engine.step(Attack((0, 1)))
+        self.assertIsInstance(result, ActionResult)
+        self.assertIs(result.phase, Phase.ENEMY_TURN)
+        self.assertEqual(result.hand_type, 'Pair')
+        self.assertEqual(enemy.hp, 496)
+        with self.assertRaises(ValueError):
+            engine.step(EndTurn())
+        self.assertEqual(engine.enemy_turn(), 7)
+        self.assertIs(engine.phase, Phase.PLAYER_TURN)
+        self.assertEqual(engine.turn, 2)
+
+    def test_auto_enemy_turn_reports_damage_taken(self):
+        engine = CombatEngine(self.player, Enemy('Dummy', 500, 4))
+        result = engine.step(EndTurn())
+        self.assertEqual(result.damage_taken, 4)
+        self.assertIs(result.phase, Phase.PLAYER_TURN)
+
+    def test_discard_keeps_the_turn(self):
+        engine = CombatEngine(self.player, Enemy('Dummy', 500, 1))
+        result = engine.step(Discard((0, 1)))
+        self.assertIs(result.phase, Phase.PLAYER_TURN)
+        self.assertEqual(self.player.discards_left, self.player.max_discards - 1)
+        self.player.discards_left = 0
+        self.assertFalse(engine.can_discard())
+        with self.assertRaises(ValueError):
+            engine.step(Discard((0,)))
+
+    def test_invalid_selection_raises(self):
+        engine = CombatEngine(self.player, Enemy('Dummy', 500, 1))
+        for indices in ((), (0, 0), (0, 1, 2, 3, 4, 5), (99,)):
+            with self.assertRaises(ValueError):
+                engine.step(Attack(indices))
+        self.assertIs(engine.phase, Phase.PLAYER_TURN)
+
+    def test_item_bonus_applies_to_next_attack(self):
+        self.player.items.append(TAROT_DEFINITIONS['sun'])
+        engine = CombatEngine(self.player, Enemy('Dummy', 500, 1), auto_enemy_turn=False)
+        engine.step(UseItem(0))
+        self.assertEqual(self.player.items, [])
+        self.give_pair()
+        self.assertEqual(engine.step(Attack((0, 1))).damage_dealt, 4 + 5)
+        engine.enemy_turn()
+        self.give_pair()
+        self.assertEqual(engine.step(Attack((0, 1))).damage_dealt, 4)
+
+    def test_victory_and_defeat(self):
+        engine = CombatEngine(self.player, Enemy('Dummy', 10, 1))
+        self.assertIs(engine.step(Strike(50)).phase, Phase.VICTORY)
+        self.assertTrue(engine.finished and engine.won)
+
+        player = Player()
+        player.hp = 3
+        engine = CombatEngine(player, Enemy('Brute', 500, 10))
+        self.assertIs(engine.step(EndTurn()).phase, Phase.DEFEAT)
+        self.assertFalse(engine.won)
+
+    def test_run_plays_a_fight_out(self):
+        enemy = Enemy('Twisted Guard', 50, 10)
+        phase = CombatEngine(self.player, enemy).run(greedy)
+        self.assertIn(phase, (Phase.VICTORY, Phase.DEFEAT))
+        if phase is Phase.VICTORY:
+            self.assertEqual(enemy.hp, 0)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,49 @@
+import random
+import unittest
+from unittest import mock
+
+from card import CARD_TABLE
+from damage_model import CARD_COUNTS, HAND_TYPES, affine_damage
+from jokers import JOKER_DEFINITIONS, apply_jokers
+
+
+class AffineDamageTest(unittest.TestCase):
+    def test_matches_sequential_evaluation(self):
+        rng = random.Random(9)
+        keys = list(JOKER_DEFINITIONS)
+        for _ in range(200):
+            loadout = tuple(rng.choice(keys) for _ in range(rng.randint(0, 5)))
+            model = affine_damage(loadout)
+            self.assertTrue(model.is_affine)
+            for hand_type in HAND_TYPES:
+                for count in CARD_COUNTS:
+                    hand = list(CARD_TABLE[:count])
+                    base = rng.randint(0, 400)
+                    expected = apply_jokers(hand, base, hand_type, list(loadout), consume=False)
+                    self.assertEqual(model.damage(hand_type, count, base), expected, (loadout, hand_type, count))
+
+    def test_gemini_composes_twice(self):
+        model = affine_damage(('joker', 'archon', 'gemini'))
+        # ((d + 5) * 5 + 5) * 5
+        self.assertEqual(model.transform('High Card', 5), (25, 150))
+
+    def test_expected_damage_uses_means(self):
+        model = affine_damage(('joker', 'ruse'))
+        stats = {('Pair', 2): (0.5, 20.0), ('Flush', 5): (0.5, 100.0)}
+        expected = 0.5 * ((20 + 2) * 1.5) + 0.5 * (100 + 5)
+        self.assertAlmostEqual(model.expected_damage(stats), expected)
+
+    def test_non_affine_jokers_fall_back(self):
+        custom = {'name': 'Odd', 'description': '', 'effect': lambda hand, dmg, ht: dmg ** 2}
+        with mock.patch.dict(JOKER_DEFINITIONS, {'odd': custom}):
+            model = affine_damage(('joker', 'odd'))
+            self.assertFalse(model.is_affine)
+            self.assertEqual(model.non_affine, ('odd',))
+            with self.assertRaises(ValueError):
+                model.damage('Pair', 2, 10)
+            hand = list(CARD_TABLE[:2])
+            self.assertEqual(model.apply(hand, 10, 'Pair'), (10 + 2) ** 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
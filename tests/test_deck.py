@@ -1,6 +1,9 @@
+import random
 import unittest
+from collections import Counter
 
-from deck import Deck
+from card import Card
+from deck import Deck, MultisetDeck
 
 
 class DeckTest(unittest.TestCase):
@@ -15,6 +18,43 @@ class DeckTest(unittest.TestCase):
         self.assertEqual(len(drawn), 5)
         self.assertEqual(len(deck), 47)
 
+    def test_id_round_trip(self):
+        deck = Deck()
+        rebuilt = Deck.from_ids(deck.card_ids())
+        self.assertEqual(rebuilt.cards, deck.cards)
+        top_ids = [card.id for card in deck.cards[-3:]]
+        self.assertEqual(deck.draw_ids(3), top_ids)
+        self.assertEqual(len(deck), 49)
+
+    def test_unshuffled_deck_draws_from_top(self):
+        deck = Deck(auto_shuffle=False)
+        top = deck.cards[-4:]
+        self.assertEqual(deck.draw(4), top)
+        self.assertEqual(len(deck.cards), 48)
+
+    def test_lazy_shuffle_draws_every_card_uniformly(self):
+        random.seed(2)
+        seen = Counter()
+        for _ in range(2000):
+            deck = Deck()
+            seen.update(card.id for card in deck.draw(2))
+        self.assertEqual(len(seen), 52)
+        self.assertLess(max(seen.values()) / min(seen.values()), 2.0)
+
+    def test_draws_are_distinct_and_leave_the_rest(self):
+        deck = Deck()
+        drawn = deck.draw(30) + deck.draw(30)
+        self.assertEqual(len(drawn), 52)
+        self.assertEqual(len({card.id for card in drawn}), 52)
+        self.assertEqual(deck.draw(1), [])
+
+    def test_refresh_appends_discards(self):
+        deck = Deck()
+        discard = deck.draw(10)
+        deck.refresh_from_discard(discard)
+        self.assertEqual(discard, [])
+        self.assertEqual(sorted(card.id for card in deck.cards), list(range(52)))
+
     def test_draw_triggers_new_deck(self):
         deck = Deck(auto_shuffle=True)
         _ = deck.draw(52)
@@ -25,5 +65,59 @@ class DeckTest(unittest.TestCase):
         self.assertEqual(len(deck), 42)
 
 
+class MultisetDeckTest(unittest.TestCase):
+    def test_default_is_one_of_each(self):
+        deck = MultisetDeck()
+        self.assertEqual(len(deck), 52)
+        self.assertEqual(deck.counts(), Deck().counts())
+        self.assertEqual(deck.card_ids(), list(range(52)))
+
+    def test_draws_follow_copy_counts(self):
+        random.seed(5)
+        counts = [0] * 52
+        counts[0], counts[51] = 3000, 1000
+        deck = MultisetDeck(counts)
+        drawn = Counter(deck.draw_ids(2000))
+        self.assertEqual(sum(drawn.values()), 2000)
+        self.assertEqual(set(drawn), {0, 51})
+        self.assertAlmostEqual(drawn[0] / 2000, 0.75, delta=0.05)
+        self.assertEqual(len(deck), 2000)
+        self.assertEqual(deck.counts()[0] + deck.counts()[51], 2000)
+
+    def test_draws_exhaust_exactly(self):
+        deck = MultisetDeck.from_ids([7, 7, 7, 20, 33])
+        drawn = deck.draw(10)
+        self.assertEqual(sorted(card.id for card in drawn), [7, 7, 7, 20, 33])
+        self.assertEqual(len(deck), 0)
+        self.assertEqual(deck.draw(1), [])
+
+    def test_add_and_refresh(self):
+        deck = MultisetDeck()
+        ace = Card('Spades', 'A')
+        deck.add_card(ace, copies=2)
+        self.assertEqual(deck.counts()[ace.id], 3)
+        discard = deck.draw(10)
+        deck.refresh_from_discard(discard)
+        self.assertEqual(discard, [])
+        self.assertEqual(len(deck), 54)
+        self.assertEqual(len(deck.cards), 54)
+
+    def test_rejects_bad_counts(self):
+        with self.assertRaises(ValueError):
+            MultisetDeck([1] * 51)
+        with self.assertRaises(ValueError):
+            MultisetDeck([-1] + [1] * 51)
+
+    def test_player_accepts_multiset_deck(self):
+        from entities.player import Player
+
+        player = Player(deck=MultisetDeck())
+        player.add_card_to_deck(Card('Hearts', '2'))
+        self.assertEqual(len(player.deck), 53)
+        player.draw_cards(8)
+        self.assertEqual(len(player.hand), 8)
+        self.assertEqual(len(player.deck), 45)
+
+
 if __name__ == '__main__':  # pragma: no cover
     unittest.main() 
\ No newline at end of file
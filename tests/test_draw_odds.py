@@ -0,0 +1,100 @@
+import itertools
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+from card import CARD_TABLE, Card
+from constants import SUITS
+import draw_odds
+from draw_odds import advise_discards, discard_odds, hand_odds
+from entities.player import Player
+from hand_evaluator import HAND_INDEX, HAND_RANKING, classify
+
+
+def brute_force(kept, deck, draws):
+    """Enumerate every draw and take the best 5-card hand of the result."""
+    outcomes = Counter()
+    for drawn in itertools.combinations(deck, draws):
+        hand = list(kept) + list(drawn)
+        best = max(HAND_INDEX[classify(five)[0]] for five in itertools.combinations(hand, 5))
+        outcomes[HAND_RANKING[best]] += 1
+    total = sum(outcomes.values())
+    return {name: count / total for name, count in outcomes.items()}
+
+
+class DrawOddsTest(unittest.TestCase):
+    def assert_odds_equal(self, actual, expected):
+        self.assertEqual(set(actual), set(expected))
+        for name, p in expected.items():
+            self.assertAlmostEqual(actual[name], p, places=12)
+
+    def test_matches_brute_force_with_duplicate_cards(self):
+        rng = random.Random(7)
+        # A small pool of low cards makes straights, flushes and duplicates common
+        pool = [0, 1, 2, 3, 4, 12, 13, 14, 26, 39]
+        for _ in range(25):
+            cards = [CARD_TABLE[rng.choice(pool)] for _ in range(rng.randint(10, 14))]
+            kept_count = rng.randint(3, 7)
+            kept, deck = cards[:kept_count], cards[kept_count:]
+            draws = rng.randint(max(0, 5 - kept_count), min(4, len(deck)))
+            self.assert_odds_equal(hand_odds(kept, deck, draws), brute_force(kept, deck, draws))
+
+    def test_large_hand_with_two_possible_flush_suits(self):
+        hearts = [Card('Hearts', r) for r in ('2', '5', '9', 'J')]
+        spades = [Card('Spades', r) for r in ('3', '6', '10', 'Q')]
+        deck = [Card('Hearts', 'K'), Card('Spades', 'K'), Card('Clubs', '4'), Card('Diamonds', '7'), Card('Hearts', '3')]
+        self.assert_odds_equal(hand_odds(hearts + spades, deck, 2), brute_force(hearts + spades, deck, 2))
+
+    def test_probabilities_sum_to_one(self):
+        deck = list(CARD_TABLE[8:])
+        odds = hand_odds(list(CARD_TABLE[:3]), deck, 5)
+        self.assertAlmostEqual(sum(odds.values()), 1.0)
+        self.assertIn('Straight Flush', odds)
+
+
+class DiscardAdvisorTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(11)
+        self.player = Player()
+        self.player.draw_cards()
+
+    def test_every_subset_matches_single_query(self):
+        advice = advise_discards(self.player)
+        self.assertEqual(len(advice), 2 ** len(self.player.hand))
+        for entry in advice[::9]:
+            expected = discard_odds(self.player, entry.indices)
+            for name, p in expected.items():
+                self.assertAlmostEqual(entry.odds[name], p, places=12)
+        self.assertEqual(advice, sorted(advice, key=lambda a: (-a.expected_multiplier, len(a.indices))))
+
+    def test_resorting_the_hand_reuses_the_table(self):
+        before = {tuple(self.player.hand[i] for i in a.indices): a.odds for a in advise_discards(self.player)}
+        hits = draw_odds._discard_table.cache_info().hits
+        self.player.hand.sort(key=lambda card: (card.suit, card.value))
+        after = {tuple(self.player.hand[i] for i in a.indices): a.odds for a in advise_discards(self.player)}
+        self.assertEqual(draw_odds._discard_table.cache_info().hits, hits + 1)
+        self.assertEqual({frozenset(k): v for k, v in after.items()}, {frozenset(k): v for k, v in before.items()})
+
+    def test_fresh_hand_takes_one_shared_pass(self):
+        # Nothing is cached for a hand (and deck) not seen before
+        random.seed(101)
+        player = Player()
+        player.draw_cards()
+        table, single = draw_odds._discard_table.cache_info(), draw_odds._category_odds.cache_info()
+        with mock.patch.object(draw_odds, '_run_dp', wraps=draw_odds._run_dp) as run_dp:
+            advise_discards(player, top_k=1)
+        # One rank-only pass plus one flush pass per suit scores all 256 subsets
+        self.assertEqual(run_dp.call_count, 1 + len(SUITS))
+        self.assertEqual(draw_odds._discard_table.cache_info().misses, table.misses + 1)
+        self.assertEqual(draw_odds._category_odds.cache_info(), single)
+
+    def test_echo_mage_single_discard_draws_nothing(self):
+        self.player.jokers.append('echo_mage')
+        odds = discard_odds(self.player, [0])
+        self.assertEqual(odds, hand_odds(self.player.hand, self.player.deck.cards, 0))
+        self.assertAlmostEqual(max(odds.values()), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import unittest
+
+import events
+from entities.enemy import Enemy
+from entities.player import Player
+from events import (CardsDrawn, DamageDealt, EffectApplied, EventBus, JokerConsumed, ShieldAbsorbed,
+                    attach_console, subscribe)
+from jokers import compile_jokers, consume_jokers
+from status_effects import PoisonEffect, ShieldEffect
+
+
+class EventBusTest(unittest.TestCase):
+    def test_channels_exist_only_while_subscribed(self):
+        bus = EventBus()
+        seen = []
+        unsubscribe = bus.subscribe(DamageDealt, seen.append)
+        self.assertTrue(bus.wants(DamageDealt))
+        self.assertFalse(bus.wants(CardsDrawn))
+        bus.publish(DamageDealt('X', 3, 7, 10))
+        bus.publish(CardsDrawn(1, 8, 40))  # nobody listens
+        unsubscribe()
+        self.assertFalse(bus.wants(DamageDealt))
+        self.assertEqual(seen, [DamageDealt('X', 3, 7, 10)])
+
+    def test_handlers_may_unsubscribe_while_dispatching(self):
+        bus = EventBus()
+        seen = []
+
+        def once(event):
+            seen.append(event)
+            bus.unsubscribe(DamageDealt, once)
+        bus.subscribe(DamageDealt, once)
+        bus.subscribe(DamageDealt, seen.append)
+        bus.publish(DamageDealt('X', 1, 1, 1))
+        bus.publish(DamageDealt('X', 2, 2, 2))
+        self.assertEqual([e.amount for e in seen], [1, 1, 2])
+
+
+class GameEventsTest(unittest.TestCase):
+    def capture(self, *channels):
+        seen = []
+        for channel in channels:
+            self.addCleanup(subscribe(channel, seen.append))
+        return seen
+
+    def test_core_is_silent_without_subscribers(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            enemy = Enemy('Dummy', 30, 5)
+            enemy.status_effects.add_effect(ShieldEffect(4), enemy)
+            enemy.take_damage(10)
+            enemy.attack_player(Player())
+        self.assertEqual(out.getvalue(), '')
+
+    def test_damage_and_effects_are_published(self):
+        seen = self.capture(DamageDealt, EffectApplied, ShieldAbsorbed)
+        enemy = Enemy('Dummy', 30, 5, defense=1)
+        enemy.status_effects.add_effect(ShieldEffect(4), enemy)
+        enemy.take_damage(10)
+        enemy.status_effects.add_effect(PoisonEffect(2), enemy)
+        enemy.start_turn()
+        self.assertEqual(seen, [
+            EffectApplied('Dummy', 'Shield', 4, 30, 30),
+            ShieldAbsorbed(4, 0),
+            DamageDealt('Dummy', 5, 25, 30),
+            EffectApplied('Dummy', 'Poison', 2, 25, 30),
+            DamageDealt('Dummy', 2, 23, 30, source='poison'),
+        ])
+
+    def test_player_draws_and_consumed_jokers(self):
+        seen = self.capture(CardsDrawn, JokerConsumed)
+        player = Player()
+        player.draw_cards()
+        jokers = ['business_card']
+        consume_jokers(compile_jokers(tuple(jokers)), jokers)
+        drawn = tuple(card.id for card in player.hand)
+        self.assertEqual(seen, [CardsDrawn(player.hand_size, player.hand_size, len(player.deck), drawn),
+                                JokerConsumed('business_card', 'The Businessman')])
+
+    def test_console_prints_the_classic_lines(self):
+        out = io.StringIO()
+        detach = attach_console()
+        try:
+            with contextlib.redirect_stdout(out):
+                enemy = Enemy('Dummy', 30, 5)
+                enemy.take_damage(7)
+                enemy.status_effects.add_effect(ShieldEffect(10), enemy)
+                enemy.take_damage(4)
+        finally:
+            detach()
+        self.assertEqual(out.getvalue().splitlines(), [
+            'Dummy took 7 damage. HP 23/30',
+            'Dummy gains a 10 HP shield!',
+            'Shield absorbed 4 damage! (6 shield remaining)',
+            'Dummy took 0 damage. HP 23/30',
+        ])
+        self.assertFalse(events.listening(DamageDealt))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
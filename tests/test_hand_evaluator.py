@@ -0,0 +1,87 @@
+import unittest
+from itertools import combinations_with_replacement
+
+from card import Card
+from constants import RANKS, SUITS
+from hand_evaluator import HAND_RANKING, classify, evaluate_hand, hand_category
+
+
+def build_cards(specs):
+    """Helper taking list of (rank, suit) tuples and returning Card objects."""
+    return [Card(suit, rank) for rank, suit in specs]
+
+
+def reference_hand(cards):
+    """Straightforward branchy classifier used as an oracle."""
+    values = sorted(c.value for c in cards)
+    counts = sorted((values.count(v) for v in set(values)), reverse=True)
+    is_flush = len({c.suit for c in cards}) == 1
+    is_straight = len(counts) == 5 and (values[4] - values[0] == 4 or values == [2, 3, 4, 5, 14])
+
+    if counts == [5]:
+        return "Flush Five" if is_flush else "Five of a Kind"
+    if is_straight and is_flush:
+        return "Royal Flush" if values == [10, 11, 12, 13, 14] else "Straight Flush"
+    if counts == [3, 2] and is_flush:
+        return "Flush House"
+    if counts == [4, 1]:
+        return "Four of a Kind"
+    if counts == [3, 2]:
+        return "Full House"
+    if is_flush:
+        return "Flush"
+    if is_straight:
+        return "Straight"
+    return {
+        (3, 1, 1): "Three of a Kind",
+        (2, 2, 1): "Two Pair",
+        (2, 1, 1, 1): "Pair",
+    }.get(tuple(counts), "High Card")
+
+
+class HandEvaluatorTest(unittest.TestCase):
+    def test_matches_reference_for_every_rank_multiset(self):
+        # Every multiset of 5 ranks, once suited and once with mixed suits
+        for ranks in combinations_with_replacement(RANKS, 5):
+            suited = [Card('Hearts', r) for r in ranks]
+            mixed = [Card(SUITS[i % 2], r) for i, r in enumerate(ranks)]
+            for cards in (suited, mixed):
+                name, _, values = classify(cards)
+                self.assertEqual(name, reference_hand(cards), ranks)
+                self.assertEqual(list(values), sorted(c.value for c in cards))
+
+    def test_flush_five(self):
+        cards = [Card('Spades', 'Q')] * 5
+        self.assertEqual(evaluate_hand(cards)[0], 'Flush Five')
+
+    def test_five_of_a_kind(self):
+        cards = build_cards([('Q', 'Spades'), ('Q', 'Hearts'), ('Q', 'Clubs'), ('Q', 'Diamonds'), ('Q', 'Spades')])
+        self.assertEqual(evaluate_hand(cards)[0], 'Five of a Kind')
+
+    def test_flush_house(self):
+        cards = build_cards([('9', 'Clubs'), ('9', 'Clubs'), ('9', 'Clubs'), ('4', 'Clubs'), ('4', 'Clubs')])
+        self.assertEqual(evaluate_hand(cards)[0], 'Flush House')
+
+    def test_strength_orders_categories_and_kickers(self):
+        royal = build_cards([('10', 'Hearts'), ('J', 'Hearts'), ('Q', 'Hearts'), ('K', 'Hearts'), ('A', 'Hearts')])
+        steel = build_cards([('9', 'Hearts'), ('10', 'Hearts'), ('J', 'Hearts'), ('Q', 'Hearts'), ('K', 'Hearts')])
+        wheel = build_cards([('A', 'Clubs'), ('2', 'Diamonds'), ('3', 'Hearts'), ('4', 'Spades'), ('5', 'Clubs')])
+        six_high = build_cards([('2', 'Clubs'), ('3', 'Diamonds'), ('4', 'Hearts'), ('5', 'Spades'), ('6', 'Clubs')])
+        kings_up = build_cards([('K', 'Clubs'), ('K', 'Diamonds'), ('2', 'Hearts'), ('2', 'Spades'), ('3', 'Clubs')])
+        queens_up = build_cards([('Q', 'Clubs'), ('Q', 'Diamonds'), ('J', 'Hearts'), ('J', 'Spades'), ('A', 'Clubs')])
+
+        self.assertGreater(evaluate_hand(royal)[1], evaluate_hand(steel)[1])
+        self.assertGreater(evaluate_hand(six_high)[1], evaluate_hand(wheel)[1])
+        self.assertGreater(evaluate_hand(kings_up)[1], evaluate_hand(queens_up)[1])
+        self.assertGreater(evaluate_hand(wheel)[1], evaluate_hand(kings_up)[1])
+
+    def test_hand_category_round_trip(self):
+        cards = build_cards([('7', 'Hearts'), ('7', 'Diamonds'), ('2', 'Clubs'), ('5', 'Spades'), ('Q', 'Hearts')])
+        name, strength = evaluate_hand(cards)
+        self.assertEqual(hand_category(strength), name)
+        self.assertEqual(HAND_RANKING[0], 'High Card')
+        self.assertEqual(HAND_RANKING[-1], 'Flush Five')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from itertools import combinations
+
+from card import Card
+from constants import RANKS, SUITS
+from entities.enemy import Enemy
+from entities.player import Player
+from hand_finder import estimate_damage, suggest_hands
+
+
+def build_cards(specs):
+    """Helper taking list of (rank, suit) tuples and returning Card objects."""
+    return [Card(suit, rank) for rank, suit in specs]
+
+
+def brute_force_damages(player, top_k, enemy=None):
+    """Best damages over every 1-5 card subset, one entry per distinct play."""
+    best = {}
+    for size in range(1, 6):
+        for indices in combinations(range(len(player.hand)), size):
+            damage, hand_type = estimate_damage(player, indices, enemy)
+            key = (hand_type, tuple(sorted(player.hand[i].value for i in indices)))
+            best[key] = max(best.get(key, damage), damage)
+    return sorted(best.values(), reverse=True)[:top_k]
+
+
+class HandFinderTest(unittest.TestCase):
+    def setUp(self):
+        self.player = Player()
+
+    def test_finds_flush_over_pair(self):
+        self.player.hand = build_cards([
+            ('2', 'Hearts'), ('6', 'Hearts'), ('9', 'Hearts'), ('J', 'Hearts'),
+            ('K', 'Hearts'), ('K', 'Spades'), ('3', 'Clubs'), ('4', 'Diamonds'),
+        ])
+        best = suggest_hands(self.player, top_k=1)[0]
+        self.assertEqual(best.hand_type, 'Flush')
+        self.assertEqual(sorted(best.indices), [0, 1, 2, 3, 4])
+
+    def test_does_not_consume_single_use_jokers(self):
+        self.player.jokers = ['business_card']
+        self.player.hand = build_cards([('A', 'Hearts'), ('A', 'Spades'), ('3', 'Clubs')])
+        suggest_hands(self.player)
+        self.assertEqual(self.player.jokers, ['business_card'])
+
+    def test_prediction_matches_the_attack_with_hook_jokers(self):
+        from tarot import TAROT_DEFINITIONS
+        for jokers in (['shaman', 'berserker', 'executioner'], ['executioner', 'berserker', 'shaman']):
+            player = Player()
+            player.jokers = jokers
+            player.items = [TAROT_DEFINITIONS['sun']] * 3
+            player.combat_turn = 2
+            player.executioner_required_hand = 'Pair'
+            player.abilities_unlocked = False  # their rolls are random
+            player.hand = build_cards([('A', 'Hearts'), ('A', 'Spades'), ('7', 'Clubs')])
+            enemy = Enemy('Dummy', 90, 5)
+            predicted, _ = estimate_damage(player, [0, 1], enemy)
+            dealt, _, _ = player.form_hand_and_attack([0, 1], enemy)
+            self.assertEqual(predicted, dealt, jokers)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        full_deck = [Card(s, r) for s in SUITS for r in RANKS]
+        for trial in range(40):
+            size = rng.randint(5, 10)
+            if trial % 2:
+                self.player.hand = rng.sample(full_deck, size)
+            else:  # small pool of ranks and suits: lots of duplicates and flushes
+                self.player.hand = [Card(rng.choice(SUITS[:2]), rng.choice(RANKS[:6])) for _ in range(size)]
+            self.player.jokers = rng.sample(['joker', 'archon', 'ruse', 'emperor', 'gemini', 'business_card'], 3)
+            enemy = Enemy('Dummy', 100, 5) if trial % 3 else None
+            top_k = rng.randint(1, 4)
+
+            found = [s.damage for s in suggest_hands(self.player, top_k, enemy)]
+            self.assertEqual(found, brute_force_damages(self.player, top_k, enemy))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -1,7 +1,13 @@
 import unittest
+from unittest import mock
 
 from card import Card
-from jokers import apply_jokers
+import random
+
+from combat_engine import CombatEngine
+from entities.enemy import Enemy
+from jokers import JOKER_DEFINITIONS, apply_jokers, compile_jokers, compile_loadout
+from entities.player import Player
 from poker import hand_multiplier
 
 
@@ -40,5 +46,144 @@ class JokerDamageTest(unittest.TestCase):
         self.assertEqual(final, 400)
 
 
+class CompiledJokerTest(unittest.TestCase):
+    def reference(self, hand, base, hand_type, jokers):
+        """Straightforward per-joker evaluation, as apply_jokers used to do."""
+        damage = base
+        for jtype in jokers:
+            if jtype in JOKER_DEFINITIONS:
+                damage = JOKER_DEFINITIONS[jtype]['effect'](hand, damage, hand_type)
+        if 'gemini' in jokers:
+            targets = [j for j in jokers if j != 'gemini'][:2]
+            for _ in range(jokers.count('gemini')):
+                for target in targets:
+                    damage = JOKER_DEFINITIONS[target]['effect'](hand, damage, hand_type)
+        return damage
+
+    def test_plans_match_reference(self):
+        rng = random.Random(5)
+        keys = list(JOKER_DEFINITIONS)
+        hand = make_hand()
+        for size in range(6):
+            for _ in range(30):
+                loadout = [rng.choice(keys) for _ in range(size)]
+                for hand_type in ('Pair', 'Straight', 'Four of a Kind', 'High Card'):
+                    expected = self.reference(hand, 17, hand_type, loadout)
+                    self.assertEqual(compile_jokers(tuple(loadout)).apply(hand, 17, hand_type), expected)
+                    self.assertEqual(apply_jokers(hand, 17, hand_type, list(loadout), consume=False), expected)
+
+    def test_plans_are_cached_and_skip_passive_effects(self):
+        plan = compile_jokers(('fool', 'joker', 'blank'))
+        self.assertIs(plan, compile_jokers(('fool', 'joker', 'blank')))
+        self.assertEqual(len(plan.effects), 1)
+        self.assertEqual(compile_jokers(('gemini', 'business_card')).consumed, ('business_card',))
+
+    def test_unknown_gemini_target_still_raises(self):
+        with self.assertRaises(KeyError):
+            apply_jokers(make_hand(), 10, 'Pair', ['mystery', 'gemini'])
+
+    def test_player_plan_follows_loadout_changes(self):
+        player = Player()
+        player.add_joker('joker')
+        self.assertEqual(player.joker_plan().loadout, ('joker',))
+        player.add_joker('archon')
+        self.assertEqual(player.joker_plan().loadout, ('joker', 'archon'))
+        player.remove_joker('joker')
+        self.assertEqual(player.joker_plan().loadout, ('archon',))
+        player.jokers = ['business_card']
+        player.hand = make_hand()
+        player.form_hand_and_attack([0, 1, 2])
+        self.assertEqual(player.jokers, [])
+        self.assertEqual(player.joker_plan().loadout, ())
+
+
+class JokerLoadoutTest(unittest.TestCase):
+    def test_loadout_resolves_counts_hooks_and_stats(self):
+        loadout = compile_loadout(('fool', 'fool', 'berserker', 'fortune_teller', 'executive', 'mystery'))
+        self.assertIs(loadout, compile_loadout(loadout.jokers))
+        self.assertEqual(loadout.counts['fool'], 2)
+        self.assertTrue(loadout.has('mystery'))
+        self.assertEqual((loadout.extra_draw, loadout.chance_multiplier, loadout.gold_multiplier), (2, 1.5, 1.5))
+        self.assertEqual((len(loadout.on_attack), loadout.on_discard, loadout.post_combat), (1, (), ()))
+
+    def test_player_rebuilds_the_loadout_only_on_change(self):
+        player = Player()
+        player.add_joker('fool')
+        loadout = player.loadout
+        player.hand = []
+        player.draw_cards()
+        self.assertIs(player.loadout, loadout)
+        self.assertEqual(len(player.hand), player.hand_size + 1)
+        player.remove_joker('fool')
+        self.assertFalse(player.loadout.has('fool'))
+
+    def test_echo_mage_puts_a_lone_discard_back(self):
+        player = Player()
+        player.add_joker('echo_mage')
+        player.draw_cards()
+        card, size, deck = player.hand[0], len(player.hand), len(player.deck)
+        player.discard_cards([0])
+        self.assertEqual((len(player.hand), len(player.deck), player.hand[-1]), (size, deck, card))
+        player.discard_cards([0, 1])
+        self.assertEqual((len(player.hand), len(player.deck)), (size, deck - 2))
+
+    def test_attack_hooks_run_around_the_abilities(self):
+        player = Player()
+        player.jokers = ['berserker', 'executioner']
+        player.combat_turn = 3
+        player.executioner_required_hand = 'Three of a Kind'
+        player.hand = make_hand()
+        enemy = Enemy('Dummy', 100, 5)
+        damage, hand_type, effects = player.form_hand_and_attack([0, 1, 2, 3, 4], enemy)
+        self.assertEqual(hand_type, 'Three of a Kind')
+        base = sum(card.value for card in make_hand()) * hand_multiplier('Three of a Kind')
+        self.assertEqual(damage, base + 6 + 20)
+        self.assertEqual(effects[-1], "Executioner bonus: +20 current HP damage")
+
+    def test_attack_hooks_do_not_depend_on_loadout_order(self):
+        from tarot import TAROT_DEFINITIONS
+        damages = []
+        for jokers in (['shaman', 'berserker'], ['berserker', 'shaman']):
+            player = Player()
+            player.jokers = jokers
+            player.items = [TAROT_DEFINITIONS['sun']] * 3
+            player.combat_turn = 2
+            player.hand = make_hand()
+            damages.append(player.form_hand_and_attack([0, 1])[0])
+        # Berserker's flat +4 lands before Shaman's x1.15 truncates
+        self.assertEqual(damages, [int((4 * hand_multiplier('Pair') + 4) * 1.15)] * 2)
+
+    def test_new_jokers_are_catalogue_entries(self):
+        doubler = {'name': 'Doubler', 'description': '', 'effect': JOKER_DEFINITIONS['blank']['effect'],
+                   'on_attack': lambda player, enemy, hand_type, damage, effects: damage * 2}
+        with mock.patch.dict(JOKER_DEFINITIONS, {'doubler': doubler}):
+            player = Player()
+            player.jokers = ['doubler']
+            player.hand = make_hand()
+            damage, _, _ = player.form_hand_and_attack([0, 1])
+        self.assertEqual(damage, 4 * hand_multiplier('Pair') * 2)
+
+    def test_post_combat_hooks_run_with_the_rewards(self):
+        player = Player()
+        player.jokers = ['beggar', 'executive']
+        player.gold = 100
+        engine = CombatEngine(player, Enemy('Dummy', 1, 0))
+        engine._finish(True)
+        for fights in range(5):
+            engine.grant_rewards()
+        self.assertEqual(player.jokers, ['executive'])
+        self.assertEqual(player.permanent_damage_multiplier, 1.5)
+        self.assertFalse(player.loadout.has('beggar'))
+
+    def test_explorer_finds_after_victories_only(self):
+        player = Player()
+        player.jokers = ['explorer']
+        with mock.patch('jokers.random.random', side_effect=[0.0, 0.9]):  # a find, and it is a tarot
+            player.after_combat(False)
+            self.assertEqual(player.items, [])
+            player.after_combat(True)
+        self.assertEqual(len(player.items), 1)
+
+
 if __name__ == '__main__':  # pragma: no cover
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,68 @@
+import math
+import random
+import unittest
+from itertools import combinations
+
+from card import CARD_TABLE
+from damage_model import affine_damage
+from hand_finder import best_base_play
+from loadout_optimizer import EnemyProfile, _Evaluator, optimize_loadouts, profile_deck
+from poker import classify_selection
+
+SMALL_POOL = ('joker', 'archon', 'ruse', 'gemini', 'berserker', 'blank')
+
+
+class LoadoutOptimizerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.profile = profile_deck(samples=600, seed=3)
+        cls.enemy = EnemyProfile.from_template('Twisted Commander')
+
+    def test_best_base_play_matches_exhaustive_search(self):
+        rng = random.Random(1)
+        for _ in range(150):
+            hand = rng.sample(CARD_TABLE, 8)
+            best = max(
+                sum(c.value for c in combo) * classify_selection(combo)[1]
+                for size in range(1, 6) for combo in combinations(hand, size)
+            )
+            self.assertEqual(best_base_play(hand).damage, best)
+
+    def test_profile_is_a_distribution(self):
+        self.assertAlmostEqual(sum(p for _, _, p, _ in self.profile.buckets), 1.0)
+        self.assertEqual(self.profile.samples, 600)
+
+    def test_affine_loadout_matches_damage_model(self):
+        evaluator = _Evaluator(self.profile, EnemyProfile(10**9), ('joker', 'ruse'))
+        score = evaluator.evaluate(('joker', 'ruse'))
+        model = affine_damage(('joker', 'ruse'))
+        expected = sum(p * model.damage(t, c, mean) * mult
+                       for (t, c, p, mean), mult in zip(self.profile.buckets, evaluator.ability))
+        self.assertAlmostEqual(score.damage_per_turn, expected)
+
+    def test_defense_and_hopeless_enemies(self):
+        soft = optimize_loadouts(self.profile, EnemyProfile(100), max_jokers=0, workers=0)[0]
+        armoured = optimize_loadouts(self.profile, EnemyProfile(100, defense=30), max_jokers=0, workers=0)[0]
+        self.assertLess(armoured.damage_per_turn, soft.damage_per_turn)
+        wall = optimize_loadouts(self.profile, EnemyProfile(100, defense=10**6), max_jokers=0, workers=0)[0]
+        self.assertTrue(math.isinf(wall.turns_to_kill))
+
+    def test_pruning_keeps_the_exhaustive_ranking(self):
+        options = dict(max_jokers=4, top_k=8, candidates=SMALL_POOL, workers=0)
+        pruned = optimize_loadouts(self.profile, self.enemy, **options)
+        exhaustive = optimize_loadouts(self.profile, self.enemy, prune=False, **options)
+        self.assertEqual([s.loadout for s in pruned], [s.loadout for s in exhaustive])
+
+    def test_gemini_copies_the_strongest_pair(self):
+        evaluator = _Evaluator(self.profile, self.enemy, SMALL_POOL)
+        score = evaluator.evaluate(('joker', 'blank', 'archon', 'gemini'))
+        self.assertEqual(set(score.loadout[:2]), {'joker', 'archon'})
+
+    def test_process_pool(self):
+        options = dict(max_jokers=2, top_k=3, candidates=SMALL_POOL)
+        self.assertEqual(optimize_loadouts(self.profile, self.enemy, workers=2, **options),
+                         optimize_loadouts(self.profile, self.enemy, workers=0, **options))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import meta
+from entities.player import Player
+from meta import DEFAULT_META, FileMetaStore, MemoryMetaStore, load_meta, save_meta, use_meta_store
+
+
+class MetaStoreTest(unittest.TestCase):
+    def test_memory_store_isolates_the_save_file(self):
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(meta, 'META_FILE', Path(tmp) / 'm.json'):
+            store = MemoryMetaStore()
+            with use_meta_store(store):
+                data = load_meta()
+                data['permanent_hp_bonus'] = 15
+                data['unlocked_jokers'].append('joker')
+                save_meta(data)
+                self.assertEqual(load_meta()['permanent_hp_bonus'], 15)
+            self.assertFalse(meta.META_FILE.exists())
+            self.assertEqual(load_meta()['permanent_hp_bonus'], 0)
+            self.assertEqual(meta.DEFAULT_META['unlocked_jokers'], [])
+            self.assertEqual(store.data['unlocked_jokers'], ['joker'])
+
+    def test_players_read_the_injected_store_without_io(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FileMetaStore(Path(tmp) / 'm.json')
+            store.save(dict(DEFAULT_META, permanent_hp_bonus=7))
+            with use_meta_store(store):
+                Player()  # warms the cache
+                with mock.patch('builtins.open', side_effect=AssertionError("I/O")), \
+                        mock.patch.object(Path, 'stat', side_effect=AssertionError("I/O")):
+                    self.assertEqual(Player().max_hp, 107)
+            with use_meta_store(MemoryMetaStore(dict(DEFAULT_META, permanent_hp_bonus=3))):
+                self.assertEqual(Player().max_hp, 103)
+
+    def test_file_store_rereads_only_when_the_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'm.json'
+            store = FileMetaStore(path)
+            self.assertEqual(store.load(), DEFAULT_META)
+            path.write_text(json.dumps(dict(DEFAULT_META, runs_played=4)))
+            self.assertEqual(store.load()['runs_played'], 4)
+            with mock.patch('meta.json.load', side_effect=AssertionError("re-read")):
+                self.assertEqual(store.load()['runs_played'], 4)
+            path.write_text(json.dumps(dict(DEFAULT_META, runs_played=5)))
+            os.utime(path, ns=(1, 1))  # a changed stamp, whatever the clock resolution
+            self.assertEqual(store.load()['runs_played'], 5)
+
+    def test_saves_are_coalesced_and_atomic(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'm.json'
+            store = FileMetaStore(path, write_delay=60)
+            with mock.patch('meta.os.replace', wraps=os.replace) as replace:
+                for runs in range(1, 4):
+                    store.save(dict(DEFAULT_META, runs_played=runs))
+                self.assertEqual(replace.call_count, 1)  # the first save; the others wait
+                self.assertEqual(json.loads(path.read_text())['runs_played'], 1)
+                self.assertEqual(store.load()['runs_played'], 3)  # the pending save wins over the file
+                store.flush()
+                self.assertEqual(replace.call_count, 2)
+            self.assertEqual(json.loads(path.read_text())['runs_played'], 3)
+            self.assertEqual(os.listdir(tmp), ['m.json'])
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
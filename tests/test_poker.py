@@ -65,6 +65,17 @@ class PokerHandTest(unittest.TestCase):
         hand, _ = get_poker_hand(cards)
         self.assertEqual(hand, 'High Card')
 
+    def test_five_of_a_kind(self):
+        cards = build_cards([('8', 'Clubs'), ('8', 'Diamonds'), ('8', 'Spades'), ('8', 'Hearts'), ('8', 'Clubs')])
+        hand, _ = get_poker_hand(cards)
+        self.assertEqual(hand, 'Five of a Kind')
+
+    def test_flush_five(self):
+        cards = build_cards([('8', 'Clubs')] * 5)
+        hand, values = get_poker_hand(cards)
+        self.assertEqual(hand, 'Flush Five')
+        self.assertEqual(values, [8] * 5)
+
     def test_invalid_hand(self):
         cards = build_cards([('A', 'Hearts'), ('K', 'Hearts')])
         hand, _ = get_poker_hand(cards)
@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from card import Card
+from constants import HAND_MULTIPLIERS, RANKS, SUITS
+from hand_evaluator import HAND_RANKING
+from poker import classify_hands_array, encode_cards, get_poker_hand
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+DECK = [Card(suit, rank) for suit in SUITS for rank in RANKS]
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class BatchClassifierTest(unittest.TestCase):
+    def assert_matches_scalar(self, rows):
+        categories, multipliers = classify_hands_array(np.array(rows))
+        for row, category, multiplier in zip(rows, categories, multipliers):
+            hand, _ = get_poker_hand([DECK[i] for i in row])
+            self.assertEqual(HAND_RANKING[category], hand, row)
+            self.assertEqual(multiplier, HAND_MULTIPLIERS[hand])
+
+    def test_encoding_matches_deck_order(self):
+        self.assertEqual(encode_cards(DECK), list(range(52)))
+
+    def test_random_hands_with_duplicates(self):
+        rng = random.Random(3)
+        self.assert_matches_scalar([[rng.randrange(52) for _ in range(5)] for _ in range(5000)])
+
+    def test_special_hands(self):
+        ace_hearts, ace_spades = 12, 3 * 13 + 12
+        rows = [
+            [8, 9, 10, 11, 12],                      # royal flush
+            [12, 0, 1, 2, 3],                        # wheel straight flush
+            [12, 13, 1, 2, 3],                       # wheel straight
+            [ace_hearts] * 5,                        # flush five
+            [ace_hearts] * 4 + [ace_spades],         # five of a kind
+            [0, 0, 0, 5, 5],                         # flush house
+            [0, 13, 26, 39, 0],                      # five of a kind
+        ]
+        self.assert_matches_scalar(rows)
+        categories, _ = classify_hands_array(np.array(rows))
+        self.assertEqual(HAND_RANKING[categories[0]], "Royal Flush")
+        self.assertEqual(HAND_RANKING[categories[3]], "Flush Five")
+        self.assertEqual(HAND_RANKING[categories[5]], "Flush House")
+
+    def test_multipliers_follow_categories(self):
+        _, multipliers = classify_hands_array(np.array([[8, 9, 10, 11, 12]]))
+        self.assertEqual(multipliers[0], HAND_MULTIPLIERS["Royal Flush"])
+
+    def test_rejects_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            classify_hands_array(np.zeros((3, 4), dtype=int))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import builtins
+import contextlib
+import io
+import pickle
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import game
+import meta
+from combat_engine import Attack, CombatEngine, Discard, EndTurn, Phase
+from entities.enemy import Enemy
+from entities.player import Player
+from policies import (POLICIES, DiscardToImprove, LookaheadPolicy, Policy, PreferKind, ShopPolicy, SkipShop,
+                      make_policy)
+from shop import generate_shop_items, run_shop
+
+
+class PolicyTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(4)
+        self.out = contextlib.redirect_stdout(io.StringIO())
+        self.out.__enter__()
+
+    def tearDown(self):
+        self.out.__exit__(None, None, None)
+
+    def engine(self, hp=400):
+        return CombatEngine(Player(), Enemy('Dummy', hp, 5))
+
+    def test_every_policy_pickles_and_finishes_a_fight(self):
+        for name in POLICIES:
+            policy = pickle.loads(pickle.dumps(make_policy(name)))
+            engine = self.engine(hp=120)
+            self.assertIn(engine.run(policy, max_turns=50), (Phase.VICTORY, Phase.DEFEAT), name)
+
+    def test_actions_are_legal(self):
+        for name in POLICIES:
+            engine = self.engine()
+            action = make_policy(name)(engine)
+            self.assertIsInstance(action, (Attack, Discard, EndTurn))
+            engine.step(action)  # raises if illegal
+
+    def test_discard_to_improve_stops_when_out_of_discards(self):
+        engine = self.engine()
+        engine.player.discards_left = 0
+        self.assertIsInstance(DiscardToImprove(target='Royal Flush')(engine), Attack)
+        engine.player.discards_left = 1
+        self.assertIsInstance(DiscardToImprove(target='Royal Flush')(engine), Discard)
+
+    def test_lookahead_respects_time_budget(self):
+        engine = self.engine()
+        policy = LookaheadPolicy(time_budget=0.01, max_samples=10_000, seed=1)
+        start = time.perf_counter()
+        policy(engine)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            make_policy('telepathy')
+
+    def test_base_classes_are_abstract(self):
+        for base in (Policy, ShopPolicy):
+            with self.assertRaises(TypeError):
+                base()
+
+    def test_play_game_runs_without_input(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(meta, 'META_FILE', Path(tmp) / 'meta.json'), \
+                mock.patch.object(builtins, 'input', side_effect=AssertionError("input() called")):
+            game.play_game(make_policy('greedy'))
+            self.assertTrue((Path(tmp) / 'meta.json').exists())
+
+    def test_play_game_rejects_a_stuck_policy(self):
+        for policy in (lambda engine: None, lambda engine: Discard(())):
+            with tempfile.TemporaryDirectory() as tmp, \
+                    mock.patch.object(meta, 'META_FILE', Path(tmp) / 'meta.json'), \
+                    contextlib.redirect_stdout(io.StringIO()), self.assertRaises(ValueError):
+                game.play_game(policy)
+
+
+class ShopPolicyTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(2)
+        self.player = Player()
+
+    def test_skip_buys_nothing(self):
+        self.assertEqual(run_shop(self.player, SkipShop()), [])
+        self.assertEqual(self.player.gold, 20)
+
+    def test_prefer_kind_buys_in_order_until_broke(self):
+        self.player.gold = 40
+        with contextlib.redirect_stdout(io.StringIO()):
+            bought = run_shop(self.player, PreferKind(('hp', 'joker')), generate_shop_items())
+        self.assertEqual([item.kind for item in bought], ['hp', 'joker'])
+        self.assertEqual(self.player.gold, 0)
+        self.assertEqual(self.player.max_hp, 110 + meta.load_meta()['permanent_hp_bonus'])
+
+    def test_no_jokers_when_full(self):
+        self.player.jokers = ['joker'] * self.player.max_jokers
+        self.player.gold = 100
+        bought = run_shop(self.player, PreferKind(('joker',)))
+        self.assertEqual(bought, [])
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
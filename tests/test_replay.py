@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+import unittest
+
+from combat_engine import Attack, CombatEngine, Phase, UseItem
+from entities.enemy import Enemy
+from entities.player import Player
+from hand_finder import suggest_hands
+from replay import CombatRecorder, ReplayDivergence, read_logs, replay, seek
+from status_effects import PoisonEffect
+from tarot import TAROT_DEFINITIONS
+
+
+def greedy(engine):
+    return Attack(suggest_hands(engine.player, top_k=1, enemy=engine.enemy)[0].indices)
+
+
+def fight(seed, target, *, enemy_hp=400, keyframe_every=2, snapshots=None):
+    """Record one fight; *snapshots* collects the state at every turn start."""
+    player = Player()
+    player.jokers = ['joker', 'berserker']
+    player.items = [TAROT_DEFINITIONS['sun']]
+    enemy = Enemy('Brute', enemy_hp, 6, defense=2)
+    enemy.status_effects.add_effect(PoisonEffect(1, duration=6), enemy)
+    engine = CombatEngine(player, enemy, start=False, seed=seed)
+    CombatRecorder(engine, target, keyframe_every=keyframe_every)
+    engine.start()
+    while not engine.finished:
+        if snapshots is not None:
+            snapshots[engine.turn] = state(engine)
+        if engine.turn == 3 and player.items:
+            engine.step(UseItem(0))
+        engine.step(greedy(engine))
+    return engine
+
+
+def state(engine):
+    player, enemy = engine.player, engine.enemy
+    return ([c.id for c in player.hand], player.hp, enemy.hp, len(player.deck), list(player.jokers),
+            [(type(e).__name__, e.duration) for e in enemy.status_effects.effects])
+
+
+class ReplayTest(unittest.TestCase):
+    def test_replay_reproduces_recorded_fights(self):
+        stream = io.BytesIO()
+        engines = [fight(seed, stream) for seed in range(12)]
+        stream.seek(0)
+        logs = list(read_logs(stream))
+        self.assertEqual(len(logs), 12)
+        for engine, log in zip(engines, logs):
+            result = replay(log)
+            self.assertEqual(result.outcome, log.outcome)
+            self.assertEqual((result.outcome.won, result.outcome.turn), (engine.won, engine.turn))
+            self.assertIsNone(result.diverged_turn)
+
+    def test_seek_matches_the_recorded_turn(self):
+        stream = io.BytesIO()
+        snapshots = {}
+        fight(7, stream, enemy_hp=900, snapshots=snapshots)
+        stream.seek(0)
+        log = next(read_logs(stream))
+        self.assertGreater(len(log.keyframes), 2)
+        for turn, expected in snapshots.items():
+            engine = seek(log, turn)
+            self.assertIs(engine.phase, Phase.PLAYER_TURN)
+            self.assertEqual(engine.turn, turn)
+            self.assertEqual(state(engine), expected)
+
+    def test_seeked_engine_continues_the_fight(self):
+        stream = io.BytesIO()
+        recorded = fight(3, stream, enemy_hp=600)
+        stream.seek(0)
+        log = next(read_logs(stream))
+        engine = seek(log, 4)
+        actions, done = [], 0
+        for kind, value in log.decoded():
+            if kind == 'turn' and value == 4:
+                done = len(actions)
+            elif kind == 'action':
+                actions.append(value)
+        for action in actions[done:]:
+            engine.step(action)
+        self.assertEqual((engine.won, engine.turn, engine.player.hp), (recorded.won, recorded.turn, recorded.player.hp))
+
+    def test_divergence(self):
+        stream = io.BytesIO()
+        fight(1, stream)
+        stream.seek(0)
+        log = next(read_logs(stream))
+        log.seed += 1
+        with self.assertRaises(ReplayDivergence):
+            replay(log)
+        self.assertEqual(replay(log, strict=False).diverged_turn, 1)
+
+    def test_fights_append_to_one_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'fights.bin')
+            fight(1, path)
+            fight(2, path)
+            self.assertEqual([log.seed for log in read_logs(path)], [1, 2])
+
+    def test_recorder_needs_an_unstarted_engine(self):
+        engine = CombatEngine(Player(), Enemy('Dummy', 10, 1))
+        with self.assertRaises(ValueError):
+            CombatRecorder(engine, io.BytesIO())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
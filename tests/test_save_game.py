@@ -0,0 +1,257 @@
+import os
+import tempfile
+import threading
+import unittest
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+
+import save_game
+from card import CARD_TABLE
+from entities.player import Player
+from save_game import GameSaver, JOURNAL_FILE, PLAYER, QUEST, load_game, read_save
+from tarot import TAROT_DEFINITIONS
+
+
+# The quest, NPC and world modules need Ursina; these stand in for the
+# parts of GameState that are saved.
+
+class District(Enum):
+    TERMINAL = 'grand_terminal'
+    CASINO = 'casino_district'
+    UNDERDECK = 'the_underdeck'
+
+
+class Status(Enum):
+    NOT_STARTED = 'not_started'
+    ACTIVE = 'active'
+    COMPLETED = 'completed'
+
+
+class Act(Enum):
+    ACT_I = 'act_i'
+    ACT_II = 'act_ii'
+
+
+@dataclass
+class Objective:
+    required_count: int
+    current_count: int = 0
+    completed: bool = False
+
+
+@dataclass
+class Quest:
+    objectives: list
+    status: Status = Status.NOT_STARTED
+
+
+@dataclass
+class Npc:
+    met_player: bool = False
+    relationship_level: int = 0
+    quests_given: list = field(default_factory=list)
+    quests_completed: list = field(default_factory=list)
+
+
+def new_game():
+    world = SimpleNamespace(districts={d: SimpleNamespace(unlocked=d is District.TERMINAL) for d in District},
+                            unlocked_districts=[District.TERMINAL], current_district=None)
+    quests = {'arrival': Quest([Objective(3)]), 'casino': Quest([Objective(1), Objective(2)])}
+    return SimpleNamespace(
+        world_map=world,
+        story_manager=SimpleNamespace(current_act=Act.ACT_I, triggered_events=[], story_flags={}),
+        quest_manager=SimpleNamespace(available_quests=quests, active_quests={}, completed_quests=[],
+                                      failed_quests=[]),
+        dialogue_manager=SimpleNamespace(npcs={'valerius': Npc(), 'beggar': Npc()}),
+        boss_manager=SimpleNamespace(defeated_bosses=[]),
+        player=Player(),
+        current_district=District.TERMINAL, game_started=True, game_completed=False,
+        events_triggered=[], visual_cues_triggered=[], world_events_triggered=[],
+    )
+
+
+def play(state):
+    """Make a change to every saved system."""
+    quests = state.quest_manager
+    arrival = quests.available_quests['arrival']
+    arrival.status = Status.COMPLETED
+    arrival.objectives[0].current_count, arrival.objectives[0].completed = 3, True
+    quests.completed_quests.append('arrival')
+    casino = quests.available_quests['casino']
+    casino.status = Status.ACTIVE
+    casino.objectives[1].current_count = 1
+    quests.active_quests['casino'] = casino
+    state.dialogue_manager.npcs['valerius'].met_player = True
+    state.dialogue_manager.npcs['valerius'].relationship_level = 2
+    state.world_map.unlocked_districts.append(District.CASINO)
+    state.world_map.districts[District.CASINO].unlocked = True
+    state.world_map.current_district = District.CASINO
+    state.current_district = District.CASINO
+    state.boss_manager.defeated_bosses.append('casino_manager')
+    state.story_manager.current_act = Act.ACT_II
+    state.story_manager.triggered_events.append('met_valerius')
+    state.story_manager.story_flags['met_valerius'] = True
+    state.events_triggered.append('first_casino_visit')
+    player = state.player
+    player.gold, player.hp = 77, 42
+    player.jokers = ['joker', 'berserker']
+    player.items = [TAROT_DEFINITIONS['sun']]
+    player.deck.draw(5)
+    player.hand = [CARD_TABLE[0], CARD_TABLE[51]]
+    player.respawn_position = (1.0, 2.0, 3.0)
+    player.beggar_fights_remaining = 3
+
+
+def summary(state):
+    quests = state.quest_manager
+    player = state.player
+    return (
+        [(q.status, [(o.current_count, o.completed) for o in q.objectives])
+         for q in quests.available_quests.values()],
+        list(quests.active_quests), quests.completed_quests,
+        [vars(npc) for npc in state.dialogue_manager.npcs.values()],
+        state.world_map.unlocked_districts, state.world_map.current_district,
+        [d.unlocked for d in state.world_map.districts.values()],
+        state.boss_manager.defeated_bosses, state.story_manager.current_act,
+        state.story_manager.story_flags, state.current_district, state.events_triggered,
+        player.gold, player.hp, player.jokers, [item.key for item in player.items],
+        sorted(card.id for card in player.deck.unordered()), [card.id for card in player.hand],
+        player.respawn_position, player.beggar_fights_remaining,
+    )
+
+
+class SaveGameTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / 'slot'
+
+    def test_a_reloaded_game_matches_the_saved_one(self):
+        state = new_game()
+        saver = GameSaver(state, self.path)
+        self.assertFalse(saver.loaded)
+        play(state)
+        self.assertGreater(saver.checkpoint(), 0)
+        self.assertEqual(saver.checkpoint(), 0)
+        saver.close()
+
+        restored = new_game()
+        self.assertTrue(load_game(restored, self.path))
+        self.assertEqual(summary(restored), summary(state))
+        self.assertIs(restored.quest_manager.active_quests['casino'],
+                      restored.quest_manager.available_quests['casino'])
+
+    def test_only_changed_entries_are_journaled(self):
+        state = new_game()
+        saver = GameSaver(state, self.path)
+        state.player.gold += 5
+        state.quest_manager.available_quests['casino'].objectives[0].current_count = 1
+        self.assertEqual(saver.checkpoint(), 2)
+        saver.close()
+        data = read_save(self.path)
+        self.assertEqual(data.journal_records, 2)
+        self.assertEqual(data.entries[(PLAYER, '')][2], state.player.gold)
+        self.assertEqual(data.entries[(QUEST, 'casino')][1], (1, 0))
+
+    def test_a_long_journal_is_compacted_into_a_snapshot(self):
+        state = new_game()
+        saver = GameSaver(state, self.path, compact_after=10)
+        for gold in range(25):
+            state.player.gold = gold
+            saver.checkpoint()
+        saver.flush()
+        data = read_save(self.path)
+        self.assertLessEqual(data.journal_records, 10)
+        self.assertEqual(data.entries[(PLAYER, '')][2], 24)
+        saver.close()
+
+        # Reopened saves keep journaling where they left off
+        saver = GameSaver(new_game(), self.path, compact_after=10)
+        self.assertEqual(saver.state.player.gold, 24)
+        saver.state.player.gold = 99
+        saver.close()
+        restored = new_game()
+        load_game(restored, self.path)
+        self.assertEqual(restored.player.gold, 99)
+
+    def test_a_torn_journal_record_is_dropped(self):
+        state = new_game()
+        saver = GameSaver(state, self.path)
+        state.player.gold = 50
+        saver.checkpoint()
+        saver.flush()
+        state.player.gold = 60
+        saver.close()
+        journal = self.path / JOURNAL_FILE
+        with open(journal, 'r+b') as fp:
+            fp.truncate(os.path.getsize(journal) - 3)
+
+        saver = GameSaver(new_game(), self.path)
+        self.assertEqual(saver.state.player.gold, 50)
+        saver.state.player.gold = 70
+        saver.close()
+        restored = new_game()
+        load_game(restored, self.path)
+        self.assertEqual(restored.player.gold, 70)
+
+    def test_a_journal_older_than_the_snapshot_is_ignored(self):
+        state = new_game()
+        saver = GameSaver(state, self.path)
+        state.player.gold = 30
+        saver.close()
+        stale = (self.path / JOURNAL_FILE).read_bytes()
+
+        saver = GameSaver(state, self.path, compact_after=0)
+        state.player.gold = 40
+        saver.close()  # compacts into generation 2
+        (self.path / JOURNAL_FILE).write_bytes(stale)  # as if the journal reset never happened
+        self.assertEqual(read_save(self.path).journal_records, 0)
+        restored = new_game()
+        load_game(restored, self.path)
+        self.assertEqual(restored.player.gold, 40)
+
+    def test_checkpoints_do_not_wait_for_the_disk(self):
+        state = new_game()
+        saver = GameSaver(state, self.path)
+        saver.flush()
+        release = threading.Event()
+        real = save_game._SaveWriter._append
+
+        def slow_append(writer, records):
+            release.wait()
+            real(writer, records)
+        save_game._SaveWriter._append = slow_append
+        self.addCleanup(setattr, save_game._SaveWriter, '_append', real)
+        for gold in range(3):
+            state.player.gold = gold
+            self.assertEqual(saver.checkpoint(), 1)  # returns while the writer is stuck
+        self.assertEqual(read_save(self.path).journal_records, 0)
+        release.set()
+        saver.close()
+        self.assertEqual(read_save(self.path).journal_records, 3)
+
+    def test_starting_over_replaces_the_save(self):
+        state = new_game()
+        play(state)
+        GameSaver(state, self.path).close()
+        fresh = new_game()
+        saver = GameSaver(fresh, self.path, load=False)
+        self.assertFalse(saver.loaded)
+        self.assertEqual(fresh.player.gold, 20)
+        saver.close()
+        restored = new_game()
+        load_game(restored, self.path)
+        self.assertEqual(summary(restored), summary(new_game()))
+        self.assertEqual(read_save(self.path).generation, 2)
+
+    def test_no_save_leaves_the_state_alone(self):
+        state = new_game()
+        before = summary(state)
+        self.assertFalse(load_game(state, self.path))
+        self.assertEqual(summary(state), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import contextlib
+import io
+import unittest
+from collections import Counter
+
+from simulate import SimConfig, SimStats, build_grid, simulate
+
+
+def quiet_run(configs, fights, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {config: stats for config, stats in simulate(configs, fights, **kwargs)}
+
+
+class SimStatsTest(unittest.TestCase):
+    def test_merge_and_percentiles(self):
+        a = SimStats(fights=2, wins=1, turns_to_kill=Counter({3: 1}), damage=Counter({10: 3}))
+        b = SimStats(fights=2, wins=2, turns_to_kill=Counter({1: 2}), damage=Counter({50: 1}))
+        a.merge(b)
+        self.assertEqual((a.fights, a.wins), (4, 3))
+        self.assertAlmostEqual(a.win_rate, 0.75)
+        self.assertAlmostEqual(a.mean_turns_to_kill(), 5 / 3)
+        self.assertEqual(a.damage_percentile(50), 10)
+        self.assertEqual(a.damage_percentile(99), 50)
+        self.assertIsNone(SimStats().damage_percentile(50))
+
+
+class SimulateTest(unittest.TestCase):
+    def test_grid_is_the_cartesian_product(self):
+        grid = build_grid(['Twisted Guard', 'Twisted Scout'], [(), ('joker',)], [0, 20], [8])
+        self.assertEqual(len(grid), 8)
+        self.assertIn(SimConfig('Twisted Scout', ('joker',), 20, 8), grid)
+
+    def test_results_are_reproducible_and_independent_of_workers(self):
+        configs = build_grid(['Twisted Scout'], [(), ('joker',)], [0], [8])
+        serial = quiet_run(configs, 12, seed=3, workers=0, chunk_size=5)
+        again = quiet_run(configs, 12, seed=3, workers=0, chunk_size=5)
+        pooled = quiet_run(configs, 12, seed=3, workers=2, chunk_size=5)
+        for config in configs:
+            self.assertEqual(serial[config].fights, 12)
+            self.assertEqual(serial[config].summary(), again[config].summary())
+            self.assertEqual(serial[config].summary(), pooled[config].summary())
+            self.assertEqual(sum(serial[config].turns_to_kill.values()), serial[config].wins)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
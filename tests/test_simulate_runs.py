@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import meta
+from policies import PreferKind, SkipShop
+from simulate import quiet
+from simulate_runs import ProgressionStats, simulate_careers
+
+
+class SimulateCareersTest(unittest.TestCase):
+    def test_progression_carries_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(meta, 'META_FILE', Path(tmp) / 'm.json'):
+            stats = simulate_careers(3, 4, stages=2, seed=1, workers=0)
+            self.assertFalse(meta.META_FILE.exists())
+        self.assertEqual(stats.careers, 3)
+        curve = stats.curve()
+        self.assertEqual([p['run'] for p in curve], [1, 2, 3, 4])
+        for i, point in enumerate(curve):
+            # Every win adds 5 permanent HP, which the next run starts with
+            wins_so_far = sum(stats.wins[:i + 1])
+            self.assertAlmostEqual(point['permanent_hp_bonus'] * 3, 5 * wins_so_far)
+            self.assertLessEqual(point['stages_cleared'], 2)
+
+    def test_reproducible_and_independent_of_workers(self):
+        serial = simulate_careers(4, 2, stages=2, seed=9, workers=0, chunk_size=1)
+        pooled = simulate_careers(4, 2, stages=2, seed=9, workers=2, chunk_size=1)
+        self.assertEqual(serial.curve(), pooled.curve())
+
+    def test_shops_buy_unless_skipping_is_asked_for(self):
+        with mock.patch('simulate_runs.run_careers', return_value=ProgressionStats(1)) as run_careers:
+            simulate_careers(1, 1, workers=0)
+            simulate_careers(1, 1, workers=0, shop_policy=SkipShop())
+        shop_policies = [call.args[-1] for call in run_careers.call_args_list]
+        self.assertIsInstance(shop_policies[0], PreferKind)
+        self.assertIsInstance(shop_policies[1], SkipShop)
+
+    def test_quiet_discards_output(self):
+        with mock.patch('sys.stdout') as stdout, quiet():
+            print("noise")
+        stdout.write.assert_not_called()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+
+from entities.enemy import Enemy
+from status_effects import (
+    DamageBuffEffect, DamageReductionEffect, HealEffect, PoisonEffect, ShieldEffect, StatusEffect,
+    StatusEffectManager, StunEffect, effect_state,
+)
+
+
+class StatusEffectManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.enemy = Enemy('Dummy', 100, 5)
+        self.effects = self.enemy.status_effects
+
+    def add(self, effect):
+        self.effects.add_effect(effect, self.enemy)
+        return effect
+
+    def test_same_type_replaces_but_poison_stacks(self):
+        self.add(ShieldEffect(10))
+        self.add(ShieldEffect(4))
+        self.add(PoisonEffect(2))
+        self.add(PoisonEffect(3))
+        self.assertEqual(self.effects.shield_pool, 4)
+        self.assertEqual([type(e).__name__ for e in self.effects.effects],
+                         ['ShieldEffect', 'PoisonEffect', 'PoisonEffect'])
+        self.enemy.start_turn()
+        self.assertEqual(self.enemy.hp, 95)
+
+    def test_reduction_applies_before_the_shield(self):
+        self.add(DamageReductionEffect(0.5))
+        shield = self.add(ShieldEffect(6))
+        self.assertEqual(self.effects.modify_incoming_damage(10), 0)
+        self.assertEqual(shield.amount, 1)
+        self.assertEqual(self.effects.modify_incoming_damage(10), 4)
+        self.assertFalse(self.effects.has_effect(ShieldEffect))
+        self.assertFalse(shield.active)
+        self.assertEqual(self.effects.shield_pool, 0)
+        self.assertEqual(self.effects.modify_incoming_damage(10), 5)
+
+    def test_stacked_shields_drain_oldest_first(self):
+        older, newer = ShieldEffect(5), ShieldEffect(7)
+        self.effects.effects = [older, newer]  # as restored from a save; add_effect would replace
+        self.assertEqual(self.effects.shield_pool, 12)
+        self.assertEqual(self.effects.modify_incoming_damage(8), 0)
+        self.assertEqual((older.amount, newer.amount), (0, 4))
+        self.assertEqual(self.effects.effects, [newer])
+        self.assertEqual(self.effects.modify_incoming_damage(10), 6)
+
+    def test_buff_is_consumed_by_one_attack(self):
+        self.add(DamageBuffEffect(1.5))
+        self.assertEqual(self.effects.peek_outgoing_damage(11), 16)
+        self.assertEqual(self.effects.modify_outgoing_damage(11), 16)
+        self.assertEqual(self.effects.modify_outgoing_damage(11), 11)
+        self.assertEqual(self.effects.effects, [])
+
+    def test_ticks_expire_effects(self):
+        self.add(StunEffect())
+        self.add(PoisonEffect(4, duration=2))
+        self.add(DamageReductionEffect(0.3, duration=2))
+        self.assertTrue(self.effects.has_effect(StunEffect))
+        self.assertIs(self.effects.get_effect(StatusEffect), self.effects.effects[0])
+        self.enemy.start_turn()
+        self.assertFalse(self.effects.has_effect(StunEffect))
+        self.enemy.start_turn()
+        self.assertEqual(self.enemy.hp, 92)
+        self.assertEqual(self.effects.effects, [])
+        self.assertEqual(self.effects.modify_incoming_damage(10), 10)
+
+    def test_heal_is_applied_without_being_stored(self):
+        self.enemy.hp = 50
+        heal = self.add(HealEffect(20))
+        self.assertEqual(self.enemy.hp, 70)
+        self.assertFalse(heal.active)
+        self.assertEqual(self.effects.effects, [])
+        self.effects.effects = [HealEffect(20)]  # restored instants are not re-applied either
+        self.assertEqual((self.effects.effects, self.enemy.hp), ([], 70))
+
+    def test_permanent_effects_never_expire(self):
+        shield = self.add(ShieldEffect(5))
+        reduction = self.add(DamageReductionEffect(0.2))
+        self.assertTrue(shield.permanent and reduction.permanent)
+        for _ in range(2000):
+            self.enemy.start_turn()
+        self.assertEqual(self.effects.effects, [shield, reduction])
+        self.assertIsNone(self.effects.remaining_turns(shield))
+
+    def test_stacked_poisons_are_pooled(self):
+        for turns in range(1, 41):
+            self.add(PoisonEffect(1, duration=turns))
+        self.enemy.hp = 10**6
+        lost = []
+        for _ in range(41):
+            before = self.enemy.hp
+            self.enemy.start_turn()
+            lost.append(before - self.enemy.hp)
+        self.assertEqual(lost, list(range(40, 0, -1)) + [0])
+        self.assertEqual(self.effects.effects, [])
+
+    def test_replaced_effect_leaves_its_timer_behind(self):
+        self.add(DamageReductionEffect(0.3, duration=2))
+        self.enemy.start_turn()
+        newer = self.add(DamageReductionEffect(0.5, duration=2))
+        self.enemy.start_turn()  # the old effect's expiry turn
+        self.assertEqual(self.effects.effects, [newer])
+        self.assertEqual(newer.duration, 1)
+        self.enemy.start_turn()
+        self.assertFalse(self.effects.has_effect(DamageReductionEffect))
+
+    def test_effects_have_no_instance_dict(self):
+        for effect in (StunEffect(), HealEffect(1), DamageBuffEffect(1.5), ShieldEffect(3),
+                       DamageReductionEffect(0.2), PoisonEffect(1)):
+            self.assertFalse(hasattr(effect, '__dict__'), type(effect).__name__)
+        self.assertEqual(effect_state(ShieldEffect(3)),
+                         {'name': 'Shield', 'duration': None, 'active': True, 'amount': 3, 'original_amount': 3})
+
+    def test_dropped_effects_return_to_their_pool(self):
+        first = self.add(PoisonEffect.acquire(4, duration=1))
+        self.enemy.start_turn()
+        self.assertFalse(first.active)
+        again = PoisonEffect.acquire(2, duration=5)
+        self.assertIs(again, first)
+        self.assertEqual((again.damage_per_turn, again.duration, again.active), (2, 5, True))
+        heal = HealEffect.acquire(5)
+        self.add(heal)
+        self.assertIs(HealEffect.acquire(5), heal)
+
+    def test_constructed_effects_are_never_recycled(self):
+        shield = self.add(ShieldEffect(5))
+        self.effects.modify_incoming_damage(10)
+        self.assertIsNot(ShieldEffect.acquire(1), shield)
+        self.assertEqual(shield.amount, 0)
+
+    def test_restoring_the_current_effects_keeps_them(self):
+        poison = self.add(PoisonEffect.acquire(1, duration=5))
+        self.effects.effects = self.effects.effects
+        self.assertIsNot(PoisonEffect.acquire(1), poison)
+        self.assertEqual(self.effects.effects, [poison])
+
+    def test_clear(self):
+        manager = StatusEffectManager()
+        manager.add_effect(ShieldEffect(9), self.enemy)
+        manager.add_effect(DamageBuffEffect(2.0), self.enemy)
+        manager.clear_all_effects()
+        self.assertEqual((manager.shield_pool, manager.peek_outgoing_damage(5)), (0, 5))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from poker import classify_hands_array
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+if np is not None:
+    from vector_combat import CombatBatch, simulate_template
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class CombatBatchTest(unittest.TestCase):
+    def batch(self, n=1000, **options):
+        stats = dict(enemy_hp=60, enemy_attack=10, seed=5)
+        stats.update(options)
+        return CombatBatch(n, **stats)
+
+    def test_table_classification_matches_batch_classifier(self):
+        hands = np.random.default_rng(1).integers(52, size=(20000, 5))
+        categories, multipliers = classify_hands_array(hands)
+        category, base, total = self.batch(1)._best_play(hands.astype(np.int8))
+        np.testing.assert_array_equal(category, categories)
+        np.testing.assert_array_equal(base, ((hands % 13) + 2).sum(axis=1) * multipliers)
+        np.testing.assert_array_equal(total, base)  # no jokers: identity
+
+    def test_deal_has_no_repeats(self):
+        hand = self.batch(5000, hand_size=8)._deal()
+        self.assertTrue(all(len(set(row)) == 8 for row in hand.tolist()))
+
+    def test_seeded_runs_repeat(self):
+        first, second = self.batch().run(), self.batch().run()
+        np.testing.assert_array_equal(first.turns, second.turns)
+        np.testing.assert_array_equal(first.player_hp, second.player_hp)
+
+    def test_trivial_and_hopeless_enemies(self):
+        easy = self.batch(enemy_hp=1, enemy_attack=0).run()
+        self.assertTrue(easy.won.all())
+        self.assertEqual(easy.turns.min(), 1)  # High Card deals nothing, so not always
+        hopeless = self.batch(enemy_hp=10**9, enemy_attack=10**6, player_hp=1).run()
+        self.assertFalse(hopeless.won.any())
+        self.assertTrue(hopeless.finished.all())
+
+    def test_defense_subtracts_from_every_hit(self):
+        batch = self.batch(3, enemy_defense=[0, 5, 500])
+        batch._hit_enemy(np.array([20, 20, 20]), np.ones(3, dtype=bool))
+        self.assertEqual(batch.enemy_hp.tolist(), [40, 45, 60])
+
+    def test_reduction_then_shield(self):
+        batch = self.batch(3, enemy_attack=50)
+        batch.reduced[:] = [False, True, True]
+        batch.shield[:] = [0, 0, 30]
+        batch._enemy_attack(np.ones(3, dtype=bool))
+        self.assertEqual(batch.player_hp.tolist(), [50, 65, 95])
+        self.assertEqual(batch.shield.tolist(), [0, 0, 0])
+
+    def test_stun_skips_one_attack(self):
+        batch = self.batch(2, enemy_attack=50)
+        batch.enemy_stunned[0] = True
+        batch._enemy_attack(np.ones(2, dtype=bool))
+        self.assertEqual(batch.player_hp.tolist(), [100, 50])
+
+    def test_poison_lasts_three_turns_and_stacks(self):
+        batch = self.batch(1, enemy_hp=10**6, enemy_attack=0)
+        batch._player_attack = lambda alive: None  # isolate the ticks
+        batch.player_poison += 4  # two stacks applied on turn 0
+        batch.player_poison += 2
+        hp = []
+        for _ in range(4):
+            batch.step()
+            hp.append(int(batch.player_hp[0]))
+        self.assertEqual(hp, [94, 88, 82, 82])
+
+    def test_max_turns_leaves_fights_unfinished(self):
+        result = self.batch(enemy_hp=10**9, enemy_attack=0).run(max_turns=3)
+        self.assertFalse(result.finished.any())
+        self.assertTrue((result.turns == 3).all())
+
+    def test_templates_and_jokers(self):
+        plain = simulate_template('Twisted Commander', 4000, seed=2)
+        boosted = simulate_template('Twisted Commander', 4000, seed=2, jokers=('joker', 'berserker'))
+        self.assertGreater(boosted.win_rate, plain.win_rate)
+
+    def test_hand_size_below_five_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.batch(hand_size=4)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -1,10 +1,21 @@
 from ursina import *  # type: ignore
+from concurrent.futures import Future, ProcessPoolExecutor
+from types import SimpleNamespace
 from typing import Any, cast
 import math
+import multiprocessing
+from pathlib import Path
 
 from entities.player import Player
+from combat_engine import Attack, CombatEngine, Discard, EndTurn, Phase, UseItem
+from events import (DamageDealt, EffectApplied, EnemyAttacked, HandPlayed, JokerConsumed, ShieldAbsorbed,
+                    subscribe)
+from deck import MultisetDeck
 from encounter import EncounterManager
 from entities.enemy import Enemy
+from hand_finder import MAX_SELECTION, suggest_hands
+from draw_odds import advise_discards, discard_odds
+from replay import CombatRecorder
 from texture_manager import apply_card_texture, apply_character_texture
 from direct.actor.Actor import Actor 
 
@@ -13,6 +24,13 @@ CARD_W, CARD_H = .12, .18  # smaller cards
 CARD_GAP = 0.02            # horizontal gap between cards
 BUTTON_Y = -.65
 ENEMY_DELAY = 0.6  # seconds before enemy strikes (visual anticipation)
+LOG_LINES = 4
+LOG_CHANNELS = (HandPlayed, DamageDealt, EnemyAttacked, EffectApplied, ShieldAbsorbed, JokerConsumed)
+# Every fight is appended here for bug reports (see replay.py); None disables recording
+REPLAY_LOG: Path | None = Path(__file__).parent / 'combat_replays.bin'
+# Scoring every discard of a fresh hand takes a moment, so it runs in its own process where
+# it neither stalls nor shares the GIL with the frame loop (spawned, not forked from Panda3D)
+_ADVISOR = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
 
 # Helper
 _fmt = lambda v: int(v)
@@ -45,6 +63,9 @@ class CombatUI(Entity):
         self.last_damage_taken = 0
         self.last_hand: str = ''
 
+        # Discard advice being worked out on _ADVISOR: (hand it is for, result)
+        self._advice: tuple[list, Future] | None = None
+
         # Discard limit per turn - use player's actual max_discards
         self.max_discards = getattr(self.player, 'max_discards', 4)
         self.discards_left = self.max_discards
@@ -55,6 +76,11 @@ class CombatUI(Entity):
         # Approach direction from world encounter (unit Vec3 on XZ plane)
         self.approach_dir = approach_dir
 
+        # Rules live in the engine; this class only renders and paces them
+        self.engine = CombatEngine(self.player, self.enemy, auto_enemy_turn=False, start=False)
+        self.recorder = CombatRecorder(self.engine, REPLAY_LOG) if REPLAY_LOG else None
+        self.engine.start()
+
         # Build scene & UI
         self.lock_world()
         self._setup_scene_models(enemy_position)
@@ -176,6 +202,11 @@ class CombatUI(Entity):
         self.txt_jokers = Text(parent=self.ui_root, x=-0.48, y=0.31, scale=1, origin=(0, 0))
         self.txt_last = Text(parent=self.ui_root, x=-0.48, y=0.24, scale=1, origin=(0, 0))
         self.txt_discards = Text(parent=self.ui_root, scale=1, origin=(0,0))
+        self.txt_log = Text(parent=self.ui_root, x=0.05, y=0.38, scale=0.9, origin=(-0.5, 0.5))
+
+        # Combat log fed by the event bus; unsubscribed in _cleanup
+        self.log_lines: list[str] = []
+        self._unsubscribe = [subscribe(channel, self._log_event) for channel in LOG_CHANNELS]
 
         # Update HUD
         self._update_stats()
@@ -251,6 +282,8 @@ class CombatUI(Entity):
         _btn('Skills', 1, self.use_skill)
         _btn('Attack', 2, self.attack_selected)
         discard_btn = _btn('Discard', 3, self.discard_selected)
+        _btn('Suggest', 4, self.suggest_play)
+        _btn('Odds', 5, self.advise_discard)
 
         # Position discards-left text right under Discard button
         self.txt_discards.parent = self.action_panel
@@ -280,11 +313,13 @@ class CombatUI(Entity):
             btn = Button(parent=overlay, text=label, position=(-0.2, start_y-idx*0.12), scale=(0.4,0.08))
 
             def _choose(it=itm):
-                # call effect
-                if isinstance(it, TarotCard):
-                    it.on_use(self)
-                # remove item
-                self.player.items.remove(it)
+                if it in self.player.items:
+                    try:
+                        self.engine.step(UseItem(self.player.items.index(it)))
+                    except ValueError as exc:
+                        self.txt_last.text = str(exc)
+                    if self.engine.last_hand:
+                        self.last_hand = self.engine.last_hand
                 self._refresh_hand_ui()
                 close()
 
@@ -304,6 +339,58 @@ class CombatUI(Entity):
 
         close_btn.on_click = close
 
+    def suggest_play(self):
+        """Pre-select the highest damage hand currently available."""
+        suggestions = suggest_hands(self.player, top_k=1, enemy=self.enemy)
+        if not suggestions:
+            return
+        best = suggestions[0]
+        self.selected = list(best.indices)
+        self._refresh_hand_ui()
+        for hb in self.hand_buttons:
+            if getattr(hb, 'card_index', None) in self.selected:
+                hb.color = cast(Any, color.yellow)
+        self.txt_last.text = f'Suggested: {best.hand_type} (~{_fmt(best.damage)} dmg)'
+
+    def advise_discard(self):
+        """Show draw odds for the selected discard, or pre-select the best one.
+
+        The best discard is worked out in a worker process, from a copy of the
+        hand, jokers and deck; update() shows it once it is ready.
+        """
+        if self.selected:
+            self._show_odds('Selected discard', discard_odds(self.player, self.selected))
+            return
+        if self._advice is not None:
+            return  # still working
+        # advise_discards only reads these, and they pickle cheaply
+        snapshot = SimpleNamespace(hand=list(self.player.hand), jokers=list(self.player.jokers),
+                                   deck=MultisetDeck(self.player.deck.counts()))
+        self._advice = (snapshot.hand, _ADVISOR.submit(advise_discards, snapshot, top_k=1))
+        self.txt_last.text = 'Best discard: working out the odds...'
+
+    def _show_advice(self):
+        hand, future = self._advice
+        if not future.done():
+            return
+        self._advice = None
+        if self.player.hand != hand:
+            return  # the hand changed meanwhile, so the indices no longer apply
+        advice = future.result()
+        if not advice or not advice[0].indices:
+            self.txt_last.text = 'Best odds: keep your hand'
+            return
+        self.selected = list(advice[0].indices)
+        self._refresh_hand_ui()
+        for hb in self.hand_buttons:
+            if getattr(hb, 'card_index', None) in self.selected:
+                hb.color = cast(Any, color.orange)
+        self._show_odds('Best discard', advice[0].odds)
+
+    def _show_odds(self, label: str, odds: dict[str, float]):
+        likely = sorted(odds.items(), key=lambda item: -item[1])[:3]
+        self.txt_last.text = f"{label}: " + ', '.join(f'{name} {p:.0%}' for name, p in likely)
+
     def use_skill(self):
         print('TODO: implement skills')
 
@@ -325,78 +412,78 @@ class CombatUI(Entity):
     # Turn flow
     # ------------------------------------------------------------------
     def start_player_turn(self):
-        self.player.draw_cards()
+        """Redraw the UI for a new player turn (the engine already dealt the cards)."""
         self.selected.clear()
-        self.discards_left = self.max_discards  # reset per turn
+        self.discards_left = self.player.discards_left
         self._refresh_hand_ui()
 
     def attack_selected(self):
-        if not self.selected:
+        if not self.selected or self.engine.phase is not Phase.PLAYER_TURN:
+            return
+        if len(self.selected) > MAX_SELECTION:
+            # A suggested discard can hold more cards than a hand may play
+            self.selected.clear()
+            self._refresh_hand_ui()
+            self.txt_last.text = f'Select at most {MAX_SELECTION} cards to attack'
             return
-        dmg, hand_type, effects = self.player.form_hand_and_attack(self.selected, enemy=self.enemy)
-        bonus = getattr(self, '_tarot_bonus', 0)
-        if bonus:
-            dmg += bonus
-            self._tarot_bonus = 0  # reset after use
-        if hand_type and self.enemy:
-            self.enemy.take_damage(dmg)
-            self.last_damage_dealt = _fmt(dmg)
-            self.last_hand = hand_type
+        try:
+            result = self.engine.step(Attack(tuple(self.selected)))
+        except ValueError as exc:
+            self.txt_last.text = str(exc)
+            return
+        if result.hand_type:
+            self.last_damage_dealt = _fmt(result.damage_dealt)
+            self.last_hand = result.hand_type
             self.last_damage_taken = 0
             # Show effects summary if any
-            if effects:
-                self.txt_last.text = f"{hand_type}: {', '.join(effects)}"
+            if result.effects:
+                self.txt_last.text = f"{result.hand_type}: {', '.join(result.effects)}"
         self.selected.clear()
         self._refresh_hand_ui()
-        if self.enemy and not self.enemy.is_alive():
-            self._finish_combat(True)
-        else:
-            self.enemy_turn()
+        self._after_player_action()
 
     def discard_selected(self):
         if not self.selected:
             return
-        if self.discards_left <= 0:
+        if not self.engine.can_discard():
             print('No discards left!')
             return
-        
-        # Convert selected indices to actual cards and discard them
-        discarded = self.player.discard_cards(self.selected)
-        if discarded:
-            print(f"Discarded {len(discarded)} card(s). {self.player.discards_left} discards left.")
-            self.discards_left = self.player.discards_left  # Sync with player's discard count
-            self.selected.clear()
-            self._refresh_hand_ui()
-        else:
-            print("Failed to discard cards.")
+        try:
+            self.engine.step(Discard(tuple(self.selected)))
+        except ValueError as exc:
+            self.txt_last.text = str(exc)
+            return
+        self.discards_left = self.player.discards_left
+        self.selected.clear()
+        self._refresh_hand_ui()
 
     def end_turn(self):
+        if self.engine.phase is not Phase.PLAYER_TURN:
+            return
         self.selected.clear()
-        self.enemy_turn()
+        self.engine.step(EndTurn())
+        self._after_player_action()
+
+    def _after_player_action(self):
+        if self.engine.phase is Phase.VICTORY:
+            self._finish_combat(True)
+        elif self.engine.phase is Phase.ENEMY_TURN:
+            self.enemy_turn()
 
     def enemy_turn(self):
         """Schedule the enemy's counter-attack after a short delay."""
-        if self.enemy and self.enemy.is_alive():
-            self.in_enemy_phase = True
-            invoke(self._enemy_attack, delay=ENEMY_DELAY)
-        else:
-            self.start_player_turn()
+        self.in_enemy_phase = True
+        invoke(self._enemy_attack, delay=ENEMY_DELAY)
 
     def _enemy_attack(self):
-        if not (self.enemy and self.enemy.is_alive()):
-            self.in_enemy_phase = False
-            self.start_player_turn()
-            return
-
-        self.enemy.attack_player(self.player)
-        self.last_damage_taken = self.enemy.attack_value
+        self.last_damage_taken = self.engine.enemy_turn()
         self.last_damage_dealt = 0
         self.last_hand = ''
         self._update_stats()
 
         self.in_enemy_phase = False
-        if not self.player.is_alive():
-            self._finish_combat(False)
+        if self.engine.finished:
+            self._finish_combat(self.engine.won)
         else:
             self.start_player_turn()
 
@@ -419,25 +506,18 @@ class CombatUI(Entity):
         self.status_text.text = 'Victory!' if player_won else 'Defeat…'
         invoke(self._cleanup, delay=1.5)
 
-        # Reward coins (Executive bonus)
-        reward = random.randint(8, 15)
-        if 'executive' in self.player.jokers:
-            reward = int(reward * 1.5)
-        self.player.gold += reward
-        print(f"You earned {reward} gold!")
-
-        # Award EXP and level up handling
-        exp_gain = random.randint(15, 30)
-        if hasattr(self.player, 'add_exp'):
-            self.player.add_exp(exp_gain)
-        print(f"Gained {exp_gain} EXP.")
-        
-        # Refresh deck and reset discards after combat
-        if player_won:
-            self.player.refresh_deck()
-        self.player.reset_discards()
+        # Gold (Executive bonus) and EXP; the engine already refreshed the deck
+        self.engine.grant_rewards()
+
+    def _log_event(self, event):
+        self.log_lines = (self.log_lines + [event.describe()])[-LOG_LINES:]
+        self.txt_log.text = '\n'.join(self.log_lines)
 
     def _cleanup(self):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        if self.recorder is not None:
+            self.recorder.close()
         # Panda3D Actor needs Panda cleanup; Ursina Entity can be destroyed
         try:
             from direct.actor.Actor import Actor  # type: ignore
@@ -479,4 +559,6 @@ class CombatUI(Entity):
 
     # Entity per-frame update to ensure discard text always reflects latest value
     def update(self):  # called automatically by Ursina each frame
-        self.txt_discards.text = f'Discards left: {self.discards_left}' 
\ No newline at end of file
+        self.txt_discards.text = f'Discards left: {self.discards_left}'
+        if self._advice is not None:
+            self._show_advice()
@@ -25,6 +25,7 @@ from npc_system import create_random_npc, NPC, DialogueChoice
 from texture_manager import apply_world_texture, apply_character_texture
 
 from entities.player import Player
+from events import attach_console
 
 
 # ---------------------------------------------------------------------------
@@ -35,7 +36,7 @@ from entities.player import Player
 def setup_world():
     """Create a massive 7-district world of Aethelburg with proper scale and transitions."""
 
-    global world_map, story_manager, quest_manager, boss_manager, environmental_storytelling, district_renderer, game_state
+    global world_map, story_manager, quest_manager, boss_manager, environmental_storytelling, district_renderer, game_state, saver
     global quest_text, quest_progress, quest_objective, district_prompt
     global guild_prompt, market_prompt, npc_prompt, env_prompt, current_quest, quest_complete
 
@@ -414,6 +415,12 @@ def setup_world():
     from npc_system import DialogueManager
     
     dm = DialogueManager(quest_manager, world_map)
+
+    # Save the systems this world plays with, and resume the last game
+    from save_game import GameSaver
+    game_state.world_map, game_state.story_manager = world_map, story_manager
+    game_state.quest_manager, game_state.boss_manager, game_state.dialogue_manager = quest_manager, boss_manager, dm
+    saver = GameSaver(game_state)
     
     npcs: list[tuple[Entity, NPC]] = []
     
@@ -514,6 +521,7 @@ def setup_world():
             play_anim("idle")
 
         model_holder.rotation_y = lerp_angle(model_holder.rotation_y, target_rotation, time.dt * 10)
+        saver.tick()
             
         if any([state['combat_ui'], state['guild_ui'], state['event_ui'], 
                 state['shop_ui'], state['dialogue_ui'], state['inv_ui'], state['quest_ui']]):
@@ -626,38 +634,6 @@ def setup_world():
                 except Exception:
                     pass
 
-
-                if 'explorer' in player_stats.jokers:
-                    import random as _r
-                    if _r.random() < 0.3:
-                        from card import Card
-                        from tarot import TAROT_DEFINITIONS, TarotCard
-                        if _r.random() < 0.5:
-                            ranks = list('23456789TJQKA')
-                            suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-                            rc = Card(ranks[_r.randint(0,12)], suits[_r.randint(0,3)])
-                            player_stats.add_card_to_deck(rc)
-                            print(f"Explorer found a card: {rc}")
-                        else:
-                            key = _r.choice(list(TAROT_DEFINITIONS.keys()))
-                            td = TAROT_DEFINITIONS[key]
-                            player_stats.items.append(TarotCard(key=key, name=td['name'], description=td['description'], on_use=td['on_use']))
-                            print(f"Explorer found a tarot: {td['name']}")
-
-                if 'beggar' in player_stats.jokers:
-                    if player_stats.beggar_fights_remaining is None:
-                        player_stats.beggar_fights_remaining = 5
-                    if player_stats.beggar_fights_remaining > 0:
-                        take = min(player_stats.gold, 5)
-                        player_stats.gold -= take
-                        player_stats.beggar_fights_remaining -= 1
-                        print(f"The Beggar takes {take} gold. Fights left: {player_stats.beggar_fights_remaining}")
-                    if player_stats.beggar_fights_remaining == 0:
-                        player_stats.permanent_damage_multiplier = round(player_stats.permanent_damage_multiplier * 1.5, 3)
-                        player_stats.jokers.remove('beggar')
-                        player_stats.beggar_fights_remaining = None
-                        print("The Beggar reveals true power! Permanent damage +50%. Then vanishes.")
-
                 try:
                     dv = Vec3(enemy.position.x - player.position.x, 0, enemy.position.z - player.position.z)
                     approach_dir = dv.normalized() if dv.length() > 0 else Vec3(0, 0, 1)
@@ -1789,6 +1765,7 @@ def setup_world():
 
 
 if __name__ == "__main__":
+    attach_console()
     app = Ursina()
     
     window.borderless = False 
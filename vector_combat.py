@@ -0,0 +1,341 @@
+"""Lockstep vectorised combat kernel for Monte Carlo tuning (requires NumPy).
+
+CombatBatch holds N independent fights as a struct of arrays (HP, enemy
+stats, shield, damage reduction, poison schedules, stun) and advances all
+of them one full round per step(): every live fight deals a hand, attacks,
+and takes the enemy's answer using whole-array operations only. Random
+numbers are drawn in bulk from one numpy Generator.
+
+The rules mirror CombatEngine with Player/Enemy/card_abilities:
+
+* hands are classified through lookup tables built once from
+  poker.classify_hands_array, and joker damage comes from damage_model's
+  per-hand affine tables; Berserker, Shaman (no
+  items), Executioner and Fortune Teller are applied as in
+  Player.form_hand_and_attack;
+* hand abilities: High Card stun, Pair heal, Two Pair double damage,
+  Three of a Kind poison (both sides), Flush shield, Full House damage
+  reduction, Royal Flush x4, the combined Five of a Kind / Flush House
+  effects and the Flush Five max-HP hit;
+* Enemy.take_damage subtracts defense; incoming player damage goes
+  through damage reduction, then the shield, like
+  StatusEffectManager.modify_incoming_damage; poison ticks at the start of
+  the victim's turn, the enemy after it acts (as in the engine).
+
+Simplifications, so the kernel stays branch-free: each turn deals a fresh
+*hand_size* cards from a full deck and plays the best 5-card subset by
+pre-ability damage (no discards, items or partial selections). Straight's
+damage buff is omitted because in the engine it expires at the start of
+the next player turn, before it could be used.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations, combinations_with_replacement
+from typing import Sequence, Tuple, TYPE_CHECKING
+
+from constants import HAND_MULTIPLIERS
+from damage_model import affine_damage
+from entities.enemy import ENEMY_TEMPLATES
+from entities.player import EXECUTIONER_HANDS
+from hand_evaluator import HAND_INDEX, HAND_RANKING
+from poker import classify_hands_array
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_SHIELD = 30
+_REDUCTION = 0.3
+_POISON_TURNS = 3
+_NO_HAND = -1
+_ABILITY_HANDS = (
+    "High Card", "Pair", "Two Pair", "Three of a Kind", "Flush", "Full House",
+    "Five of a Kind", "Flush House", "Flush Five", "Royal Flush",
+)
+
+_RANK_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+@lru_cache(maxsize=1)
+def _rank_tables():
+    """Hand categories keyed by the product of rank primes (order-free).
+
+    Every rank multiset is classified once through poker.classify_hands_array,
+    as a rainbow hand and as a flush, so a dealt hand needs only its key, a
+    binary search and a same-suit test.
+    """
+    import numpy as np
+
+    ranks = np.array(list(combinations_with_replacement(range(13), 5)))
+    keys = np.prod(np.array(_RANK_PRIMES)[ranks], axis=1)
+    order = np.argsort(keys)
+    ranks, keys = ranks[order], keys[order]
+    rainbow = ranks + 13 * (np.arange(5) % 4)  # never five of one suit
+    plain, _ = classify_hands_array(rainbow)
+    flush, _ = classify_hands_array(ranks)
+    multipliers = np.array([HAND_MULTIPLIERS[h] for h in HAND_RANKING], dtype=np.int64)
+    return keys, plain.astype(np.int64), flush.astype(np.int64), multipliers
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Per-fight outcomes of a finished (or abandoned) batch."""
+
+    won: 'np.ndarray'        # bool
+    finished: 'np.ndarray'   # bool; False if max_turns ran out
+    turns: 'np.ndarray'      # player turns played
+    player_hp: 'np.ndarray'
+
+    @property
+    def win_rate(self) -> float:
+        return float(self.won.mean()) if len(self.won) else 0.0
+
+    def mean_turns_to_kill(self) -> float | None:
+        return float(self.turns[self.won].mean()) if self.won.any() else None
+
+
+class CombatBatch:
+    """N fights of one joker loadout against per-fight enemy stats.
+
+    Enemy and player stats may be scalars or length-N arrays, so a whole
+    parameter sweep can run as a single batch. Every live fight is on the
+    same turn, so no per-fight clock is needed; finished fights are
+    written out, masked by ``over`` and compacted away once they make up
+    a quarter of the arrays.
+    """
+
+    def __init__(self, n: int, *, enemy_hp, enemy_attack, enemy_defense=0, player_hp=100,
+                 jokers: Sequence[str] = (), hand_size: int = 5, seed: int | None = None):
+        import numpy as np
+
+        if hand_size < 5:
+            raise ValueError("hand_size must be at least 5")
+        damage = affine_damage(tuple(jokers))
+        if not damage.is_affine:
+            raise ValueError(f"Loadout has non-affine jokers: {', '.join(damage.non_affine)}")
+
+        self.np = np
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.hand_size = hand_size
+        self.turn = 0
+        self._combos = np.array(list(combinations(range(hand_size), 5)))
+        self._pairs = list(combinations(range(hand_size), 2))
+        self._primes = np.array(_RANK_PRIMES, dtype=np.int64)
+
+        def column(value, dtype):
+            return np.broadcast_to(np.asarray(value, dtype=dtype), (n,)).copy()
+
+        self.enemy_hp = column(enemy_hp, np.int64)
+        self.enemy_max_hp = self.enemy_hp.copy()
+        self.enemy_attack = column(enemy_attack, np.int64)
+        self.enemy_defense = column(enemy_defense, np.int64)
+        self.player_hp = column(player_hp, np.int64)
+        self.player_max_hp = self.player_hp.copy()
+
+        self.shield = np.zeros(n, dtype=np.int64)
+        self.reduced = np.zeros(n, dtype=bool)          # Full House damage reduction
+        self.enemy_stunned = np.zeros(n, dtype=bool)
+        # Poison ring indexed by turn % 3: slot t holds what ticks on turn t.
+        # A new poison lasts three turns, i.e. it is added to every slot.
+        self.player_poison = np.zeros((n, _POISON_TURNS), dtype=np.int64)
+        self.enemy_poison = np.zeros((n, _POISON_TURNS), dtype=np.int64)
+
+        self.rows = np.arange(n)                        # original index of each slot
+        self.over = np.zeros(n, dtype=bool)             # finished, awaiting compaction
+        self.live = n
+        self._won = np.zeros(n, dtype=bool)
+        self._finished = np.zeros(n, dtype=bool)
+        self._turns = np.zeros(n, dtype=np.int64)
+        self._final_hp = self.player_hp.copy()
+
+        # Per-category lookup tables (index = hand_evaluator.HAND_RANKING)
+        self._scale = np.array([damage.transform(h, 5)[0] for h in HAND_RANKING], dtype=np.float64)
+        self._offset = np.array([damage.transform(h, 5)[1] for h in HAND_RANKING], dtype=np.float64)
+
+        # Shaman is x1.0 without items, which leaves only the int() truncation
+        self.berserker = 'berserker' in jokers
+        chance = 1.5 if 'fortune_teller' in jokers else 1.0
+        self.stun_chance = min(0.3 * chance, 1.0)
+        self.double_chance = min(0.5 * chance, 1.0)
+        self.executioner_hand = np.full(n, _NO_HAND, dtype=np.int64)
+        if 'executioner' in jokers:
+            picks = np.array([HAND_INDEX[h] for h in EXECUTIONER_HANDS])
+            self.executioner_hand = picks[self.rng.integers(len(picks), size=n)]
+
+    # ------------------------------------------------------------------
+    # Round structure
+    # ------------------------------------------------------------------
+    def step(self) -> int:
+        """Play one round (player turn + enemy turn) of every live fight.
+
+        Returns the number of fights still running.
+        """
+        np = self.np
+        if not self.live:
+            return 0
+        self.turn += 1
+        slot = self.turn % _POISON_TURNS
+
+        # Player start_turn: poison ticks first
+        self.player_hp = np.maximum(0, self.player_hp - self.player_poison[:, slot])
+        self.player_poison[:, slot] = 0
+        alive = ~self.over & (self.player_hp > 0)
+
+        self._player_attack(alive)
+        fighting = alive & (self.enemy_hp > 0)
+
+        self._enemy_attack(fighting)
+        # Enemy ticks after acting: stun wears off, poison hits
+        self.enemy_stunned[:] = False
+        self.enemy_hp = np.where(fighting, np.maximum(0, self.enemy_hp - self.enemy_poison[:, slot]),
+                                 self.enemy_hp)
+        self.enemy_poison[:, slot] = 0
+
+        lost = self.player_hp <= 0
+        won = ~lost & (self.enemy_hp <= 0)
+        done = ~self.over & (lost | won)
+        if done.any():
+            finished = self.rows[done]
+            self._won[finished] = won[done]
+            self._finished[finished] = True
+            self._turns[finished] = self.turn
+            self._final_hp[finished] = self.player_hp[done]
+            self.over |= done
+            self.live -= len(finished)
+            if len(self.rows) - self.live > len(self.rows) // 4:
+                self._compact(~self.over)
+        return self.live
+
+    def run(self, max_turns: int = 100) -> BatchResult:
+        while self.turn < max_turns and self.step():
+            pass
+        self._compact(~self.over)
+        self._turns[self.rows] = self.turn
+        self._final_hp[self.rows] = self.player_hp
+        return BatchResult(self._won.copy(), self._finished.copy(), self._turns.copy(), self._final_hp.copy())
+
+    def _compact(self, keep: 'np.ndarray') -> None:
+        for name in _STATE:
+            setattr(self, name, getattr(self, name)[keep])
+
+    # ------------------------------------------------------------------
+    # Player turn
+    # ------------------------------------------------------------------
+    def _deal(self) -> 'np.ndarray':
+        """(live, hand_size) distinct card ids; rows with a repeat are redealt.
+
+        Kept as int8: cheap to generate, compare and split into rank/suit.
+        """
+        np = self.np
+        hand = self.rng.integers(52, size=(len(self.rows), self.hand_size), dtype=np.int8)
+        redeal = self._repeats(hand)
+        while redeal.any():
+            hand[redeal] = self.rng.integers(52, size=(int(redeal.sum()), self.hand_size), dtype=np.int8)
+            redeal[redeal] = self._repeats(hand[redeal])
+        return hand
+
+    def _repeats(self, hand: 'np.ndarray') -> 'np.ndarray':
+        repeat = self.np.zeros(len(hand), dtype=bool)
+        for a, b in self._pairs:
+            repeat |= hand[:, a] == hand[:, b]
+        return repeat
+
+    def _best_play(self, hand: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """(category, base damage, joker damage) of the best 5-card subset."""
+        np = self.np
+        keys, plain, flush, multipliers = _rank_tables()
+        ranks = hand % 13
+        suits = hand // 13
+        key = self._primes[ranks]
+        best = None
+        for combo in self._combos:
+            first = combo[0]
+            same_suit = np.ones(len(hand), dtype=bool)
+            product = key[:, first].copy()
+            for col in combo[1:]:
+                same_suit &= suits[:, col] == suits[:, first]
+                product *= key[:, col]
+            slot = np.searchsorted(keys, product)
+            cat = np.where(same_suit, flush[slot], plain[slot])
+            base = (ranks[:, combo].sum(axis=1) + 10) * multipliers[cat]
+            total = base * self._scale[cat] + self._offset[cat]
+            if best is None:
+                best = [cat, base, total]
+                continue
+            better = total > best[2]
+            for kept, new in zip(best, (cat, base, total)):
+                kept[better] = new[better]
+        return best[0], best[1], best[2]
+
+    def _player_attack(self, alive: 'np.ndarray') -> None:
+        np = self.np
+        cat, base, total = self._best_play(self._deal())
+        cat = np.where(alive, cat, _NO_HAND - 1)  # dead players trigger nothing
+        is_ = {name: cat == HAND_INDEX[name] for name in _ABILITY_HANDS}
+
+        if self.berserker:
+            total = total + self.turn * 2
+        total = np.trunc(total)
+
+        # Ability side effects (applied before the hit lands, as in the engine)
+        heal = np.where(is_["Pair"] | is_["Five of a Kind"], base // 2, 0)
+        self.player_hp = np.minimum(self.player_max_hp, self.player_hp + heal)
+
+        poisoned = is_["Three of a Kind"] | is_["Five of a Kind"]
+        if poisoned.any():
+            poison = np.where(poisoned, np.maximum(3, base // 10), 0)[:, None]
+            self.enemy_poison += poison
+            self.player_poison += poison // 2
+
+        self.shield = np.where(is_["Flush"] | is_["Flush House"], _SHIELD, self.shield)
+        self.reduced |= is_["Full House"] | is_["Flush House"]
+
+        rolls = self.rng.random((len(self.rows), 2))
+        self.enemy_stunned |= is_["High Card"] & (rolls[:, 0] < self.stun_chance)
+
+        flush_five = is_["Flush Five"]
+        if flush_five.any():
+            bonus = (self.enemy_max_hp * rolls[:, 1] * 0.20).astype(np.int64)
+            self._hit_enemy(np.where(flush_five, bonus, 0), flush_five)
+
+        executed = cat == self.executioner_hand
+        total = total + np.where(executed, (self.enemy_hp * 0.2).astype(np.int64), 0)
+
+        multiplier = np.ones(len(self.rows))
+        multiplier[is_["Two Pair"] & (rolls[:, 0] < self.double_chance)] = 2.0
+        multiplier[is_["Royal Flush"]] = 4.0
+        self._hit_enemy(np.trunc(total * multiplier).astype(np.int64), alive)
+
+    def _hit_enemy(self, damage: 'np.ndarray', mask: 'np.ndarray') -> None:
+        np = self.np
+        actual = np.where(mask, np.maximum(0, damage - self.enemy_defense), 0)
+        self.enemy_hp = np.maximum(0, self.enemy_hp - actual)
+
+    # ------------------------------------------------------------------
+    # Enemy turn
+    # ------------------------------------------------------------------
+    def _enemy_attack(self, fighting: 'np.ndarray') -> None:
+        np = self.np
+        damage = np.where(fighting & ~self.enemy_stunned, self.enemy_attack, 0)
+        damage = np.where(self.reduced, (damage * (1 - _REDUCTION)).astype(np.int64), damage)
+        absorbed = np.minimum(self.shield, damage)
+        self.shield -= absorbed
+        self.player_hp = np.maximum(0, self.player_hp - (damage - absorbed))
+
+
+# Per-fight arrays that _compact keeps aligned with ``rows``
+_STATE = (
+    'rows', 'over', 'enemy_hp', 'enemy_max_hp', 'enemy_attack', 'enemy_defense', 'player_hp', 'player_max_hp',
+    'shield', 'reduced', 'enemy_stunned', 'player_poison', 'enemy_poison', 'executioner_hand',
+)
+
+
+def simulate_template(name: str, n: int, **options) -> BatchResult:
+    """Run *n* vectorised fights against the ENEMY_TEMPLATES entry *name*."""
+    max_turns = options.pop('max_turns', 100)
+    template = ENEMY_TEMPLATES[name]
+    batch = CombatBatch(n, enemy_hp=template['hp'], enemy_attack=template['attack'],
+                        enemy_defense=template['defense'], **options)
+    return batch.run(max_turns)